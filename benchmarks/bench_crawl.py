@@ -0,0 +1,163 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+import resource
+import subprocess
+import time
+from datetime import datetime, timedelta
+
+
+from benchmarks.fakes import FakeSaraminServer, LocalRedirectTransport
+from crawler.testing import FakeVisionClient, fake_vision_request
+from crawler.http_client import create_http_client, pool_limits
+from crawler.main import upload_part
+from crawler.metrics import metrics
+from crawler.ocr import OcrService, close_ocr_service, set_ocr_service
+from crawler.ocr_cache import OcrCache
+from crawler.ocr_engines import VisionEngine
+from crawler.ratelimit import RequestBudget
+from crawler.replay import ReplayTransport
+from crawler.scrapers.saramin import CONCURRENT_REQUESTS_LIMIT, crawl_saramin_keywords
+from crawler.sinks import MemorySink
+from crawler.uploader import PartUploader
+
+# 수집 파이프라인(사람인 크롤링 → OCR → part 업로드) 종단 간 벤치마크
+# 사용법: python -m benchmarks.bench_crawl --concurrency 5,10,20 --batch-size 100,500 --pages 1,3 --output bench.json
+# 로컬 대역 서버(FakeSaraminServer) 또는 녹화된 응답(--replay-dir)을 사용하므로 네트워크가 필요 없습니다.
+# 설정마다 새 프로세스에서 실행해 최대 RSS를 설정별로 따로 잽니다.
+
+DEFAULT_KEYWORDS = ['백엔드', '데이터', '청소', '물류']
+
+
+async def _run_pipeline(config: dict) -> dict:
+    metrics.reset()
+    server = None
+    if config['replay_dir']:
+        transport = ReplayTransport(config['replay_dir'])
+    else:
+        server = FakeSaraminServer(jobs_per_page=config['jobs_per_page'], ocr_ratio=config['ocr_ratio'],
+                                   latency=config['server_latency'], fault_rate=config.get('fault_rate', 0.0),
+                                   drop_rate=config.get('drop_rate', 0.0), slow_rate=config.get('slow_rate', 0.0),
+                                   throttle_rps=config.get('throttle_rps', 0.0)).start()
+        transport = LocalRedirectTransport(server.url, limits=pool_limits(config['concurrency']))
+
+    client = create_http_client(config['concurrency'], transport)
+    vision_client = FakeVisionClient(latency=config['ocr_latency'])
+    engine = VisionEngine(vision_client=vision_client, batch_mode=config['ocr_batch'], make_request=fake_vision_request)
+    set_ocr_service(OcrService(engine=engine,
+                               cache=OcrCache(':memory:'), http_client=client))
+    sink = MemorySink()
+    budget = RequestBudget(config['concurrency'], config['rate'])
+    start_date = datetime.now() - timedelta(days=1)
+
+    start = time.perf_counter()
+    async with PartUploader(lambda file_index, data: upload_part(data, file_index, sink),
+                            config['batch_size']) as uploader:
+        async for jobs_from_page in crawl_saramin_keywords(start_date, set(), config['pages'], config['keywords'],
+                                                           budget=budget, client=client):
+            await uploader.add(jobs_from_page)
+    elapsed = time.perf_counter() - start
+
+    await close_ocr_service()
+    await client.aclose()
+    if server is not None:
+        server.stop()
+
+    summary = metrics.summary()
+    return {
+        'config': config,
+        'postings': uploader.uploaded_jobs,
+        'parts': uploader.uploaded_parts,
+        'elapsed_s': round(elapsed, 3),
+        'postings_per_sec': round(uploader.uploaded_jobs / elapsed, 2) if elapsed else 0.0,
+        'stages': summary['stages'],
+        'requests_issued': summary['counters'].get('requests', 0),
+        'retries': summary['counters'].get('retries', 0),
+        'detail_failures': summary['counters'].get('detail_failures', 0),
+        'listing_failures': summary['counters'].get('listing_failures', 0),
+        'server_faults': dict(server.faults) if server else None,
+        'server_requests': server.requests if server else None,
+        'server_connections': server.connections if server else None,
+        'client_connections': client.connection_stats.counters['connections'],
+        'connection_reuse_ratio': round(client.connection_stats.reuse_ratio, 4),
+        'ocr_calls': vision_client.calls,
+        'ocr_images': vision_client.images,
+        'output_bytes': sum(len(data) for data in sink.objects.values()),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def run_once(config: dict) -> dict:
+    """설정 하나로 파이프라인을 실행합니다. 크롤러 로그는 버립니다."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(_run_pipeline(config))
+
+
+def run_sweep(base_config: dict, concurrency_values, batch_sizes, page_counts) -> list:
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for concurrency, batch_size, pages in itertools.product(concurrency_values, batch_sizes, page_counts):
+        config = dict(base_config, concurrency=concurrency, batch_size=batch_size, pages=pages)
+        with context.Pool(1) as pool:
+            result = pool.apply(run_once, (config,))
+        print(f"concurrency={concurrency} batch_size={batch_size} pages={pages}: "
+              f"{result['postings']} postings, {result['postings_per_sec']} postings/s, "
+              f"{result['requests_issued']} requests ({result['retries']} retries), "
+              f"{result['ocr_calls']} OCR calls, peak RSS {result['peak_rss_mb']} MB")
+        results.append(result)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(',')]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="수집 파이프라인 종단 간 벤치마크")
+    parser.add_argument("--concurrency", type=_int_list, default=[CONCURRENT_REQUESTS_LIMIT],
+                        help="CONCURRENT_REQUESTS_LIMIT 후보 (쉼표 구분)")
+    parser.add_argument("--batch-size", type=_int_list, default=[500], help="BATCH_SIZE 후보 (쉼표 구분)")
+    parser.add_argument("--pages", type=_int_list, default=[2], help="키워드당 페이지 수 후보 (쉼표 구분)")
+    parser.add_argument("--keywords", default=",".join(DEFAULT_KEYWORDS))
+    parser.add_argument("--jobs-per-page", type=int, default=100)
+    parser.add_argument("--ocr-ratio", type=float, default=0.2, help="본문이 짧아 OCR 대상이 되는 공고 비율")
+    parser.add_argument("--ocr-batch", action="store_true", help="Vision 배치 모드 사용")
+    parser.add_argument("--server-latency", type=float, default=0.02, help="대역 서버 응답 지연(초)")
+    parser.add_argument("--ocr-latency", type=float, default=0.3, help="가짜 Vision 호출 지연(초)")
+    parser.add_argument("--rate", type=float, default=0.0, help="초당 요청 수 제한 (0이면 제한 없음)")
+    parser.add_argument("--fault-rate", type=float, default=0.0, help="대역 서버가 503으로 응답하는 비율")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="대역 서버가 응답 없이 연결을 끊는 비율")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="대역 서버가 느리게 응답하는 비율")
+    parser.add_argument("--throttle-rps", type=float, default=0.0, help="대역 서버가 429로 거절하기 시작하는 초당 요청 수")
+    parser.add_argument("--replay-dir", help="대역 서버 대신 사용할 녹화 디렉터리 (CRAWL_MODE=record로 생성)")
+    parser.add_argument("--output", help="결과 JSON 파일 경로 (없으면 표준 출력)")
+    args = parser.parse_args()
+
+    base_config = {
+        'keywords': args.keywords.split(','), 'jobs_per_page': args.jobs_per_page, 'ocr_ratio': args.ocr_ratio,
+        'ocr_batch': args.ocr_batch, 'server_latency': args.server_latency, 'ocr_latency': args.ocr_latency,
+        'rate': args.rate, 'replay_dir': args.replay_dir, 'fault_rate': args.fault_rate,
+        'drop_rate': args.drop_rate, 'slow_rate': args.slow_rate, 'throttle_rps': args.throttle_rps,
+    }
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': _git_commit(),
+        'runs': run_sweep(base_config, args.concurrency, args.batch_size, args.pages),
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
@@ -0,0 +1,68 @@
+import argparse
+import glob
+import json
+import os
+import time
+
+from benchmarks.fakes import synthetic_detail_html, synthetic_listing_html
+from crawler.scrapers.saramin_parser import extract_detail_content, extract_listing_items
+
+# 사람인 목록/상세 페이지 파싱 CPU 비용을 파서별로 비교하는 벤치마크
+# 사용법: python -m benchmarks.bench_parser [--fixtures 저장된_HTML_폴더] [--repeat 20]
+# 폴더에는 목록 페이지(listing_*.html)와 상세 페이지(detail_*.html)를 저장해 둡니다.
+
+# 파서 간 결과가 어긋나기 쉬운 경계 사례: body 없는 조각, XML 선언이 붙은 페이지
+PARITY_EDGE_CASES = [
+    '<div class="content">본문 조각 <img src="https://example.com/a.png"></div>',
+    '<?xml version="1.0" encoding="utf-8"?>\n' + synthetic_listing_html(1),
+    '<?xml version="1.0" encoding="utf-8"?>\n' + synthetic_detail_html(50000000, text_lines=5, images=2),
+    '<?xml version="1.0" encoding="euc-kr"?><html><body><p>서울 청소 담당자 모집</p></body></html>',
+]
+
+
+def load_fixtures(fixtures_dir=None):
+    """(목록 HTML 목록, 상세 HTML 목록)을 반환합니다. 폴더가 없으면 합성 페이지를 사용합니다."""
+    if fixtures_dir:
+        def read_all(pattern):
+            paths = sorted(glob.glob(os.path.join(fixtures_dir, pattern)))
+            return [open(path, encoding='utf-8').read() for path in paths]
+        return read_all('listing_*.html'), read_all('detail_*.html')
+    listings = [synthetic_listing_html(page) for page in range(1, 6)]
+    details = [synthetic_detail_html(50000000 + i, text_lines=i % 40, images=i % 4) for i in range(100)]
+    return listings, details
+
+
+def time_per_page(func, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            func(page)
+    return (time.perf_counter() - start) / (repeat * len(pages)) * 1000
+
+
+def run_benchmark(fixtures_dir=None, repeat: int = 20):
+    listings, details = load_fixtures(fixtures_dir)
+
+    # 결과 dict가 기존(bs4) 파서와 같아야 비교 의미가 있습니다. (경계 사례 포함)
+    for page in listings + PARITY_EDGE_CASES:
+        assert extract_listing_items(page, 'lxml') == extract_listing_items(page, 'bs4'), "목록 파싱 결과 불일치"
+    for page in details + PARITY_EDGE_CASES:
+        assert extract_detail_content(page, 'lxml') == extract_detail_content(page, 'bs4'), "상세 파싱 결과 불일치"
+
+    report = {'listing_pages': len(listings), 'detail_pages': len(details), 'repeat': repeat}
+    for parser in ('bs4', 'lxml'):
+        report[parser] = {
+            'listing_ms_per_page': round(time_per_page(lambda p: extract_listing_items(p, parser), listings, repeat), 3),
+            'detail_ms_per_page': round(time_per_page(lambda p: extract_detail_content(p, parser), details, repeat), 3),
+        }
+    for kind in ('listing_ms_per_page', 'detail_ms_per_page'):
+        report[f"{kind.split('_')[0]}_speedup"] = round(report['bs4'][kind] / report['lxml'][kind], 2)
+    return report
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="사람인 HTML 파서 벤치마크")
+    arg_parser.add_argument("--fixtures", help="저장된 HTML 페이지 폴더 (없으면 합성 페이지 사용)")
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    args = arg_parser.parse_args()
+    print(json.dumps(run_benchmark(args.fixtures, args.repeat), ensure_ascii=False, indent=2))
@@ -0,0 +1,300 @@
+# 네트워크 없이 크롤러를 실행/측정하기 위한 외부 서비스 대역(stand-in) 모음 (benchmarks.bench_crawl, tests에서 사용)
+# Vision 대역(FakeVisionClient)은 OCR_ENGINE=fake로 운영 이미지에서도 쓰므로 crawler.testing에 있습니다.
+import asyncio
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime
+from http import HTTPStatus
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+
+# --- 사람인 페이지 대역 ---
+# 실제 사람인 마크업 구조(.item_recruit, .job_tit a, .job_condition span ...)를 흉내 낸 합성 HTML입니다.
+
+_REGIONS = ['서울 강남구', '서울 송파구', '경기 성남시', '부산 해운대구', '인천 연수구', '대전 유성구']
+_EXPERIENCES = ['신입', '경력 3년↑', '신입 · 경력', '경력무관']
+_EMPLOYMENT_TYPES = ['정규직', '계약직', '인턴', '정규직 외']
+_SECTORS = ['백엔드/서버개발', '프론트엔드', '데이터분석', '청소/미화', 'AI/ML', '인프라/DevOps']
+
+
+def synthetic_listing_html(page: int, jobs_per_page: int = 100, posted_dates=None, start_rec_idx: int = 50000000):
+    """목록 페이지 합성 HTML. `posted_dates`(yy/mm/dd 목록)를 주면 공고 순서대로 등록일로 사용합니다."""
+    items = []
+    for i in range(jobs_per_page):
+        n = (page - 1) * jobs_per_page + i
+        rec_idx = start_rec_idx + n
+        posted = posted_dates[i % len(posted_dates)] if posted_dates else "25/10/17"
+        deadline = '상시채용' if n % 7 == 0 else f"~{(n % 12) + 1:02d}/{(n % 28) + 1:02d}({'월화수목금토일'[n % 7]})"
+        items.append(f"""
+<div class="item_recruit" value="{rec_idx}">
+  <div class="area_job">
+    <h2 class="job_tit"><a href="/zf_user/jobs/relay/view?view_type=search&amp;rec_idx={rec_idx}&amp;location=ts" title="[{_SECTORS[n % len(_SECTORS)]}] 채용 공고 {n}" target="_blank"><span>[{_SECTORS[n % len(_SECTORS)]}]</span> 채용 공고 {n}</a></h2>
+    <div class="job_date"><span class="date">{deadline}</span></div>
+    <div class="job_condition">
+      <span><a href="#">{_REGIONS[n % len(_REGIONS)].split()[0]}</a> <a href="#">{_REGIONS[n % len(_REGIONS)].split()[1]}</a></span>
+      <span>{_EXPERIENCES[n % len(_EXPERIENCES)]}</span>
+      <span>대졸(2,3년)↑</span>
+      <span>{_EMPLOYMENT_TYPES[n % len(_EMPLOYMENT_TYPES)]}</span>
+    </div>
+    <div class="job_sector"><a href="#">{_SECTORS[n % len(_SECTORS)]}</a>, <a href="#">Python</a> 외 <span class="job_day">등록일 {posted}</span></div>
+  </div>
+  <div class="area_corp"><strong class="corp_name"><a href="/zf_user/company-info/view?csn={n}" title="(주)회사{n % 97}">(주)회사{n % 97}</a></strong></div>
+</div>""")
+    return f"""<!DOCTYPE html>
+<html lang="ko"><head><meta charset="utf-8"><title>사람인 검색</title>
+<script>window.dataLayer = [{{"page": {page}}}];</script></head>
+<body><div id="recruit_info_list"><div class="content">{''.join(items)}</div></div>
+<div class="pagination"><a href="#">{page}</a></div></body></html>"""
+
+
+def synthetic_detail_html(rec_idx, text_lines: int = 30, images: int = 2, image_host: str = "https://pds.saramin.co.kr"):
+    """상세 페이지 합성 HTML. `text_lines`가 적으면 크롤러가 OCR을 시도합니다."""
+    lines = ''.join(f"<p>■ 담당업무 {i}: 서비스 개발 및 운영 ({rec_idx})</p>\n" for i in range(text_lines))
+    imgs = ''.join(f'<img src="{image_host}/company/img/{rec_idx}_{i}.png" alt="">' for i in range(images))
+    return f"""<!DOCTYPE html>
+<html lang="ko"><head><meta charset="utf-8"><style>.wrap_jv_cont {{ margin: 0 }}</style></head>
+<body><div class="wrap_jv_cont"><div class="user_content">
+<!-- 공고 본문 -->
+<h3>모집부문</h3>
+{lines}
+<img src="/images/logo_saramin.png">{imgs}
+<script>var rec_idx = {rec_idx};</script>
+</div></div></body></html>"""
+
+
+class FakeSaraminServer:
+    """사람인 목록/상세 페이지와 공고 이미지를 합성해서 돌려주는 로컬 HTTP 서버 (별도 스레드의 이벤트 루프)
+
+    - /zf_user/search               : 목록 페이지 (`jobs_per_page`개, 모두 오늘 등록)
+    - /zf_user/jobs/relay/view-detail : 상세 페이지 (`ocr_ratio` 비율은 본문이 짧아 OCR 대상)
+    - 그 외 경로                     : 이미지 (UTF-8 텍스트 바이트라 FakeVisionClient가 그대로 읽음)
+    키워드마다 rec_idx 범위가 달라서 키워드 간 중복 공고가 생기지 않습니다.
+
+    목록/상세 요청에는 장애를 주입할 수 있습니다. (`seed`로 재현 가능)
+    - `fault_rate`    : 이 비율로 503 응답
+    - `drop_rate`     : 이 비율로 응답 없이 연결 끊기
+    - `slow_rate`     : 이 비율로 `slow_latency`초 늦게 응답
+    - `throttle_rps`  : 1초 창에서 이 수를 넘는 요청은 429 (Retry-After: 1)
+    - `start_outage(seconds)` : 그 시간 동안 모든 요청에 503 (회로 차단기 확인용)
+    `faults`에 종류별 주입 횟수를 기록합니다.
+    """
+
+    FAULT_PATHS = ("/zf_user/search", "/zf_user/jobs/relay/view-detail")
+
+    def __init__(self, jobs_per_page: int = 100, ocr_ratio: float = 0.2, images_per_job: int = 2,
+                 latency: float = 0.0, host: str = "127.0.0.1", fault_rate: float = 0.0, drop_rate: float = 0.0,
+                 slow_rate: float = 0.0, slow_latency: float = 3.0, throttle_rps: float = 0.0, seed: int = 0):
+        self.jobs_per_page = jobs_per_page
+        self.ocr_ratio = ocr_ratio
+        self.images_per_job = images_per_job
+        self.latency = latency
+        self.host = host
+        self.fault_rate = fault_rate
+        self.drop_rate = drop_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.throttle_rps = throttle_rps
+        self.port = None
+        self.requests = 0
+        self.connections = 0
+        self.faults = Counter()
+        self._random = random.Random(seed)
+        self._window = (0, 0)  # (초, 그 초에 받은 요청 수)
+        self._outage_until = 0.0
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._handlers = set()  # 연결별 처리 Task (stop에서 취소)
+        self._ready = threading.Event()
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="fake-saramin", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        """서버를 닫고 연결 처리 Task를 모두 정리한 뒤 이벤트 루프를 멈추고 닫습니다."""
+        if self._loop is None or self._loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    async def _shutdown(self):
+        self._server.close()
+        # keep-alive 연결은 요청을 기다리며 계속 열려 있으므로 먼저 취소해야 wait_closed가 끝납니다.
+        for task in list(self._handlers):
+            task.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle_connection, self.host, 0))
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+            self._loop.close()
+
+    def start_outage(self, seconds: float):
+        self._outage_until = time.monotonic() + seconds
+
+    def _pick_fault(self, path: str):
+        """이번 요청에 주입할 장애 종류 (없으면 None)"""
+        if path not in self.FAULT_PATHS:
+            return None
+        now = time.monotonic()
+        if now < self._outage_until:
+            return "outage"
+        if self.throttle_rps:
+            second, count = self._window
+            second_now = int(now)
+            count = count + 1 if second == second_now else 1
+            self._window = (second_now, count)
+            if count > self.throttle_rps:
+                return "throttle"
+        roll = self._random.random()
+        for fault, rate in (("drop", self.drop_rate), ("error", self.fault_rate), ("slow", self.slow_rate)):
+            if roll < rate:
+                return fault
+            roll -= rate
+        return None
+
+    def route(self, path: str, query: dict):
+        """(상태 코드, content-type, 본문 bytes)를 반환합니다."""
+        if path == "/zf_user/search":
+            keyword = query.get('searchword', [''])[0]
+            page = int(query.get('recruitPage', ['1'])[0])
+            start = 10000000 + (zlib.crc32(keyword.encode('utf-8')) % 9000) * 10000
+            today = datetime.now().strftime('%y/%m/%d')
+            html = synthetic_listing_html(page, self.jobs_per_page, posted_dates=[today], start_rec_idx=start)
+            return 200, "text/html; charset=utf-8", html.encode('utf-8')
+        if path == "/zf_user/jobs/relay/view-detail":
+            rec_idx = int(query.get('rec_idx', ['0'])[0])
+            short = (rec_idx % 100) < self.ocr_ratio * 100
+            html = synthetic_detail_html(rec_idx, text_lines=1 if short else 30, images=self.images_per_job)
+            return 200, "text/html; charset=utf-8", html.encode('utf-8')
+        return 200, "image/png", f"이미지 텍스트 {path}".encode('utf-8')
+
+    async def _handle_connection(self, reader, writer):
+        self.connections += 1
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                request_line = head.split(b"\r\n", 1)[0].decode('latin-1')
+                _, target, _ = request_line.split(" ", 2)
+                parts = urlsplit(target)
+                self.requests += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                fault = self._pick_fault(parts.path)
+                extra_headers = ""
+                if fault:
+                    self.faults[fault] += 1
+                if fault == "drop":
+                    return
+                if fault == "slow":
+                    await asyncio.sleep(self.slow_latency)
+                if fault in ("error", "outage"):
+                    status, content_type, body = 503, "text/plain", b"service unavailable"
+                elif fault == "throttle":
+                    status, content_type, body = 429, "text/plain", b"too many requests"
+                    extra_headers = "Retry-After: 1\r\n"
+                else:
+                    status, content_type, body = self.route(parts.path, parse_qs(parts.query))
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\nContent-Type: {content_type}\r\n{extra_headers}"
+                    f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n".encode('latin-1') + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            # stop()에서 취소한 연결. 정상 종료로 끝내야 asyncio.streams 콜백이 취소 예외를 로그로 남기지 않습니다.
+            pass
+        finally:
+            self._handlers.discard(task)
+            writer.close()
+
+
+class LocalRedirectTransport(httpx.AsyncBaseTransport):
+    """모든 요청을 로컬 대역 서버로 보내는 전송 계층 (경로와 쿼리는 그대로 유지)"""
+
+    def __init__(self, base_url: str, **transport_kwargs):
+        target = httpx.URL(base_url)
+        self.scheme, self.host, self.port = target.scheme, target.host, target.port
+        self.inner = httpx.AsyncHTTPTransport(**transport_kwargs)
+
+    async def handle_async_request(self, request):
+        request.url = request.url.copy_with(scheme=self.scheme, host=self.host, port=self.port)
+        return await self.inner.handle_async_request(request)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+class FakeRagEngine:
+    """`crawler.corpus_sync.VertexRagEngine` 대역. 코퍼스별 RagFile과 임포트한 파일 수를 기록합니다."""
+
+    def __init__(self, fail_on_import: int = None, fail_uris=(), fail_delete: bool = False):
+        self.corpora = {}  # 코퍼스 이름 -> {RagFile 이름: 표시 이름}
+        self.imported_uris = []
+        self.import_calls = 0
+        self.fail_on_import = fail_on_import  # n번째 import_files 호출에서 실패
+        self.fail_uris = set(fail_uris)       # 이 문자열이 들어간 URI는 임포트하지 못한 것으로 응답 (부분 실패)
+        self.fail_delete = fail_delete
+        self._next_id = 0
+
+    def corpus_exists(self, corpus_name):
+        return corpus_name in self.corpora
+
+    def create_corpus(self, display_name):
+        self._next_id += 1
+        name = f"projects/fake/locations/fake/ragCorpora/{self._next_id}"
+        self.corpora[name] = {}
+        return name
+
+    def import_files(self, corpus_name, uris):
+        self.import_calls += 1
+        if self.import_calls == self.fail_on_import:
+            raise RuntimeError("fake import failure")
+        failed = 0
+        for uri in uris:
+            if any(pattern in uri for pattern in self.fail_uris):
+                failed += 1
+                continue
+            self._next_id += 1
+            self.corpora[corpus_name][f"{corpus_name}/ragFiles/{self._next_id}"] = uri.rsplit("/", 1)[-1]
+            self.imported_uris.append(uri)
+        return SimpleNamespace(imported_rag_files_count=len(uris) - failed, failed_rag_files_count=failed)
+
+    def list_files(self, corpus_name):
+        return dict(self.corpora[corpus_name])
+
+    def delete_file(self, rag_file_name):
+        if self.fail_delete:
+            raise RuntimeError("fake delete failure")
+        corpus_name = rag_file_name.split("/ragFiles/")[0]
+        del self.corpora[corpus_name][rag_file_name]
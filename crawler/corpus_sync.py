@@ -0,0 +1,276 @@
+import json
+import os
+import re
+from datetime import date, datetime
+
+# RAG Engine 코퍼스 증분 동기화
+# 매일 폴더 전체를 다시 임포트하는 대신, 매니페스트(RAG_IMPORT_MANIFEST_BLOB)에 파일별 버전과 공고 목록을 기록해 두고
+# - 새로 생기거나 바뀐 part 파일만 임포트합니다.
+# - 같은 rec_idx가 나중 파일에 다시 나오면 나중 것을 씁니다. 파일의 모든 공고가 마감되었거나 다른 파일로 대체되면
+#   그 RagFile을 지우고, 살아 있는 공고 비율이 COMPACT_LIVE_RATIO 미만이면 살아 있는 줄만 모아 새 파일로 다시 씁니다.
+# - 바뀐 파일의 이전 RagFile을 포함해 모든 삭제는 새 파일의 RagFile이 확인된 뒤에 하므로,
+#   임포트가 실패해도 서빙 중인 코퍼스에서 공고가 빠지지 않습니다.
+# - 코퍼스가 없거나 전체 재구성을 요청하면 새 코퍼스를 만들어 모두 임포트한 뒤에만 서빙 코퍼스 표식을 바꿉니다.
+RAG_IMPORT_MANIFEST_BLOB = "rag-serving/import_manifest.json"
+IMPORT_BATCH_FILES = 25       # import_files 한 번에 넘기는 파일 수
+COMPACT_LIVE_RATIO = 0.5
+
+_DATE_RE = re.compile(r"(\d{4})\D(\d{1,2})\D(\d{1,2})")
+
+
+class VertexRagEngine:
+    """코퍼스 동기화에 쓰는 vertexai.rag 호출 모음 (오프라인 검증은 benchmarks.fakes.FakeRagEngine)"""
+
+    def __init__(self, project: str, location: str):
+        import vertexai
+
+        vertexai.init(project=project, location=location)
+
+    def corpus_exists(self, corpus_name: str) -> bool:
+        from vertexai import rag
+
+        try:
+            rag.get_corpus(name=corpus_name)
+            return True
+        except Exception:
+            return False
+
+    def create_corpus(self, display_name: str) -> str:
+        from vertexai import rag
+
+        return rag.create_corpus(display_name=display_name).name
+
+    def import_files(self, corpus_name: str, uris: list):
+        from vertexai import rag
+
+        # 동기 호출: 인덱싱이 끝난 뒤에 돌아옵니다. (imported/failed/skipped_rag_files_count)
+        return rag.import_files(corpus_name, uris)
+
+    def list_files(self, corpus_name: str) -> dict:
+        """{RagFile 리소스 이름: 표시 이름}. GCS에서 가져온 파일은 표시 이름이 파일 이름입니다."""
+        from vertexai import rag
+
+        return {rag_file.name: rag_file.display_name for rag_file in rag.list_files(corpus_name)}
+
+    def delete_file(self, rag_file_name: str):
+        from vertexai import rag
+
+        rag.delete_file(name=rag_file_name)
+
+
+def _deadline(value: str) -> str:
+    """마감일 문자열 → 'YYYY-MM-DD' (상시채용 등 날짜가 없으면 '')"""
+    m = _DATE_RE.search(value or "")
+    if not m:
+        return ""
+    try:
+        return date(int(m.group(1)), int(m.group(2)), int(m.group(3))).isoformat()
+    except ValueError:
+        return ""
+
+
+def parse_part(data: bytes) -> dict:
+    """JSONL part → {rec_idx: 마감일}"""
+    records = {}
+    for line in data.decode("utf-8").splitlines():
+        if line.strip():
+            record = json.loads(line)
+            records[record['id']] = _deadline(record.get('structData', {}).get('마감일', ''))
+    return records
+
+
+def load_manifest(sink) -> dict:
+    try:
+        return json.loads(sink.read(RAG_IMPORT_MANIFEST_BLOB))
+    except Exception:
+        return {}
+
+
+def save_manifest(sink, manifest: dict):
+    sink.write(RAG_IMPORT_MANIFEST_BLOB, json.dumps(manifest, ensure_ascii=False).encode("utf-8"),
+               content_type="application/json")
+
+
+def _version_order(version: str) -> int:
+    """버전 토큰(GCS generation, 로컬 mtime_ns-크기, 메모리 쓰기 번호)의 앞 숫자는 쓰인 시각 순서입니다."""
+    head = version.split("-")[0]
+    return int(head) if head.isdigit() else 0
+
+
+def _write_compacted(sink, folder: str, today_str: str, name: str, keep: set, files: dict) -> str:
+    lines = [line for line in sink.read(name).decode("utf-8").splitlines()
+             if line.strip() and json.loads(line)['id'] in keep]
+    index = 0
+    while f"{folder.rstrip('/')}/compacted_{today_str}_{index}.jsonl" in files:
+        index += 1
+    compacted = f"{folder.rstrip('/')}/compacted_{today_str}_{index}.jsonl"
+    sink.write(compacted, ("\n".join(lines) + "\n").encode("utf-8"))
+    return compacted
+
+
+def _rag_file_for(rag_files: dict, name: str, known: set, stale: str = None, failed: int = 0):
+    """name을 임포트해 새로 생긴 RagFile. 매니페스트가 이미 아는 RagFile(같은 이름의 이전 버전 등)은 제외합니다.
+
+    새 RagFile이 없고 임포트 실패도 없으면, 이전 RagFile이 제자리에서 갱신된 것으로 봅니다.
+    """
+    matches = [rag_file for rag_file, display_name in rag_files.items()
+               if display_name in (os.path.basename(name), name)]
+    new = [rag_file for rag_file in matches if rag_file not in known]
+    if new:
+        return new[-1]
+    if stale in matches and not failed:
+        return stale
+    return None
+
+
+def sync_corpus(sink, engine, folder: str, new_display_name: str, today: date = None, rebuild: bool = False):
+    """folder 아래 part 파일과 코퍼스를 맞춥니다. 성공하면 (코퍼스 이름, 표시 이름, 통계), 실패하면 None"""
+    today_str = (today or date.today()).isoformat()
+    manifest = load_manifest(sink)
+    stats = {'imported': 0, 'deleted': 0, 'compacted': 0, 'unchanged': 0}
+
+    corpus = manifest.get('corpus')
+    if rebuild or not corpus or not engine.corpus_exists(corpus):
+        corpus = engine.create_corpus(new_display_name)
+        print(f"'{new_display_name}' 코퍼스를 새로 만들어 전체를 임포트합니다. ({corpus})")
+        # 파일 순서(seq)와 이미 정리된 파일 기록은 이어 받고, 살아 있는 파일은 모두 다시 임포트합니다.
+        old_files = manifest.get('files', {})
+        manifest = {'corpus': corpus, 'display_name': new_display_name, 'files': {}, 'seq': manifest.get('seq', 0)}
+        for name, entry in old_files.items():
+            manifest['files'][name] = {'version': entry['version'], 'seq': entry['seq'],
+                                       'records': entry['records'], 'rag_file': None}
+    files = manifest['files']
+
+    def next_seq():
+        manifest['seq'] += 1
+        return manifest['seq']
+
+    to_delete = list(manifest.get('pending_deletes', []))  # 지울 RagFile (지난 실행에서 삭제에 실패한 것 포함)
+    previous = {}   # 바뀐 파일의 이전 항목 (임포트가 실패하면 되돌림)
+
+    # 1) 사라진 파일은 RagFile도 지웁니다.
+    versions = {name: v for name, v in sink.list_versions(folder.rstrip("/") + "/").items() if name.endswith(".jsonl")}
+    for name in [name for name in files if name not in versions]:
+        to_delete.extend(rag_file for rag_file in (files[name].get('rag_file'), files[name].get('stale_rag_file'))
+                         if rag_file)
+        del files[name]
+
+    # 2) 새로 생기거나 바뀐 파일을 쓰인 순서대로 읽습니다.
+    #    바뀐 파일의 이전 RagFile(stale_rag_file)은 새 RagFile이 확인된 뒤에 지웁니다.
+    changed = [name for name in versions if name not in files or files[name]['version'] != versions[name]]
+    for name in sorted(changed, key=lambda n: (_version_order(versions[n]), n)):
+        entry = files.get(name)
+        stale = None
+        if entry is not None:
+            previous[name] = entry
+            stale = entry.get('rag_file') or entry.get('stale_rag_file')
+        files[name] = {'version': versions[name], 'seq': next_seq(), 'records': parse_part(sink.read(name)),
+                       'rag_file': None, 'stale_rag_file': stale}
+    pending = {name for name, entry in files.items() if entry['records'] and 'imported_at' not in entry}
+
+    # 3) rec_idx마다 가장 나중 파일만 살아 있는 것으로 봅니다.
+    owner = {}
+    for name, entry in sorted(files.items(), key=lambda item: item[1]['seq']):
+        for rec_id in entry['records']:
+            owner[rec_id] = name
+
+    def live_ids(name):
+        return [rec_id for rec_id, deadline in files[name]['records'].items()
+                if owner[rec_id] == name and not (deadline and deadline < today_str)]
+
+    to_import = []
+    retire = []  # 임포트가 끝난 뒤 RagFile을 지우고 정리할 파일
+    compacted_files = []
+    for name in sorted(files, key=lambda n: files[n]['seq']):
+        entry = files[name]
+        if not entry['records']:
+            continue  # 이미 정리된 파일
+        live = live_ids(name)
+        if name in pending and len(live) == len(entry['records']):
+            to_import.append(name)
+        elif not live:
+            retire.append(name)
+        elif name in pending or len(live) / len(entry['records']) < COMPACT_LIVE_RATIO:
+            # 살아 있는 줄만 새 파일로 옮기고, 원래 파일은 새 파일 임포트 뒤에 지웁니다.
+            # (새 파일이 이미 마감/대체된 공고를 담고 있으면 처음부터 살아 있는 줄만 임포트합니다.)
+            compacted = _write_compacted(sink, folder, today_str, name, set(live), files)
+            files[compacted] = {'version': sink.list_versions(compacted)[compacted], 'seq': next_seq(),
+                                'records': {rec_id: entry['records'][rec_id] for rec_id in live}, 'rag_file': None}
+            to_import.append(compacted)
+            compacted_files.append(compacted)
+            retire.append(name)
+            stats['compacted'] += 1
+        else:
+            stats['unchanged'] += 1
+
+    # 4) 임포트: RagFile이 확인된 파일만 임포트 완료로 기록하고, 배치마다 매니페스트를 저장합니다.
+    #    하나라도 확인되지 않으면 실패로 보고, 이번 실행에서는 아무것도 지우거나 정리하지 않습니다.
+    try:
+        for i in range(0, len(to_import), IMPORT_BATCH_FILES):
+            batch = to_import[i:i + IMPORT_BATCH_FILES]
+            response = engine.import_files(corpus, [sink.uri(name) for name in batch])
+            failed = getattr(response, 'failed_rag_files_count', 0) or 0
+            rag_files = engine.list_files(corpus)
+            known = {rag_file for entry in files.values()
+                     for rag_file in (entry.get('rag_file'), entry.get('stale_rag_file')) if rag_file}
+            missing = []
+            for name in batch:
+                stale = files[name].get('stale_rag_file')
+                rag_file = _rag_file_for(rag_files, name, known, stale, failed)
+                if rag_file is None:
+                    missing.append(name)
+                    continue
+                files[name]['rag_file'] = rag_file
+                files[name]['imported_at'] = datetime.now().isoformat(timespec="seconds")
+                if stale == rag_file:
+                    files[name]['stale_rag_file'] = None  # 제자리에서 갱신됨
+                known.add(rag_file)
+            stats['imported'] += len(batch) - len(missing)
+            save_manifest(sink, manifest)
+            if missing:
+                raise RuntimeError(f"RagFile을 확인하지 못한 파일 {len(missing)}개 (임포트 실패 {failed}건): {missing[:5]}")
+            print(f"✅ 파일 {stats['imported']}/{len(to_import)}개 임포트 완료")
+    except Exception as e:
+        for name in to_import:
+            if 'imported_at' not in files[name]:
+                if name in previous:
+                    files[name] = previous[name]  # 이전 RagFile이 계속 서빙되고, 다음 실행에서 다시 시도
+                else:
+                    del files[name]  # 다음 실행에서 다시 시도
+                if name in compacted_files:
+                    sink.delete(name)
+        # 원본이 사라진 파일의 RagFile은 지금 지워도 됩니다. 대체/마감된 파일은 다음 실행에서 정리합니다.
+        manifest['pending_deletes'] = _delete_rag_files(engine, to_delete, stats)
+        save_manifest(sink, manifest)
+        print(f"❗ RAG Engine 임포트 중 오류 발생: {e}")
+        return None
+
+    # 5) 새 RagFile로 대체된 이전 RagFile, 대체되었거나 마감된 RagFile 삭제
+    for name in list(files):
+        entry = files[name]
+        if entry.get('stale_rag_file') and 'imported_at' in entry:
+            to_delete.append(entry['stale_rag_file'])
+            entry['stale_rag_file'] = None
+    for name in retire:
+        to_delete.extend(rag_file for rag_file in (files[name]['rag_file'], files[name].get('stale_rag_file')) if rag_file)
+        files[name]['records'], files[name]['rag_file'], files[name]['stale_rag_file'] = {}, None, None
+    manifest['pending_deletes'] = _delete_rag_files(engine, to_delete, stats)
+    save_manifest(sink, manifest)
+    print(f"📚 코퍼스 동기화 완료: 임포트 {stats['imported']}개, 삭제 {stats['deleted']}개, "
+          f"재작성 {stats['compacted']}개, 변경 없음 {stats['unchanged']}개")
+    return corpus, manifest['display_name'], stats
+
+
+def _delete_rag_files(engine, rag_files: list, stats: dict) -> list:
+    """RagFile들을 지우고, 지우지 못한 것(다음 실행에서 다시 시도)을 반환합니다."""
+    failed = []
+    for rag_file in dict.fromkeys(rag_files):
+        if not rag_file:
+            continue
+        try:
+            engine.delete_file(rag_file)
+            stats['deleted'] += 1
+        except Exception as e:
+            print(f"⚠️ RagFile 삭제 실패 ({rag_file}): {e}")
+            failed.append(rag_file)
+    return failed
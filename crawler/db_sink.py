@@ -0,0 +1,255 @@
+import asyncio
+import os
+import random
+import sqlite3
+from urllib.parse import unquote, urlparse
+
+from crawler.metrics import metrics
+
+# 크롤링 결과를 job_raw 테이블에 바로 반영하는 비동기 DB 단계 (rag/extract_load.py가 이 테이블을 읽습니다)
+# - 공고는 메모리 버퍼에 모였다가 DB_WRITE_BATCH_ROWS개씩 다중 행 upsert 한 번으로 쓰입니다.
+# - 배치는 크기가 제한된 큐를 거쳐 DB_WRITE_WORKERS개 작성기가 연결 풀로 동시에 씁니다.
+#   크롤러는 행마다 왕복을 기다리지 않고, 큐가 가득 찰 때만 기다립니다(역압).
+# - DB_SINK_URL을 지정했을 때만 켜집니다. (예: mysql://user:pw@host:3306/db, 사용자/비밀번호의 특수문자는 %인코딩)
+#   DB_SINK_URL=sqlite:///data/jobs.sqlite3 로 로컬에서 같은 경로를 검증할 수 있습니다.
+# - DB 연결이나 쓰기가 실패해도 크롤링은 계속되고, 반영하지 못한 공고는 `failed_ids`로 남습니다.
+#   (crawler.main은 이 공고들을 처리 완료로 기록하지 않아 다음 실행에서 다시 수집합니다.)
+DB_SINK_URL = os.getenv("DB_SINK_URL", "")
+DB_WRITE_BATCH_ROWS = int(os.getenv("DB_WRITE_BATCH_ROWS", "200"))  # upsert 한 번에 쓰는 행 수
+DB_WRITE_QUEUE_SIZE = 8     # 쓰기를 기다리는 배치 수 상한 (가득 차면 크롤러가 기다림)
+DB_WRITE_WORKERS = 2        # 동시에 배치를 쓰는 작성기 수 (= 연결 풀 크기)
+DB_WRITE_MAX_ATTEMPTS = 4
+DB_WRITE_RETRY_BASE_DELAY = 0.5
+
+# job_raw 컬럼 ← 크롤러 공고 dict 키
+JOB_RAW_COLUMNS = {
+    'rec_idx': 'rec_idx',
+    'title': '제목',
+    'company': '회사명',
+    'description': '상세내용',
+    'location': '지역',
+    'experience': '경력',
+    'employment_type': '고용형태',
+    'posted_date': '등록일',
+    'deadline_date': '마감일',  # '상시채용' 같은 문구도 그대로 보관
+    'link': '상세링크',
+}
+
+MYSQL_DDL = """
+CREATE TABLE IF NOT EXISTS job_raw (
+    rec_idx BIGINT PRIMARY KEY,
+    title VARCHAR(512), company VARCHAR(255), description MEDIUMTEXT,
+    location VARCHAR(255), experience VARCHAR(255), employment_type VARCHAR(255),
+    posted_date DATE, deadline_date VARCHAR(32), link VARCHAR(1024),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) DEFAULT CHARSET=utf8mb4
+"""
+
+SQLITE_DDL = (
+    "CREATE TABLE IF NOT EXISTS job_raw ("
+    " rec_idx INTEGER PRIMARY KEY, title TEXT, company TEXT, description TEXT, location TEXT, experience TEXT,"
+    " employment_type TEXT, posted_date TEXT, deadline_date TEXT, link TEXT)"
+)
+
+
+def job_to_row(job: dict) -> tuple:
+    """공고 dict → JOB_RAW_COLUMNS 순서의 행"""
+    return tuple(int(job['rec_idx']) if column == 'rec_idx' else job.get(key)
+                 for column, key in JOB_RAW_COLUMNS.items())
+
+
+def _upsert_values_sql(rows: int, placeholder: str) -> str:
+    group = "(" + ", ".join([placeholder] * len(JOB_RAW_COLUMNS)) + ")"
+    return f"INSERT INTO job_raw ({', '.join(JOB_RAW_COLUMNS)}) VALUES " + ", ".join([group] * rows)
+
+
+class MySqlBackend:
+    """aiomysql 연결 풀로 `INSERT ... ON DUPLICATE KEY UPDATE` 다중 행 upsert"""
+
+    def __init__(self, url: str, pool_size: int = DB_WRITE_WORKERS):
+        self.url = urlparse(url)
+        self.pool_size = pool_size
+        self.pool = None
+
+    async def open(self):
+        import aiomysql
+
+        self.pool = await aiomysql.create_pool(
+            host=self.url.hostname, port=self.url.port or 3306, user=unquote(self.url.username or ""),
+            password=unquote(self.url.password or ""), db=self.url.path.lstrip("/"),
+            minsize=1, maxsize=self.pool_size, autocommit=True, charset="utf8mb4",
+        )
+        async with self.pool.acquire() as conn, conn.cursor() as cursor:
+            await cursor.execute(MYSQL_DDL)
+
+    async def write_rows(self, rows: list):
+        updates = ", ".join(f"{column} = VALUES({column})" for column in JOB_RAW_COLUMNS if column != 'rec_idx')
+        sql = _upsert_values_sql(len(rows), "%s") + f" ON DUPLICATE KEY UPDATE {updates}"
+        async with self.pool.acquire() as conn, conn.cursor() as cursor:
+            await cursor.execute(sql, [value for row in rows for value in row])
+
+    async def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+
+
+class SqliteBackend:
+    """테스트/로컬용 SQLite 대역. 같은 다중 행 upsert를 `ON CONFLICT(rec_idx) DO UPDATE`로 씁니다."""
+
+    MAX_VARIABLES = 999  # 오래된 SQLite의 바인딩 변수 수 제한
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = None
+        self._lock = asyncio.Lock()  # 연결 하나를 여러 작성기가 나눠 씀
+
+    async def open(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute(SQLITE_DDL)
+        self.conn.commit()
+
+    def _write(self, rows: list):
+        updates = ", ".join(f"{column} = excluded.{column}" for column in JOB_RAW_COLUMNS if column != 'rec_idx')
+        step = max(1, self.MAX_VARIABLES // len(JOB_RAW_COLUMNS))
+        for i in range(0, len(rows), step):
+            batch = rows[i:i + step]
+            sql = _upsert_values_sql(len(batch), "?") + f" ON CONFLICT(rec_idx) DO UPDATE SET {updates}"
+            self.conn.execute(sql, [value for row in batch for value in row])
+        self.conn.commit()
+
+    async def write_rows(self, rows: list):
+        async with self._lock:
+            await asyncio.to_thread(self._write, rows)
+
+    async def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+
+def create_db_backend(url: str):
+    """mysql://… → MySqlBackend, sqlite:///경로 → SqliteBackend"""
+    parsed = urlparse(url)
+    if parsed.scheme in ("mysql", "mysql+aiomysql", "mysql+pymysql"):
+        return MySqlBackend(url)
+    if parsed.scheme == "sqlite":
+        return SqliteBackend(url[len("sqlite:///"):])
+    raise ValueError(f"지원하지 않는 DB_SINK_URL입니다: {url}")
+
+
+class DbSink:
+    """크롤링 결과를 배치로 모아 작성기 태스크들이 job_raw에 upsert하는 쓰기 단계 (PartUploader와 같은 구조)
+
+    - `add(jobs)`는 행을 버퍼에 쌓고, `batch_rows`개가 되면 크기가 제한된 큐에 넣습니다.
+    - 작성기는 실패한 배치를 지수 백오프로 재시도하고, 끝내 실패하면 `failed_ids`에 rec_idx를 남깁니다.
+    - DB를 열지 못하면 이후 `add`로 들어온 공고를 모두 `failed_ids`에 넣고 아무것도 쓰지 않습니다.
+    """
+
+    def __init__(self, backend, batch_rows: int = DB_WRITE_BATCH_ROWS, workers: int = DB_WRITE_WORKERS,
+                 queue_size: int = DB_WRITE_QUEUE_SIZE, max_attempts: int = DB_WRITE_MAX_ATTEMPTS):
+        self.backend = backend
+        self.batch_rows = batch_rows
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self._queue = asyncio.Queue(maxsize=queue_size)
+        self._tasks = []
+        self._rows = {}  # rec_idx → 행 (한 배치 안의 중복은 마지막 것만)
+        self.written_rows = 0
+        self.written_batches = 0
+        self.failed_ids = set()  # 반영하지 못한 rec_idx (문자열)
+        self.available = False
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.close()
+        else:
+            for task in self._tasks:
+                task.cancel()
+            await self._close_backend()
+
+    async def start(self):
+        try:
+            await self.backend.open()
+        except Exception as e:
+            print(f"🚨 job_raw DB를 열지 못했습니다. 이번 실행은 DB 반영 없이 크롤링을 계속합니다: {e}")
+            return
+        self.available = True
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def add(self, jobs: list):
+        if not self.available:
+            self.failed_ids.update(str(job['rec_idx']) for job in jobs)
+            return
+        for job in jobs:
+            row = job_to_row(job)
+            self._rows[row[0]] = row
+            if len(self._rows) >= self.batch_rows:
+                await self._enqueue()
+
+    async def _enqueue(self):
+        if not self._rows:
+            return
+        rows, self._rows = list(self._rows.values()), {}
+        await self._queue.put(rows)
+
+    async def _worker(self):
+        while True:
+            rows = await self._queue.get()
+            try:
+                if rows is None:
+                    return
+                await self._write_with_retry(rows)
+            finally:
+                self._queue.task_done()
+
+    async def _write_with_retry(self, rows):
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                with metrics.timer('db_write'):
+                    await self.backend.write_rows(rows)
+                break
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    print(f"🚨 job_raw 배치 쓰기 최종 실패 ({len(rows)}행, {attempt}회 시도): {e}")
+                    self.failed_ids.update(str(row[0]) for row in rows)
+                    return
+                delay = DB_WRITE_RETRY_BASE_DELAY * 2 ** (attempt - 1) * (0.5 + random.random())
+                print(f"⚠️ job_raw 배치 쓰기 실패, {delay:.1f}초 후 재시도 ({attempt}/{self.max_attempts}): {e}")
+                await asyncio.sleep(delay)
+        self.written_rows += len(rows)
+        self.written_batches += 1
+
+    async def close(self) -> int:
+        """남은 버퍼를 쓰고 모든 작성기가 끝날 때까지 기다린 뒤, 쓴 행 수를 반환합니다."""
+        if not self.available:
+            return self.written_rows
+        await self._enqueue()
+        for _ in self._tasks:
+            await self._queue.put(None)
+        await asyncio.gather(*self._tasks)
+        await self._close_backend()
+        return self.written_rows
+
+    async def _close_backend(self):
+        try:
+            await self.backend.close()
+        except Exception as e:
+            print(f"⚠️ job_raw DB 연결 종료 중 오류: {e}")
+
+
+def create_db_sink(url: str = None):
+    """DB_SINK_URL(또는 url)이 있으면 DbSink, 없으면 None"""
+    url = url if url is not None else DB_SINK_URL
+    if not url:
+        return None
+    try:
+        return DbSink(create_db_backend(url))
+    except ValueError as e:
+        print(f"🚨 {e} (DB 반영 없이 크롤링합니다)")
+        return None
@@ -0,0 +1,91 @@
+import os
+from collections import Counter
+
+import httpx
+
+try:
+    import h2  # noqa: F401  (httpx의 HTTP/2 지원에 필요)
+except ImportError:  # h2가 없으면 HTTP/1.1 keep-alive로만 재사용
+    h2 = None
+
+# 크롤러 전체가 공유하는 HTTP 계층 (crawler.main에서 한 번 만들어 목록/상세/OCR 이미지 요청에 모두 사용)
+# - 키워드마다, 이미지마다 클라이언트를 새로 만들지 않으므로 TCP/TLS 연결을 계속 재사용합니다.
+# - HTTP/2를 지원하는 호스트는 연결 하나에 요청을 다중화합니다.
+# - 연결 재사용 통계는 httpcore trace 확장으로 모읍니다. (ConnectionStats.summary())
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+HTTP_CONNECT_TIMEOUT = 5.0   # 연결 수립(TCP + TLS)
+HTTP_READ_TIMEOUT = 20.0     # 응답 바이트 사이 최대 대기
+HTTP_WRITE_TIMEOUT = 10.0
+HTTP_POOL_TIMEOUT = 30.0     # 풀에서 빈 연결을 기다리는 시간
+HTTP_KEEPALIVE_EXPIRY = 60.0  # 쉬는 연결을 유지하는 시간 (키워드 사이 공백보다 길게)
+HTTP_CONNECTIONS_PER_SLOT = 2  # 동시 작업 한 자리당 연결 수 (페이지 + 이미지)
+
+# 모든 호스트에 보내는 기본 헤더. 사람인 Referer는 사람인 요청에만 붙입니다. (crawler.scrapers.saramin.SARAMIN_HEADERS)
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0',
+    'Accept-Language': 'ko-KR,ko;q=0.9,en;q=0.8',
+}
+
+
+class ConnectionStats:
+    """httpcore trace 이벤트로 센 요청 수 / 새 연결 수 / TLS 핸드셰이크 수"""
+
+    def __init__(self):
+        self.counters = Counter()
+
+    async def trace(self, event: str, info: dict):
+        if event == "connection.connect_tcp.complete":
+            self.counters['connections'] += 1
+        elif event == "connection.start_tls.complete":
+            self.counters['tls_handshakes'] += 1
+        elif event.endswith(".send_request_headers.started"):
+            self.counters['requests'] += 1
+            self.counters[event.split(".")[0]] += 1  # http11 / http2
+
+    async def on_request(self, request: httpx.Request):
+        request.extensions["trace"] = self.trace
+
+    @property
+    def reuse_ratio(self) -> float:
+        requests = self.counters['requests']
+        return 1 - self.counters['connections'] / requests if requests else 0.0
+
+    def summary(self) -> str:
+        c = self.counters
+        return (f"HTTP 요청 {c['requests']}건 (HTTP/2 {c['http2']}건), 새 연결 {c['connections']}개, "
+                f"TLS 핸드셰이크 {c['tls_handshakes']}회, 연결 재사용률 {self.reuse_ratio * 100:.1f}%")
+
+
+def pool_limits(concurrency: int) -> httpx.Limits:
+    """동시 작업 예산에 맞춘 연결 풀 크기"""
+    connections = max(1, concurrency) * HTTP_CONNECTIONS_PER_SLOT
+    return httpx.Limits(max_connections=connections, max_keepalive_connections=connections,
+                        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY)
+
+
+def http_timeout() -> httpx.Timeout:
+    return httpx.Timeout(connect=HTTP_CONNECT_TIMEOUT, read=HTTP_READ_TIMEOUT, write=HTTP_WRITE_TIMEOUT,
+                         pool=HTTP_POOL_TIMEOUT)
+
+
+def http_transport(concurrency: int) -> httpx.AsyncHTTPTransport:
+    """풀 크기와 HTTP/2 설정을 적용한 실제 네트워크 전송 계층 (녹화 전송 계층의 내부 전송으로도 사용)"""
+    if HTTP2_ENABLED and h2 is None:
+        print("⚠️ h2 패키지가 없어 HTTP/1.1로 연결합니다. (pip install h2)")
+    return httpx.AsyncHTTPTransport(http2=HTTP2_ENABLED and h2 is not None, limits=pool_limits(concurrency))
+
+
+def create_http_client(concurrency: int, transport: httpx.AsyncBaseTransport = None) -> httpx.AsyncClient:
+    """크롤러 공용 클라이언트. `transport`(녹화 재생, 로컬 대역 등)를 넘기지 않으면 http_transport를 씁니다.
+
+    연결 재사용 통계는 `client.connection_stats`에 쌓입니다.
+    """
+    stats = ConnectionStats()
+    client = httpx.AsyncClient(
+        transport=transport or http_transport(concurrency),
+        timeout=http_timeout(),
+        headers=DEFAULT_HEADERS,
+        event_hooks={'request': [stats.on_request]},
+    )
+    client.connection_stats = stats
+    return client
@@ -1,31 +1,49 @@
 import asyncio
-import os
+import contextlib
 import json
+import os
 from datetime import datetime, timedelta
 
 from dotenv import load_dotenv
-from google.cloud import storage
-import vertexai
-from vertexai import rag
 
-from crawler.scrapers.saramin import crawl_saramin # 기존 크롤러 모듈
+# crawler.* 모듈은 import 시점에 환경 변수를 읽으므로(OCR_ENGINE, SEEN_INDEX_PATH, DB_SINK_URL 등) .env를 먼저 불러옵니다.
+load_dotenv()
+
+from crawler.scrapers.saramin import CONCURRENT_REQUESTS_LIMIT, crawl_saramin_keywords # 기존 크롤러 모듈
+from crawler.http_client import create_http_client, http_transport
+from crawler.corpus_sync import VertexRagEngine, sync_corpus
+from crawler.seen_index import SeenIndex
+from crawler.ocr import OcrService, get_ocr_cache, close_ocr_service, set_ocr_service
+from crawler.uploader import PartUploader
+from crawler.db_sink import create_db_sink
+from crawler.sinks import create_sink
+from crawler.replay import create_transport
 
 # --- 1. 전체 설정 ---
-load_dotenv()
 
 # 오늘 날짜를 기반으로 동적 이름 생성
 today_date_str = datetime.now().strftime('%Y-%m-%d')
 
 # GCP 및 Vertex AI 설정
-PROJECT_ID = "job-agent-471006"
-LOCATION = "us-east4"
-CORPUS_DISPLAY_NAME = f"job_corpus_{today_date_str}"
+PROJECT_ID = os.getenv("PROJECT_ID", "job-agent-471006")
+LOCATION = os.getenv("LOCATION", "us-east4")
+CORPUS_DISPLAY_NAME = f"job_corpus_{today_date_str}"  # 새 코퍼스를 만들 때(첫 실행/전체 재구성)만 쓰는 이름
+RAG_FULL_REBUILD = os.getenv("RAG_FULL_REBUILD", "false").lower() == "true"  # 새 코퍼스에 전체를 다시 임포트
 
 # GCS 설정
-GCS_BUCKET_NAME = "job-agent-raw-json"
+GCS_BUCKET_NAME = os.getenv("GCS_BUCKET_NAME", "job-agent-raw-json")
 GCS_DESTINATION_FOLDER = "rag-source-data"
-GCS_FILENAME_PREFIX = f"job_{today_date_str}"
-GCS_URI_FOR_RAG = f"gs://{GCS_BUCKET_NAME}/{GCS_DESTINATION_FOLDER}/"
+# 같은 날 다시 실행하거나 Cloud Run이 재시도해도 이전 실행의 part를 덮어쓰지 않도록 실행 시각을 이름에 넣습니다.
+# (덮어쓰면 이미 처리 완료로 기록된 공고가 part에서 사라져 다시 수집되지 않습니다.)
+RUN_ID = datetime.now().strftime('%H%M%S')
+GCS_FILENAME_PREFIX = f"job_{today_date_str}_{RUN_ID}"
+# RAG 서비스가 서빙할 코퍼스와 답변 캐시 무효화에 쓰는 코퍼스 버전 표식 (임포트 대상 폴더 밖에 둡니다)
+CORPUS_VERSION_BLOB = "rag-serving/corpus_version.json"
+
+# 저장소/실행 모드 설정 (오프라인 실행: STORAGE_URI=./out CRAWL_MODE=replay OCR_ENGINE=fake)
+STORAGE_URI = os.getenv("STORAGE_URI", f"gs://{GCS_BUCKET_NAME}")  # gs://버킷, 로컬 경로, memory://
+CRAWL_MODE = os.getenv("CRAWL_MODE", "live")  # live / record / replay
+REPLAY_DIR = os.getenv("REPLAY_DIR", "data/replay")
 
 # 크롤링 및 배치 설정
 BATCH_SIZE = 500
@@ -35,62 +53,53 @@ SEARCH_KEYWORDS = ['청소']
 SEARCH_START_DATE_STR = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
 
 
-# --- 2. GCS 업로드 헬퍼 함수 ---
 
-def upload_batch_to_gcs(jobs_batch: list, file_index: int, bucket):
-    """채용 공고 배치(list)를 GCS에 part 파일로 업로드합니다."""
-    if not jobs_batch:
+def warn_ephemeral_state():
+    """Cloud Run Job에서 로컬 상태 파일(처리 기록, OCR 캐시)이 임시 디스크에 있으면 경고합니다."""
+    if not os.getenv("CLOUD_RUN_JOB"):
         return
+    ephemeral = [name for name in ("SEEN_INDEX_PATH", "OCR_CACHE_PATH") if not os.getenv(name)]
+    if ephemeral:
+        print(f"⚠️ Cloud Run Job의 로컬 디스크는 실행이 끝나면 사라집니다. {', '.join(ephemeral)}를 영구 볼륨 경로"
+              f"(예: /mnt/state/...)로 지정하지 않으면 매 실행이 처음부터 다시 수집/OCR합니다.")
 
-    gcs_blob_name = f"{GCS_DESTINATION_FOLDER}/{GCS_FILENAME_PREFIX}_part_{file_index}.jsonl"
-    blob = bucket.blob(gcs_blob_name)
-
-    jsonl_records = []
-    for job in jobs_batch:
-        content = job.get('제목', '') + "\n\n" + job.get('상세내용', '')
-        metadata = {k: v for k, v in job.items() if k not in ['rec_idx', '제목', '상세내용']}
-        json_record = {
-            "id": str(job.get('rec_idx')),
-            "structData": metadata,
-            "content": content
-        }
-        jsonl_records.append(json.dumps(json_record, ensure_ascii=False))
 
-    final_jsonl_content = "\n".join(jsonl_records)
+# --- 2. 업로드 헬퍼 함수 ---
 
-    try:
-        blob.upload_from_string(final_jsonl_content, content_type="application/jsonl")
-        print(f"✅ {len(jobs_batch)}개 공고를 {gcs_blob_name} 파일로 GCS에 업로드 완료.")
-    except Exception as e:
-        print(f"🚨 GCS 업로드 중 오류 발생 (파일: {gcs_blob_name}): {e}")
+def upload_part(data: bytes, file_index: int, sink):
+    """직렬화된 JSONL part(bytes)를 저장소에 씁니다. 실패하면 예외를 그대로 올려 재시도하게 합니다."""
+    blob_name = f"{GCS_DESTINATION_FOLDER}/{GCS_FILENAME_PREFIX}_part_{file_index}.jsonl"
+    sink.write(blob_name, data, content_type="application/jsonl")
+    print(f"✅ {sink.uri(blob_name)} 업로드 완료. ({len(data) / 1024:.0f} KB)")
 
 # --- 3. RAG Engine 로드 헬퍼 함수 ---
 
-def ingest_gcs_files_to_rag(gcs_uri: str):
-    """지정된 GCS 경로의 모든 파일을 RAG Engine으로 가져옵니다."""
-    print("\n--- 2단계: RAG Engine으로 데이터 가져오기 시작 ---")
-    
-    vertexai.init(project=PROJECT_ID, location=LOCATION)
-    
-    corpora = rag.list_corpora()
-    corpus = next((c for c in corpora if c.display_name == CORPUS_DISPLAY_NAME), None)
-    
-    if not corpus:
-        print(f"'{CORPUS_DISPLAY_NAME}' 코퍼스를 새로 생성합니다.")
-        corpus = rag.create_corpus(display_name=CORPUS_DISPLAY_NAME)
-    else:
-        print(f"기존 코퍼스 '{CORPUS_DISPLAY_NAME}'를 사용합니다.")
-
-    print(f"'{gcs_uri}' 경로의 파일들을 RAG Engine으로 가져옵니다.")
+def sync_rag_corpus(sink):
+    """새로 올라온 part 파일만 RAG Engine으로 가져오고 마감/대체된 공고를 지웁니다. 성공하면 (코퍼스 이름, 표시 이름)"""
+    print("\n--- 2단계: RAG Engine 코퍼스 동기화 시작 ---")
     try:
-        rag.import_files(
-            corpus.name,
-            [gcs_uri],
-        )
-        print("✅ Storage -> VectorDB 임포트 작업이 성공적으로 시작되었습니다.")
-        print("   (실제 인덱싱 완료까지는 데이터 양에 따라 시간이 소요될 수 있습니다)")
+        engine = VertexRagEngine(PROJECT_ID, LOCATION)
+        result = sync_corpus(sink, engine, GCS_DESTINATION_FOLDER, CORPUS_DISPLAY_NAME, rebuild=RAG_FULL_REBUILD)
     except Exception as e:
-        print(f"❗ RAG Engine 임포트 중 오류 발생: {e}")
+        # 크롤링 결과는 이미 저장되었으므로, 동기화는 다음 실행에서 다시 시도합니다.
+        print(f"❗ RAG Engine 코퍼스 동기화 실패: {e}")
+        return None
+    if result is None:
+        return None
+    corpus_name, display_name, _ = result
+    return corpus_name, display_name
+
+
+def write_corpus_version(sink, corpus_name: str, display_name: str = CORPUS_DISPLAY_NAME):
+    """임포트가 끝난 코퍼스를 서빙 코퍼스로 지정합니다. RAG 서비스는 이 코퍼스를 검색하고, 값이 바뀌면 답변 캐시를 비웁니다."""
+    stamp = {
+        "corpus": corpus_name,
+        "display_name": display_name,
+        "imported_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    sink.write(CORPUS_VERSION_BLOB, json.dumps(stamp, ensure_ascii=False).encode("utf-8"),
+               content_type="application/json")
+    print(f"✅ 서빙 코퍼스 표식 갱신: {sink.uri(CORPUS_VERSION_BLOB)} ({corpus_name})")
 
 
 # --- 4. 메인 실행 함수 ---
@@ -98,43 +107,77 @@ def ingest_gcs_files_to_rag(gcs_uri: str):
 async def main():
     """크롤링, GCS 업로드, RAG Engine 임포트를 순차적으로 실행합니다."""
     start_time = datetime.now()
+    warn_ephemeral_state()
 
     # 1단계: 크롤링 및 GCS 배치 업로드
     print(f"--- 1단계: 크롤링 및 GCS 배치 업로드 시작 (파일명 접두사: {GCS_FILENAME_PREFIX}) ---")
-    storage_client = storage.Client(project=PROJECT_ID)
-    bucket = storage_client.bucket(GCS_BUCKET_NAME)
-    
-    all_jobs_buffer = []
-    total_jobs_uploaded = 0
-    file_index = 1
+    sink = create_sink(STORAGE_URI, project=PROJECT_ID)
+
+    # 목록·상세 페이지와 OCR 이미지 요청이 모두 하나의 클라이언트(연결 풀)를 공유합니다.
+    # 녹화/재생 모드에서는 그 클라이언트가 녹화/재생 전송 계층을 거칩니다. (실제 네트워크 전송 계층은 녹화 모드에서만 필요)
+    inner = http_transport(CONCURRENT_REQUESTS_LIMIT) if CRAWL_MODE == "record" else None
+    transport = create_transport(CRAWL_MODE, REPLAY_DIR, inner=inner)
+    if transport is not None:
+        print(f"크롤링 모드: {CRAWL_MODE} ({REPLAY_DIR})")
+    client = create_http_client(CONCURRENT_REQUESTS_LIMIT, transport)
+    set_ocr_service(OcrService(http_client=client))
     
     # 여기서 사용할 시작 날짜 객체를 미리 생성합니다.
     start_date_obj = datetime.strptime(SEARCH_START_DATE_STR, "%Y-%m-%d")
 
-    for keyword in SEARCH_KEYWORDS:
-        print(f"\n> 키워드: '{keyword}' 크롤링 중...")
-        async for jobs_from_page in crawl_saramin(start_date_obj, set(), TOTAL_PAGE_LIMIT, keyword):
-            all_jobs_buffer.extend(jobs_from_page)
-            
-            if len(all_jobs_buffer) >= BATCH_SIZE:
-                batch_to_upload = all_jobs_buffer[:BATCH_SIZE]
-                all_jobs_buffer = all_jobs_buffer[BATCH_SIZE:]
-
-                upload_batch_to_gcs(batch_to_upload, file_index, bucket)
-                
-                total_jobs_uploaded += len(batch_to_upload)
-                file_index += 1
-
-    if all_jobs_buffer:
-        upload_batch_to_gcs(all_jobs_buffer, file_index, bucket)
-        total_jobs_uploaded += len(all_jobs_buffer)
+    # 이전 실행에서 업로드한 공고는 지문이 같으면 상세/OCR/업로드를 모두 건너뜁니다.
+    seen_index = SeenIndex()
+    print(f"오래된 처리 기록 {seen_index.prune()}개를 정리했습니다.")
+    existing_ids = seen_index.load()
+    print(f"이전 실행에서 처리한 공고 {len(existing_ids)}개를 불러왔습니다.")
+
+    # DB_SINK_URL이 설정되어 있으면 같은 공고를 job_raw 테이블에도 배치 upsert합니다.
+    db_sink = create_db_sink()
+    uploaded_keys = []  # DB 쓰기가 끝난 뒤 처리 완료로 기록할 (rec_idx, 지문)
+
+    def on_uploaded(keys):
+        if db_sink is None:
+            seen_index.record_keys(keys)
+        else:
+            uploaded_keys.extend(keys)
+
+    # 업로드는 별도 업로더들이 워커 스레드에서 처리하고, 큐가 가득 찰 때만 크롤링이 기다립니다.
+    uploader = PartUploader(
+        lambda file_index, data: upload_part(data, file_index, sink),
+        BATCH_SIZE,
+        on_uploaded=on_uploaded,
+    )
+    async with uploader, db_sink or contextlib.nullcontext():
+        # 모든 키워드를 하나의 동시성/속도 예산 아래에서 동시에 크롤링합니다.
+        async for jobs_from_page in crawl_saramin_keywords(start_date_obj, existing_ids, TOTAL_PAGE_LIMIT, SEARCH_KEYWORDS,
+                                                           client=client):
+            await uploader.add(jobs_from_page)
+            if db_sink is not None:
+                await db_sink.add(jobs_from_page)
+    print(client.connection_stats.summary())
+    await client.aclose()
+    total_jobs_uploaded = uploader.uploaded_jobs
+    if uploader.failed_parts:
+        print(f"🚨 업로드에 실패한 part: {uploader.failed_parts} (해당 공고는 다음 실행에서 다시 수집됩니다)")
+    if db_sink is not None:
+        # DB에 반영하지 못한 공고는 처리 완료로 기록하지 않아 다음 실행에서 다시 수집합니다.
+        seen_index.record_keys([key for key in uploaded_keys if key[0] not in db_sink.failed_ids])
+        print(f"🗄️ job_raw 테이블에 {db_sink.written_rows}개 공고를 반영했습니다. ({db_sink.written_batches}개 배치)")
+        if db_sink.failed_ids:
+            print(f"🚨 job_raw 쓰기에 실패한 공고 {len(db_sink.failed_ids)}개: {sorted(db_sink.failed_ids)[:20]}")
+    seen_index.close()
     
     print(f"\n--- 1단계 완료: 총 {total_jobs_uploaded}개 공고를 GCS에 저장했습니다. ---")
-
-    if total_jobs_uploaded > 0:
-        await asyncio.to_thread(ingest_gcs_files_to_rag, GCS_URI_FOR_RAG)
+    print(get_ocr_cache().summary())
+    await close_ocr_service()
+
+    # 새 공고가 없어도 마감된 공고 정리를 위해 매일 동기화합니다.
+    if sink.scheme == "gs":
+        synced = await asyncio.to_thread(sync_rag_corpus, sink)
+        if synced:
+            write_corpus_version(sink, *synced)
     else:
-        print("\n--- 업로드된 데이터가 없어 RAG Engine 임포트를 건너뜁니다. ---")
+        print(f"\n--- GCS가 아닌 저장소({sink.uri()})이므로 RAG Engine 동기화를 건너뜁니다. ---")
 
     print(f"\n--- 모든 작업 완료 ---")
     print(f"총 소요 시간: {datetime.now() - start_time}")
@@ -0,0 +1,79 @@
+import random
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+# 크롤링 파이프라인 단계별 소요 시간/횟수 기록 (벤치마크와 실행 로그에서 사용)
+# 긴 크롤링에서도 메모리가 늘지 않도록 단계마다 개수/합/최대와 크기가 고정된 표본(reservoir)만 보관합니다.
+METRICS_RESERVOIR_SIZE = 2048  # 백분위수 계산에 쓰는 단계별 표본 수 상한
+
+
+class StageDurations:
+    """한 단계의 소요 시간 통계: 개수/합/최대는 정확히, 백분위수는 균등 표본(Algorithm R)으로 구합니다."""
+
+    def __init__(self, reservoir_size: int = METRICS_RESERVOIR_SIZE, seed: int = 0):
+        self.reservoir_size = reservoir_size
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = []
+        self._random = random.Random(seed)
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        if len(self.samples) < self.reservoir_size:
+            self.samples.append(value)
+        else:
+            slot = self._random.randrange(self.count)
+            if slot < self.reservoir_size:
+                self.samples[slot] = value
+
+
+class StageMetrics:
+    """단계 이름별 소요 시간 통계와 카운터를 모읍니다."""
+
+    def __init__(self):
+        self.durations = defaultdict(StageDurations)
+        self.counters = Counter()
+
+    @contextmanager
+    def timer(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[stage].add(time.perf_counter() - start)
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def reset(self):
+        self.durations.clear()
+        self.counters.clear()
+
+    def summary(self) -> dict:
+        """{단계: {count, p50_ms, p95_ms, mean_ms, max_ms}}와 카운터를 반환합니다. (백분위수는 표본 기준)"""
+        stages = {}
+        for stage, durations in self.durations.items():
+            ordered = sorted(durations.samples)
+            stages[stage] = {
+                'count': durations.count,
+                'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+                'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+                'mean_ms': round(durations.total / durations.count * 1000, 3),
+                'max_ms': round(durations.max * 1000, 3),
+            }
+        return {'stages': stages, 'counters': dict(self.counters)}
+
+
+def percentile(ordered_values, pct):
+    """정렬된 값에서 nearest-rank 방식의 백분위수를 구합니다."""
+    if not ordered_values:
+        return 0.0
+    rank = max(1, -(-len(ordered_values) * pct // 100))  # ceil
+    return ordered_values[int(rank) - 1]
+
+
+metrics = StageMetrics()
@@ -1,30 +1,103 @@
 import asyncio
+import hashlib
+
 import httpx
-from google.cloud import vision
 
-def ocr_sync_task(image_content):
-    """(동기) 이미지 내용으로 OCR을 실행하는 작업"""
-    client = vision.ImageAnnotatorClient()
-    image = vision.Image(content=image_content)
-    response = client.document_text_detection(image=image)
-    if response.error.message:
-        raise Exception(response.error.message)
-    return response.full_text_annotation.text
+from crawler.metrics import metrics
+from crawler.ocr_cache import OcrCache
+from crawler.ocr_engines import create_ocr_engine
+
+IMAGE_DOWNLOAD_CONNECTIONS = 20
+
+
+class OcrService:
+    """OCR 엔진과 이미지 다운로드용 HTTP 클라이언트를 한 번만 만들어 재사용하는 OCR 서비스
+
+    `engine`을 넘기지 않으면 OCR_ENGINE 설정(vision / tesseract / cascade)에 따라 엔진을 만듭니다.
+    """
+
+    def __init__(self, engine=None, cache: OcrCache = None, http_client: httpx.AsyncClient = None):
+        self.engine = engine or create_ocr_engine()
+        self.cache = cache or OcrCache()
+        self._owns_http = http_client is None  # 넘겨받은 공용 클라이언트는 만든 쪽에서 닫습니다.
+        self._http = http_client or httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=IMAGE_DOWNLOAD_CONNECTIONS,
+                                max_keepalive_connections=IMAGE_DOWNLOAD_CONNECTIONS),
+        )
+        self._inflight = {}  # sha256 -> 진행 중인 OCR Task (같은 이미지를 동시에 두 번 보내지 않도록)
+
+    async def ocr_image_bytes(self, image_content):
+        with metrics.timer('ocr'):
+            result = await self.engine.recognize(image_content)
+        metrics.count('ocr_calls')
+        return result.text
+
+    async def get_text(self, image_uri):
+        """이미지 URI에서 OCR 텍스트를 추출합니다. (URL/이미지 해시 캐시 우선)"""
+        engine_key = self.engine.cache_key
+        cached_text = self.cache.get_by_url(image_uri, engine_key)
+        if cached_text is not None:
+            return cached_text
+
+        with metrics.timer('image_fetch'):
+            response = await self._http.get(image_uri)
+        metrics.count('requests')
+        response.raise_for_status()
+        image_content = response.content
+
+        digest = hashlib.sha256(image_content).hexdigest()
+        cached_text = self.cache.get(digest, engine_key, image_uri)
+        if cached_text is not None:
+            return cached_text
+
+        task = self._inflight.get(digest)
+        if task is None:
+            task = asyncio.ensure_future(self.ocr_image_bytes(image_content))
+            self._inflight[digest] = task
+            try:
+                extracted_text = await asyncio.shield(task)
+                self.cache.put(digest, extracted_text, engine_key, image_uri)
+            finally:
+                self._inflight.pop(digest, None)
+            return extracted_text
+        return await asyncio.shield(task)
+
+    async def aclose(self):
+        if self._owns_http:
+            await self._http.aclose()
+        await self.engine.aclose()
+        self.cache.close()
+
+
+_ocr_service = None
+
+def get_ocr_service():
+    """프로세스 전체가 공유하는 OCR 서비스를 반환합니다."""
+    global _ocr_service
+    if _ocr_service is None:
+        _ocr_service = OcrService()
+    return _ocr_service
+
+def set_ocr_service(service: OcrService):
+    """공유 OCR 서비스를 교체합니다. (녹화 재생/벤치마크용 전송 계층, 가짜 엔진 등)"""
+    global _ocr_service
+    _ocr_service = service
+
+async def close_ocr_service():
+    global _ocr_service
+    if _ocr_service is not None:
+        await _ocr_service.aclose()
+        _ocr_service = None
+
+def get_ocr_cache():
+    """공유 OCR 서비스의 결과 캐시를 반환합니다."""
+    return get_ocr_service().cache
 
 async def get_ocr_text_from_image(image_uri):
     """이미지 URI에서 OCR 텍스트를 추출하는 비동기 함수"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(image_uri)
-            response.raise_for_status()
-            image_content = response.content
-        
-        loop = asyncio.get_running_loop()
-        extracted_text = await loop.run_in_executor(None, ocr_sync_task, image_content)
-        return extracted_text
+        return await get_ocr_service().get_text(image_uri)
     except Exception as e:
         print(f"❌ OCR 처리 중 오류: {e}")
         return ""
-    
-
-    
\ No newline at end of file
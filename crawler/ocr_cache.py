@@ -0,0 +1,131 @@
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+
+# 같은 배너/템플릿 이미지가 여러 공고와 여러 날에 걸쳐 반복되므로 OCR 결과를 캐시합니다.
+# 결과는 OCR 엔진 키(OcrEngine.cache_key: 이름 + 버전)별로 따로 저장해, 엔진을 바꾸면 이전 엔진의 결과를 쓰지 않습니다.
+OCR_CACHE_PATH = os.getenv("OCR_CACHE_PATH", "data/ocr_cache.sqlite3")
+OCR_CACHE_MAX_BYTES = int(os.getenv("OCR_CACHE_MAX_BYTES", 256 * 1024 * 1024))  # 디스크 계층 최대 크기
+OCR_CACHE_MEMORY_ITEMS = 4096  # 프로세스 내 계층 최대 항목 수
+
+
+class OcrCache:
+    """이미지 URL과 이미지 바이트 sha256으로 찾는 2계층(메모리 + 디스크) OCR 결과 캐시
+
+    - 결과는 (엔진 키, sha256)으로 찾습니다. URL → sha256 매핑은 엔진과 무관하므로 같이 씁니다.
+    - URL로 찾으면 이미지 다운로드까지 건너뜁니다.
+    - URL이 달라도 이미지 내용(sha256)이 같으면 Vision 호출을 건너뜁니다.
+    - 디스크 계층은 마지막 사용 시각 기준 LRU로 `max_bytes` 이하를 유지합니다.
+    """
+
+    def __init__(self, path: str = OCR_CACHE_PATH, max_bytes: int = OCR_CACHE_MAX_BYTES,
+                 memory_items: int = OCR_CACHE_MEMORY_ITEMS):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self._texts = OrderedDict()  # (engine, sha256) -> text
+        self._urls = OrderedDict()   # url -> sha256
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+        self.conn = sqlite3.connect(path)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(ocr_text)")]
+        if columns and 'engine' not in columns:
+            # 엔진 구분이 없던 이전 형식: 어느 엔진의 결과인지 알 수 없으므로 버립니다.
+            self.conn.executescript("DROP TABLE ocr_text; DELETE FROM ocr_url;")
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS ocr_text ("
+            " engine TEXT NOT NULL, sha256 TEXT NOT NULL, text TEXT NOT NULL, size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL, PRIMARY KEY (engine, sha256));"
+            "CREATE INDEX IF NOT EXISTS ocr_text_last_access ON ocr_text (last_access);"
+            "CREATE TABLE IF NOT EXISTS ocr_url (url TEXT PRIMARY KEY, sha256 TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS ocr_url_sha256 ON ocr_url (sha256);"
+        )
+        self._disk_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_text").fetchone()[0]
+
+    def _remember(self, engine, url, digest, text):
+        self._texts[engine, digest] = text
+        self._texts.move_to_end((engine, digest))
+        if url:
+            self._urls[url] = digest
+            self._urls.move_to_end(url)
+        while len(self._texts) > self.memory_items:
+            self._texts.popitem(last=False)
+        while len(self._urls) > self.memory_items:
+            self._urls.popitem(last=False)
+
+    def _lookup(self, engine, digest, url=None):
+        if (engine, digest) in self._texts:
+            self._texts.move_to_end((engine, digest))
+            self.stats['memory_hits'] += 1
+            return self._texts[engine, digest]
+        row = self.conn.execute("SELECT text FROM ocr_text WHERE engine = ? AND sha256 = ?",
+                                (engine, digest)).fetchone()
+        if row is None:
+            return None
+        self.conn.execute("UPDATE ocr_text SET last_access = ? WHERE engine = ? AND sha256 = ?",
+                          (time.time(), engine, digest))
+        self.conn.commit()
+        self.stats['disk_hits'] += 1
+        self._remember(engine, url, digest, row[0])
+        return row[0]
+
+    def get_by_url(self, url: str, engine: str):
+        """URL로 `engine`의 이전 OCR 결과를 찾습니다. 없으면 None (통계는 해시 조회에서 집계합니다)."""
+        digest = self._urls.get(url)
+        if digest is None:
+            row = self.conn.execute("SELECT sha256 FROM ocr_url WHERE url = ?", (url,)).fetchone()
+            digest = row[0] if row else None
+        if digest is None:
+            return None
+        return self._lookup(engine, digest, url)
+
+    def get(self, digest: str, engine: str, url: str = None):
+        """이미지 바이트의 sha256으로 `engine`의 OCR 결과를 찾습니다. 없으면 None."""
+        text = self._lookup(engine, digest, url)
+        if text is None:
+            self.stats['misses'] += 1
+        elif url:
+            self.conn.execute("INSERT OR REPLACE INTO ocr_url (url, sha256) VALUES (?, ?)", (url, digest))
+            self.conn.commit()
+        return text
+
+    def put(self, digest: str, text: str, engine: str, url: str = None):
+        size = len(text.encode('utf-8'))
+        old = self.conn.execute("SELECT size FROM ocr_text WHERE engine = ? AND sha256 = ?",
+                                (engine, digest)).fetchone()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO ocr_text (engine, sha256, text, size, last_access) VALUES (?, ?, ?, ?, ?)",
+            (engine, digest, text, size, time.time()),
+        )
+        if url:
+            self.conn.execute("INSERT OR REPLACE INTO ocr_url (url, sha256) VALUES (?, ?)", (url, digest))
+        self._disk_bytes += size - (old[0] if old else 0)
+        self._evict()
+        self.conn.commit()
+        self._remember(engine, url, digest, text)
+
+    def _evict(self):
+        while self._disk_bytes > self.max_bytes:
+            rows = self.conn.execute(
+                "SELECT engine, sha256, size FROM ocr_text ORDER BY last_access LIMIT 100").fetchall()
+            if not rows:
+                break
+            for engine, digest, size in rows:
+                self.conn.execute("DELETE FROM ocr_text WHERE engine = ? AND sha256 = ?", (engine, digest))
+                self.conn.execute("DELETE FROM ocr_url WHERE sha256 = ? AND NOT EXISTS "
+                                  "(SELECT 1 FROM ocr_text WHERE sha256 = ?)", (digest, digest))
+                self._disk_bytes -= size
+                if self._disk_bytes <= self.max_bytes:
+                    break
+
+    def summary(self) -> str:
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        total = hits + self.stats['misses']
+        ratio = hits / total * 100 if total else 0.0
+        return (f"OCR 캐시: 적중 {hits}회 (메모리 {self.stats['memory_hits']}, 디스크 {self.stats['disk_hits']}), "
+                f"미스 {self.stats['misses']}회, 적중률 {ratio:.1f}%")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,308 @@
+import asyncio
+import io
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# google-cloud-vision, pytesseract, Pillow는 해당 엔진을 쓸 때만 import합니다. (설치되지 않은 환경에서도 나머지를 쓸 수 있게)
+
+# 사용할 OCR 엔진: vision / tesseract / cascade(Tesseract 우선, 신뢰도가 낮으면 Vision) / fake(오프라인 대역)
+OCR_ENGINE = os.getenv("OCR_ENGINE", "vision")
+OCR_MAX_WORKERS = int(os.getenv("OCR_MAX_WORKERS", 8))            # Vision 호출 전용 스레드 수
+OCR_CONCURRENCY_LIMIT = int(os.getenv("OCR_CONCURRENCY_LIMIT", 8))  # 동시에 진행할 OCR 호출 수 상한
+
+# 배치 모드: 여러 공고의 이미지를 모아 batch_annotate_images 한 번으로 보냅니다.
+OCR_BATCH_MODE = os.getenv("OCR_BATCH_MODE", "0") == "1"
+VISION_BATCH_MAX_IMAGES = 16             # batch_annotate_images 요청당 이미지 한도
+VISION_BATCH_MAX_BYTES = 8 * 1024 * 1024  # 요청 크기 한도(10MB) 아래로 유지
+VISION_BATCH_MAX_WAIT = 0.2              # 배치를 채우기 위해 기다리는 최대 시간(초)
+
+# Tesseract 설정 (Dockerfile에서 tesseract-ocr-kor/eng 설치)
+TESSERACT_LANG = "kor+eng"
+TESSERACT_WORKERS = int(os.getenv("TESSERACT_WORKERS", os.cpu_count() or 1))
+TESSERACT_MAX_WIDTH = 1600    # 이보다 넓은 배너는 비율을 유지한 채 축소
+TESSERACT_TILE_HEIGHT = 2000  # 이보다 훨씬 긴 이미지는 타일로 잘라서 인식
+TESSERACT_TILE_OVERLAP = 60   # 타일 경계에 걸친 글자를 놓치지 않도록 겹치는 높이
+CASCADE_MIN_CONFIDENCE = float(os.getenv("CASCADE_MIN_CONFIDENCE", 0.6))
+CASCADE_MIN_CHARS = 20
+# OCR 캐시 키에 들어가는 엔진 버전. 인식 방식이나 전처리를 바꾸면 올려서 이전 결과를 쓰지 않게 합니다.
+VISION_ENGINE_VERSION = "document_text_detection-1"
+TESSERACT_ENGINE_VERSION = "1"
+
+OcrResult = namedtuple('OcrResult', ['text', 'confidence'])
+
+
+def vision_request(content):
+    """이미지 한 장의 DOCUMENT_TEXT_DETECTION 요청"""
+    from google.cloud import vision
+
+    feature = vision.Feature(type_=vision.Feature.Type.DOCUMENT_TEXT_DETECTION)
+    return vision.AnnotateImageRequest(image=vision.Image(content=content), features=[feature])
+
+
+class VisionBatcher:
+    """시간/크기 제한이 있는 마이크로 배치로 이미지를 모아 Vision 배치 API로 보내는 도우미
+
+    `submit`을 호출한 쪽은 자기 이미지의 결과만 돌려받습니다. 배치는 이미지 수나 바이트 한도에
+    도달하거나, 첫 이미지가 들어온 뒤 `max_wait`초가 지나면 전송됩니다.
+    """
+
+    def __init__(self, get_client, executor, semaphore, max_images: int = VISION_BATCH_MAX_IMAGES,
+                 max_bytes: int = VISION_BATCH_MAX_BYTES, max_wait: float = VISION_BATCH_MAX_WAIT,
+                 make_request=vision_request):
+        self._get_client = get_client
+        self._make_request = make_request  # 이미지 바이트 → AnnotateImageRequest
+        self._executor = executor
+        self._semaphore = semaphore  # 동시에 진행할 배치 요청 수 상한
+        self.max_images = max_images
+        self.max_bytes = max_bytes
+        self.max_wait = max_wait
+        self._pending = []
+        self._pending_bytes = 0
+        self._timer = None
+        self._sending = set()
+        self.batches_sent = 0
+
+    async def submit(self, image_content):
+        loop = asyncio.get_running_loop()
+        if self._pending and self._pending_bytes + len(image_content) > self.max_bytes:
+            self._flush()
+        future = loop.create_future()
+        self._pending.append((image_content, future))
+        self._pending_bytes += len(image_content)
+        if len(self._pending) >= self.max_images or self._pending_bytes >= self.max_bytes:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending, self._pending_bytes = self._pending, [], 0
+        task = asyncio.ensure_future(self._send(batch))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    def _annotate(self, contents):
+        """(동기) 이미지 여러 장을 한 번의 batch_annotate_images 요청으로 OCR합니다."""
+        requests = [self._make_request(content) for content in contents]
+        return self._get_client().batch_annotate_images(requests=requests).responses
+
+    async def _send(self, batch):
+        try:
+            async with self._semaphore:
+                loop = asyncio.get_running_loop()
+                responses = await loop.run_in_executor(self._executor, self._annotate, [c for c, _ in batch])
+            self.batches_sent += 1
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), response in zip(batch, responses):
+            if future.done():
+                continue
+            if response.error.message:
+                future.set_exception(Exception(response.error.message))
+            else:
+                future.set_result(response.full_text_annotation.text)
+
+
+class OcrEngine:
+    """OCR 백엔드 인터페이스. `recognize`는 이미지 바이트를 받아 OcrResult를 반환합니다."""
+    name = "base"
+    version = "0"
+
+    @property
+    def cache_key(self) -> str:
+        """OCR 캐시에서 결과를 나누는 키 (엔진 이름 + 버전). 엔진이 다르면 같은 이미지라도 결과를 공유하지 않습니다."""
+        return f"{self.name}:{self.version}"
+
+    async def recognize(self, image_content) -> OcrResult:
+        raise NotImplementedError
+
+    async def aclose(self):
+        pass
+
+
+class VisionEngine(OcrEngine):
+    """Google Vision 엔진. 클라이언트와 스레드 풀은 한 번만 만들고, 선택적으로 배치 API를 사용합니다."""
+    name = "vision"
+
+    def __init__(self, vision_client=None, max_workers: int = OCR_MAX_WORKERS,
+                 concurrency: int = OCR_CONCURRENCY_LIMIT, batch_mode: bool = OCR_BATCH_MODE,
+                 version: str = VISION_ENGINE_VERSION, make_request=vision_request):
+        self.version = version
+        self._vision_client = vision_client
+        self._make_request = make_request  # 이미지 바이트 → AnnotateImageRequest (대역 클라이언트는 SDK 없이 만든 요청)
+        self._vision_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ocr")
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.batcher = VisionBatcher(lambda: self.vision_client, self._executor, self._semaphore,
+                                     make_request=make_request) if batch_mode else None
+
+    @property
+    def vision_client(self):
+        # gRPC 채널과 인증 정보는 처음 필요할 때 한 번만 만듭니다.
+        if self._vision_client is None:
+            with self._vision_lock:
+                if self._vision_client is None:
+                    from google.cloud import vision
+
+                    self._vision_client = vision.ImageAnnotatorClient()
+        return self._vision_client
+
+    def _detect_text(self, image_content):
+        """(동기) 이미지 내용으로 OCR을 실행하는 작업"""
+        image = self._make_request(image_content).image
+        response = self.vision_client.document_text_detection(image=image)
+        if response.error.message:
+            raise Exception(response.error.message)
+        return response.full_text_annotation.text
+
+    async def recognize(self, image_content):
+        """전용 스레드 풀에서 OCR을 실행합니다. 동시 호출(배치 모드에서는 배치 요청) 수는 `concurrency`로 제한됩니다."""
+        if self.batcher is not None:
+            return OcrResult(await self.batcher.submit(image_content), 1.0)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            text = await loop.run_in_executor(self._executor, self._detect_text, image_content)
+        return OcrResult(text, 1.0)
+
+    async def aclose(self):
+        self._executor.shutdown(wait=False)
+
+
+def preprocess_image(image_content, max_width: int = TESSERACT_MAX_WIDTH,
+                     tile_height: int = TESSERACT_TILE_HEIGHT, overlap: int = TESSERACT_TILE_OVERLAP):
+    """흑백 변환, 큰 배너 축소, 긴 이미지 타일 분할을 거친 PIL 이미지 목록을 반환합니다."""
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(image_content))
+    image = image.convert('L')
+    if image.width > max_width:
+        height = max(1, round(image.height * max_width / image.width))
+        image = image.resize((max_width, height), Image.LANCZOS)
+    if image.height <= tile_height * 1.5:
+        return [image]
+
+    tiles = []
+    top = 0
+    while top < image.height:
+        bottom = min(top + tile_height, image.height)
+        tiles.append(image.crop((0, top, image.width, bottom)))
+        if bottom == image.height:
+            break
+        top = bottom - overlap
+    return tiles
+
+
+def tesseract_task(image_content, lang: str = TESSERACT_LANG):
+    """(프로세스 풀) 전처리한 타일마다 Tesseract를 돌려 (텍스트, 평균 단어 신뢰도)를 반환합니다."""
+    import pytesseract
+
+    lines = []
+    confidences = []
+    for tile in preprocess_image(image_content):
+        data = pytesseract.image_to_data(tile, lang=lang, output_type=pytesseract.Output.DICT)
+        current_key, words = None, []
+        for i, word in enumerate(data['text']):
+            conf = float(data['conf'][i])
+            if conf < 0 or not word.strip():
+                continue
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            if key != current_key and words:
+                lines.append(' '.join(words))
+                words = []
+            current_key = key
+            words.append(word.strip())
+            confidences.append(conf)
+        if words:
+            lines.append(' '.join(words))
+    confidence = sum(confidences) / len(confidences) / 100 if confidences else 0.0
+    return '\n'.join(lines), confidence
+
+
+class TesseractEngine(OcrEngine):
+    """로컬 CPU로 OCR하는 Tesseract 엔진. 코어 수만큼의 프로세스 풀에서 실행합니다."""
+    name = "tesseract"
+
+    def __init__(self, workers: int = TESSERACT_WORKERS, lang: str = TESSERACT_LANG):
+        self.lang = lang
+        self._version = None
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+        self._semaphore = asyncio.Semaphore(workers * 2)  # 프로세스 풀 큐에 이미지가 과하게 쌓이지 않도록
+
+    @property
+    def version(self) -> str:
+        """언어, 전처리 설정, 설치된 tesseract 버전을 합친 값"""
+        if self._version is None:
+            try:
+                import pytesseract
+
+                binary = str(pytesseract.get_tesseract_version())
+            except Exception:
+                binary = "unknown"
+            self._version = (f"{TESSERACT_ENGINE_VERSION}-{self.lang}-{binary}-"
+                             f"w{TESSERACT_MAX_WIDTH}-t{TESSERACT_TILE_HEIGHT}-{TESSERACT_TILE_OVERLAP}")
+        return self._version
+
+    async def recognize(self, image_content):
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            text, confidence = await loop.run_in_executor(self._executor, tesseract_task, image_content, self.lang)
+        return OcrResult(text, confidence)
+
+    async def aclose(self):
+        self._executor.shutdown(wait=False)
+
+
+class CascadeEngine(OcrEngine):
+    """먼저 `primary`(Tesseract)로 인식하고, 신뢰도가 낮거나 글자가 거의 없으면 `fallback`(Vision)을 호출합니다."""
+    name = "cascade"
+
+    def __init__(self, primary: OcrEngine, fallback: OcrEngine,
+                 min_confidence: float = CASCADE_MIN_CONFIDENCE, min_chars: int = CASCADE_MIN_CHARS):
+        self.primary = primary
+        self.fallback = fallback
+        self.min_confidence = min_confidence
+        self.min_chars = min_chars
+        self.stats = {'primary': 0, 'fallback': 0}
+
+    @property
+    def version(self) -> str:
+        return f"{self.primary.cache_key}|{self.fallback.cache_key}|{self.min_confidence}|{self.min_chars}"
+
+    async def recognize(self, image_content):
+        try:
+            result = await self.primary.recognize(image_content)
+            if result.confidence >= self.min_confidence and len(result.text.strip()) >= self.min_chars:
+                self.stats['primary'] += 1
+                return result
+        except Exception as e:
+            print(f"❌ {self.primary.name} OCR 실패, {self.fallback.name}로 재시도: {e}")
+        self.stats['fallback'] += 1
+        return await self.fallback.recognize(image_content)
+
+    async def aclose(self):
+        await self.primary.aclose()
+        await self.fallback.aclose()
+
+
+def create_ocr_engine(name: str = OCR_ENGINE) -> OcrEngine:
+    """설정 이름으로 OCR 엔진을 만듭니다."""
+    if name == "vision":
+        return VisionEngine()
+    if name == "tesseract":
+        return TesseractEngine()
+    if name == "cascade":
+        return CascadeEngine(TesseractEngine(), VisionEngine())
+    if name == "fake":
+        from crawler.testing import FakeVisionClient, fake_vision_request
+        return VisionEngine(vision_client=FakeVisionClient(), version="fake", make_request=fake_vision_request)
+    raise ValueError(f"알 수 없는 OCR 엔진입니다: {name}")
@@ -0,0 +1,278 @@
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import httpx
+
+from crawler.metrics import metrics
+
+# 사람인 요청 스케줄러 설정
+# 호스트마다 토큰 버킷(속도) + AIMD 동시성 한도 + 회로 차단기를 두고, 일시적인 실패는 지터를 섞은 지수 백오프로 재시도합니다.
+# 응답이 건강하면 한도를 조금씩 늘리고(가산 증가), 429/5xx/타임아웃/지연 급증이면 절반으로 줄입니다(승산 감소).
+RETRY_MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+TOKEN_BUCKET_BURST_SECONDS = 0.5  # 버킷에 쌓아 둘 수 있는 토큰 = 초당 요청 수 × 이 값
+LATENCY_SPIKE_FACTOR = 3.0        # 평소(EWMA) 응답 시간의 이 배수를 넘으면 혼잡으로 봅니다.
+LATENCY_SPIKE_MIN = 2.0           # 단, 이 시간(초) 이하는 급증으로 보지 않음
+DECREASE_COOLDOWN = 1.0           # 혼잡 신호가 몰려 와도 이 간격(초) 안에서는 한 번만 줄입니다.
+CIRCUIT_FAILURE_THRESHOLD = 5     # 연속 실패가 이만큼이면 회로를 엽니다.
+CIRCUIT_RESET_SECONDS = 10.0      # 열린 뒤 이 시간이 지나면 요청 한 건으로 회복 여부를 확인합니다.
+CIRCUIT_MAX_OPEN_SECONDS = 120.0  # 회복하지 못한 채 이 시간이 지나면 기다리던 요청을 실패시킵니다. (회복 확인은 계속)
+
+
+class TokenBucket:
+    """초당 `rate`개씩 토큰이 차고 `burst`개까지 쌓이는 비동기 토큰 버킷 (rate가 0 이하면 제한 없음)"""
+
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate * TOKEN_BUCKET_BURST_SECONDS)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()  # 기다리는 요청은 도착 순서대로 토큰을 받습니다.
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AimdLimiter:
+    """AIMD 동시 요청 한도: 성공마다 +1/한도(한도만큼 성공하면 +1), 혼잡 신호마다 절반"""
+
+    def __init__(self, maximum: int, minimum: int = 1, initial: int = None):
+        self.maximum = max(minimum, maximum)
+        self.minimum = minimum
+        self.limit = float(initial or max(minimum, self.maximum // 2))
+        self.inflight = 0
+        self.decreases = 0
+        self._latency = None  # 응답 시간 EWMA
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.inflight < int(self.limit))
+            self.inflight += 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self.inflight -= 1
+                self._cond.notify_all()
+
+    def on_success(self, latency: float):
+        if self._latency is not None and latency > max(LATENCY_SPIKE_MIN, LATENCY_SPIKE_FACTOR * self._latency):
+            self.on_congestion()
+            return
+        self._latency = latency if self._latency is None else 0.9 * self._latency + 0.1 * latency
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def on_congestion(self):
+        now = time.monotonic()
+        if now - self._last_decrease < DECREASE_COOLDOWN:
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit / 2)
+        self.decreases += 1
+
+
+class CircuitOpenError(Exception):
+    """회로가 `max_open_seconds`보다 오래 열려 있어 요청을 보내지 않고 실패시킬 때 발생합니다."""
+
+
+class CircuitBreaker:
+    """연속 실패가 `threshold`번이면 회로를 열어 `reset_seconds` 동안 요청을 멈추고, 이후 한 건(probe)으로 회복을 확인합니다.
+
+    열린 동안 요청은 실패하지 않고 기다리므로, 사이트가 잠시 내려가도 페이지를 잃지 않습니다.
+    단, 처음 열린 뒤 `max_open_seconds`가 지나도록 회복하지 못하면 기다리는 요청은 CircuitOpenError로 실패합니다.
+    (호출한 쪽의 연속 실패 중단이 동작하도록. 회복 확인 요청은 계속 `reset_seconds`마다 한 건씩 보냅니다.)
+    """
+
+    def __init__(self, name: str, threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_seconds: float = CIRCUIT_RESET_SECONDS,
+                 max_open_seconds: float = CIRCUIT_MAX_OPEN_SECONDS):
+        self.name = name
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.max_open_seconds = max_open_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.first_opened_at = None  # 마지막으로 닫힌 뒤 처음 열린 시각
+        self.opens = 0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self._probing else "open"
+
+    async def wait(self) -> bool:
+        """요청을 보내도 될 때까지 기다립니다. 회복 확인용 요청이면 True
+
+        회로가 `max_open_seconds`보다 오래 열려 있으면 회복 확인 차례가 아닌 요청은 CircuitOpenError를 냅니다.
+        """
+        while self.opened_at is not None:
+            now = time.monotonic()
+            remaining = self.opened_at + self.reset_seconds - now
+            if remaining <= 0 and not self._probing:
+                self._probing = True
+                return True
+            if now - self.first_opened_at >= self.max_open_seconds:
+                raise CircuitOpenError(f"{self.name} 회로가 {now - self.first_opened_at:.0f}초째 열려 있습니다.")
+            await asyncio.sleep(max(remaining, 0.05))
+        return False
+
+    def record_success(self):
+        if self.opened_at is not None:
+            print(f"✅ {self.name} 회로 닫힘 (요청 재개)")
+        self.failures = 0
+        self.opened_at = None
+        self.first_opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probing or (self.opened_at is None and self.failures >= self.threshold):
+            if not self._probing:
+                print(f"🚧 {self.name} 연속 실패 {self.failures}회: {self.reset_seconds:.0f}초 동안 요청을 멈춥니다.")
+            self.opened_at = time.monotonic()
+            if self.first_opened_at is None:
+                self.first_opened_at = self.opened_at
+            self._probing = False
+            self.opens += 1
+
+    def abort_probe(self):
+        """회복 확인 요청이 결과 없이 끝났을 때(취소 등) 다른 요청이 확인할 수 있게 합니다."""
+        self._probing = False
+
+
+class HostScheduler:
+    """호스트 하나의 토큰 버킷 + AIMD 동시성 + 회로 차단기. 속도는 동시성 한도와 같은 비율로 오르내립니다."""
+
+    def __init__(self, host: str, concurrency: int, rate: float):
+        self.max_rate = rate
+        self.limiter = AimdLimiter(concurrency)
+        self.bucket = TokenBucket(self._rate())
+        self.breaker = CircuitBreaker(host)
+
+    def _rate(self) -> float:
+        if self.max_rate <= 0:
+            return 0.0
+        return self.max_rate * self.limiter.limit / self.limiter.maximum
+
+    def on_success(self, latency: float):
+        self.limiter.on_success(latency)
+        self.breaker.record_success()
+        self.bucket.rate = self._rate()
+
+    def on_failure(self, response):
+        self.limiter.on_congestion()
+        if response is not None and response.status_code == 429:
+            self.breaker.record_success()  # 속도 제한 응답은 서버가 살아 있다는 뜻입니다.
+        else:
+            self.breaker.record_failure()
+        self.bucket.rate = self._rate()
+
+
+def _retry_after(response) -> float:
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return 0.0
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return 0.0
+
+
+class RequestScheduler:
+    """호스트별 HostScheduler를 거쳐 요청을 보내고, 일시적인 실패(429/5xx/타임아웃/연결 오류)는 재시도합니다."""
+
+    def __init__(self, concurrency: int, rate: float, max_attempts: int = RETRY_MAX_ATTEMPTS):
+        self.concurrency = concurrency
+        self.rate = rate
+        self.max_attempts = max_attempts
+        self.hosts = {}
+
+    def host(self, url) -> HostScheduler:
+        name = urlsplit(str(url)).netloc
+        if name not in self.hosts:
+            self.hosts[name] = HostScheduler(name, self.concurrency, self.rate)
+        return self.hosts[name]
+
+    async def request(self, client: httpx.AsyncClient, method: str, url: str, **kwargs) -> httpx.Response:
+        """응답을 반환합니다. 재시도할 수 없는 4xx는 그대로 돌려주고, 재시도를 모두 실패하면 마지막 오류를 올립니다.
+
+        호스트 회로가 너무 오래 열려 있으면 CircuitOpenError를 올립니다.
+        """
+        host = self.host(url)
+        for attempt in range(1, self.max_attempts + 1):
+            probe = await host.breaker.wait()
+            response, error = None, None
+            try:
+                async with host.limiter.slot():
+                    await host.bucket.acquire()
+                    start = time.monotonic()
+                    try:
+                        response = await client.request(method, url, **kwargs)
+                    except httpx.TransportError as e:  # 타임아웃, 연결 끊김 등
+                        error = e
+                    latency = time.monotonic() - start
+            except BaseException:
+                if probe:
+                    host.breaker.abort_probe()
+                raise
+            metrics.count('requests')
+
+            if error is None and response.status_code not in RETRY_STATUS:
+                host.on_success(latency)
+                return response
+
+            host.on_failure(response)
+            reason = f"HTTP {response.status_code}" if error is None else f"{type(error).__name__}: {error}"
+            if attempt == self.max_attempts:
+                if error is not None:
+                    raise error
+                response.raise_for_status()
+            delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1) * (0.5 + random.random()))
+            delay = max(delay, min(RETRY_MAX_DELAY, _retry_after(response)))
+            metrics.count('retries')
+            print(f"⚠️ {urlsplit(str(url)).path} 요청 실패 ({reason}), {delay:.1f}초 후 재시도 ({attempt}/{self.max_attempts})")
+            await asyncio.sleep(delay)
+
+
+class RequestBudget:
+    """키워드 전체가 공유하는 동시 작업 수 / 요청 스케줄러 예산
+
+    `concurrency`와 `rate`는 상한입니다. 실제 동시 요청 수와 초당 요청 수는 응답 상태에 따라 그 아래에서 조절됩니다.
+    """
+
+    def __init__(self, concurrency: int, rate: float):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.scheduler = RequestScheduler(concurrency, rate)
+
+    async def get(self, client: httpx.AsyncClient, url: str, **kwargs) -> httpx.Response:
+        """속도/동시성 제한과 재시도를 거쳐 GET 요청을 보냅니다."""
+        return await self.scheduler.request(client, "GET", url, **kwargs)
+
+    @asynccontextmanager
+    async def slot(self):
+        """동시 작업 한 자리를 차지합니다. (상세 수집 + OCR 단위)"""
+        async with self.semaphore:
+            yield
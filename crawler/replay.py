@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+import threading
+
+import httpx
+
+# 사람인 응답(HTML/이미지)을 디스크에 녹화하고 그대로 재생하는 httpx 전송 계층
+# 녹화: CRAWL_MODE=record REPLAY_DIR=... python -m crawler.main
+# 재생: CRAWL_MODE=replay REPLAY_DIR=... OCR_ENGINE=fake STORAGE_URI=./out python -m crawler.main
+
+INDEX_FILENAME = "index.jsonl"
+
+
+def request_key(request: httpx.Request) -> str:
+    """메서드 + 쿼리 파라미터를 정렬한 URL로 요청을 식별합니다."""
+    url = request.url.copy_with(query=None)
+    params = sorted(request.url.params.multi_items())
+    query = "&".join(f"{k}={v}" for k, v in params)
+    return f"{request.method} {url}?{query}" if query else f"{request.method} {url}"
+
+
+def _body_filename(key: str) -> str:
+    return hashlib.sha1(key.encode("utf-8")).hexdigest() + ".body"
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """실제 전송 계층을 감싸 응답 본문과 상태 코드를 디렉터리에 저장합니다."""
+
+    def __init__(self, directory: str, inner: httpx.AsyncBaseTransport = None):
+        self.directory = directory
+        self.inner = inner or httpx.AsyncHTTPTransport()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    async def handle_async_request(self, request):
+        response = await self.inner.handle_async_request(request)
+        content = await response.aread()
+        await response.aclose()
+
+        key = request_key(request)
+        filename = _body_filename(key)
+        with open(os.path.join(self.directory, filename), "wb") as f:
+            f.write(content)
+        entry = {
+            "key": key, "file": filename, "status": response.status_code,
+            "content_type": response.headers.get("content-type", ""),
+        }
+        with self._lock, open(os.path.join(self.directory, INDEX_FILENAME), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return httpx.Response(response.status_code, headers={"content-type": entry["content_type"]},
+                              content=content, request=request)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """녹화된 응답만으로 동작하는 전송 계층. 녹화에 없는 요청은 404를 돌려줍니다."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.entries = {}
+        self.misses = 0
+        with open(os.path.join(directory, INDEX_FILENAME), encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.entries[entry["key"]] = entry  # 같은 요청을 여러 번 녹화했다면 마지막 응답 사용
+
+    async def handle_async_request(self, request):
+        entry = self.entries.get(request_key(request))
+        if entry is None:
+            self.misses += 1
+            return httpx.Response(404, content=b"not recorded", request=request)
+        with open(os.path.join(self.directory, entry["file"]), "rb") as f:
+            content = f.read()
+        return httpx.Response(entry["status"], headers={"content-type": entry["content_type"]},
+                              content=content, request=request)
+
+
+def create_transport(mode: str, directory: str = None, inner: httpx.AsyncBaseTransport = None):
+    """CRAWL_MODE(live / record / replay)에 맞는 httpx 전송 계층을 만듭니다. live면 None.
+
+    녹화 모드는 `inner`(없으면 기본 전송 계층)로 실제 요청을 보냅니다.
+    """
+    if mode == "record":
+        return RecordingTransport(directory, inner)
+    if mode == "replay":
+        return ReplayTransport(directory)
+    return None
@@ -1,152 +1,287 @@
 import asyncio
 import httpx
-from bs4 import BeautifulSoup
-from datetime import datetime
+from datetime import datetime, timedelta
 import re
 
+from crawler.http_client import create_http_client
+from crawler.metrics import metrics
 from crawler.ocr import get_ocr_text_from_image
+from crawler.scrapers.saramin_parser import extract_listing_items, extract_detail_content
+from crawler.ratelimit import RequestBudget
+from crawler.seen_index import forget_seen, is_seen, mark_seen
 
 BASE_URL = "https://www.saramin.co.kr"
 DETAIL_URL_TEMPLATE = "https://www.saramin.co.kr/zf_user/jobs/relay/view-detail?rec_idx={}"
-CONCURRENT_REQUESTS_LIMIT = 10
+CONCURRENT_REQUESTS_LIMIT = 10  # 동시 요청 수 상한 (실제 한도는 응답 상태에 따라 그 아래에서 조절)
+REQUESTS_PER_SECOND = 10.0  # 전체 키워드가 공유하는 초당 요청 수 상한
+LISTING_MAX_CONSECUTIVE_FAILURES = 3  # 재시도 후에도 목록 페이지가 연달아 이만큼 실패하면 키워드를 중단
+PAGE_PREFETCH = 2          # 상세 수집 중 미리 받아둘 목록 페이지 수
+KEYWORD_CONCURRENCY = 4    # 동시에 크롤링할 키워드 수
+# 사람인 목록/상세 요청에만 붙이는 헤더 (OCR 이미지 호스트 등 다른 호스트에는 사람인 Referer를 보내지 않음)
+SARAMIN_HEADERS = {'Referer': f"{BASE_URL}/zf_user/search"}
+
+# 공고마다 반복 사용하는 정규식은 미리 컴파일합니다.
+BLANK_LINES_RE = re.compile(r'\n\s*\n+')
+BULLET_RE = re.compile(r'^\s*[■▶*]\s*')
+REC_IDX_RE = re.compile(r'rec_idx=(\d+)')
+POSTED_DATE_RE = re.compile(r'(\d{2}/\d{2}/\d{2})')
+DEADLINE_MD_RE = re.compile(r'~(\d{2})/(\d{2})')
+DEADLINE_DAYS_LEFT_RE = re.compile(r'D-(\d+)')
+# 실행 날짜 기준 문구는 절대 날짜로 바꿔 둬야 같은 공고의 마감일(과 지문)이 실행마다 달라지지 않습니다.
+RELATIVE_DEADLINE_DAYS = {'오늘마감': 0, '내일마감': 1}
 
 def preprocess_text(text):
     if not text:
         return ""
-    text = re.sub(r'\n\s*\n+', '\n', text)
+    text = BLANK_LINES_RE.sub('\n', text)
     lines = [line.strip() for line in text.split('\n') if line.strip()]
-    lines = [re.sub(r'^\s*[■▶*]\s*', '', line) for line in lines]
+    lines = [BULLET_RE.sub('', line) for line in lines]
     return '\n'.join(lines)
 
-async def get_job_detail(client, rec_idx):
+def normalize_image_sources(sources):
+    """본문 이미지 src 중 OCR 대상만 골라 절대 URL로 바꿉니다."""
+    images = []
+    for src in sources:
+        if not src or "drive.google.com" in src or src.startswith('data:image') or 'logo' in src or 'icon' in src:
+            continue
+        if not src.startswith('http'):
+            src = 'https:' + src if src.startswith('//') else BASE_URL + src
+        images.append(src)
+    return images
+
+async def get_job_detail(client, rec_idx, budget):
+    """상세 페이지에서 (본문, OCR 대상 이미지 URL 목록)을 가져옵니다. 재시도해도 실패하면 None을 반환합니다."""
     detail_url = DETAIL_URL_TEMPLATE.format(rec_idx)
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0',
-            'Referer': f'{BASE_URL}/zf_user/search'
-        }
-        response = await client.get(detail_url, headers=headers)
+        # User-Agent는 공용 클라이언트의 기본 헤더(crawler.http_client.DEFAULT_HEADERS)를 씁니다.
+        with metrics.timer('detail_fetch'):
+            response = await budget.get(client, detail_url, headers=SARAMIN_HEADERS)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        content_area = soup.select_one('.wrap_jv_cont') or soup.body
-        
+        with metrics.timer('detail_parse'):
+            raw_text, sources = extract_detail_content(response.text)
+
         cleaned_text = ""
         images = []
-        if content_area:
-            raw_text = content_area.get_text('\n', strip=True)
+        if raw_text is not None:
             cleaned_text = preprocess_text(raw_text)
+            images = normalize_image_sources(sources)
 
-            for img_tag in content_area.find_all('img'):
-                src = img_tag.get('src')
-                if "drive.google.com" in src or not src or src.startswith('data:image') or 'logo' in src or 'icon' in src:
-                    continue
-                if not src.startswith('http'):
-                    src = 'https:' + src if src.startswith('//') else BASE_URL + src
-                images.append(src)
-        
         return cleaned_text, images
     except Exception as e:
         print(f"상세 내용 수집 중 오류: {detail_url}, {e}")
-        return f"오류 발생: {e}", None
+        return None
 
-async def get_job_postings_on_page(client, page, semaphore, search_start_date, existing_rec_idx, search_keyword):
+async def fetch_listing_page(client, page, search_keyword, budget):
+    """검색 목록 페이지 HTML을 가져옵니다. 재시도해도 실패하면 None을 반환합니다."""
     search_url = f"{BASE_URL}/zf_user/search"
     params = {
         'search_area': 'main', 'page': 1, 'recruitPage': page,
         'recruitSort': 'reg_dt', 'recruitPageCount': 100, 'searchword': search_keyword
     }
-    jobs_on_page = []
-    should_stop = False
     try:
-        response = await client.get(search_url, params=params)
+        with metrics.timer('listing_fetch'):
+            response = await budget.get(client, search_url, params=params, headers=SARAMIN_HEADERS)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        job_listings = soup.select('.item_recruit')
-        if not job_listings:
-            return [], True
-
-        for job in job_listings:
-            title_element = job.select_one('.job_tit a')
-            link_href = title_element['href'] if title_element else ''
-            rec_idx_match = re.search(r'rec_idx=(\d+)', link_href)
-            if not rec_idx_match: continue
-            
-            rec_idx = rec_idx_match.group(1)
-            if rec_idx in existing_rec_idx: continue
-
-            content_element = job.select_one('.job_sector')
-            date_match = re.search(r'(\d{2}/\d{2}/\d{2})', content_element.text if content_element else '')
-            if not date_match: continue
-            
-            posted_date_str = "20" + date_match.group(1).replace('/', '-')
-            posted_date_obj = datetime.strptime(posted_date_str, '%Y-%m-%d')
-            if posted_date_obj < search_start_date:
-                should_stop = True
-                continue
-
-            conditions = [cond.text.strip() for cond in job.select('.job_condition span')]
-            deadline_raw = (job.select_one('.job_date .date') or BeautifulSoup("<span>상시채용</span>", "html.parser")).text.strip()
-            deadline = deadline_raw
-            if "채용시" not in deadline_raw and "상시" not in deadline_raw:
-                match_md = re.search(r'~(\d{2})/(\d{2})', deadline_raw)
-                if match_md:
-                    today = datetime.now()
-                    m, d = map(int, match_md.groups())
-                    year = today.year + 1 if m < today.month else today.year
-                    deadline = f"{year}/{m:02d}/{d:02d}"
-                elif "오늘마감" in deadline_raw:
-                    deadline = datetime.now().strftime('%Y/%m/%d')
-            
-            jobs_on_page.append({
-                'rec_idx': rec_idx, '제목': title_element.get('title', '제목 없음'),
-                '회사명': (job.select_one('.corp_name a') or BeautifulSoup("<a>회사명 없음</a>", "html.parser")).text.strip(),
-                '등록일': posted_date_str, '상세링크': BASE_URL + link_href,
-                '크롤링 시간': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                '지역': conditions[0] if len(conditions) > 0 else '',
-                '경력': conditions[1] if len(conditions) > 1 else '',
-                '고용형태': conditions[3] if len(conditions) > 3 else '',
-                '마감일': deadline,
-            })
-        
-        async def fetch_detail_with_semaphore(job_info):
-            async with semaphore:
-                detail_text, image_urls = await get_job_detail(client, job_info['rec_idx'])
-                if len(detail_text) < 100 and image_urls:
-                    print(f"✅ [{job_info['제목']}] 상세 내용이 짧아 OCR 시도")
-                    ocr_tasks = [get_ocr_text_from_image(url) for url in image_urls]
-                    ocr_results = await asyncio.gather(*ocr_tasks)
-                    ocr_texts = [preprocess_text(text) for text in ocr_results if text]
-                    if ocr_texts:
-                        detail_text += "\n\n--- OCR 결과 ---\n" + "\n\n".join(ocr_texts)
-                job_info['상세내용'] = detail_text
-                return job_info
-
-        tasks = [fetch_detail_with_semaphore(job) for job in jobs_on_page]
-        return [job for job in await asyncio.gather(*tasks) if job], should_stop
+        return response.text
     except Exception as e:
         print(f"페이지 {page} 처리 중 오류: {e}")
+        return None
+
+def parse_job_listings(html, search_start_date, existing_rec_idx):
+    """목록 페이지 HTML에서 공고 정보를 뽑아 (공고 목록, 중단 여부)를 반환합니다."""
+    jobs_on_page = []
+    should_stop = False
+    try:
+        with metrics.timer('listing_parse'):
+            job_listings = extract_listing_items(html)
+    except Exception as e:
+        print(f"목록 페이지 파싱 중 오류: {e}")
+        return [], True
+    if not job_listings:
         return [], True
 
+    now = datetime.now()
+    crawled_at = now.strftime('%Y-%m-%d %H:%M:%S')
+
+    for job in job_listings:
+        rec_idx_match = REC_IDX_RE.search(job['href'])
+        if not rec_idx_match: continue
+
+        rec_idx = rec_idx_match.group(1)
+
+        date_match = POSTED_DATE_RE.search(job['sector'])
+        if not date_match: continue
+
+        posted_date_str = "20" + date_match.group(1).replace('/', '-')
+        try:
+            posted_date_obj = datetime.strptime(posted_date_str, '%Y-%m-%d')
+        except ValueError:
+            continue
+        if posted_date_obj < search_start_date:
+            should_stop = True
+            continue
+
+        conditions = job['conditions']
+        deadline_raw = job['deadline'] if job['deadline'] is not None else "상시채용"
+        deadline = deadline_raw
+        if "채용시" not in deadline_raw and "상시" not in deadline_raw:
+            match_md = DEADLINE_MD_RE.search(deadline_raw)
+            if match_md:
+                m, d = map(int, match_md.groups())
+                year = now.year + 1 if m < now.month else now.year
+                deadline = f"{year}/{m:02d}/{d:02d}"
+            else:
+                days_left = next((days for text, days in RELATIVE_DEADLINE_DAYS.items() if text in deadline_raw), None)
+                match_days = DEADLINE_DAYS_LEFT_RE.search(deadline_raw)
+                if days_left is None and match_days:
+                    days_left = int(match_days.group(1))
+                if days_left is not None:
+                    deadline = (now + timedelta(days=days_left)).strftime('%Y/%m/%d')
+
+        job_info = {
+            'rec_idx': rec_idx, '제목': job['title'],
+            '회사명': job['company'] if job['company'] is not None else '회사명 없음',
+            '등록일': posted_date_str, '상세링크': BASE_URL + job['href'],
+            '크롤링 시간': crawled_at,
+            '지역': conditions[0] if len(conditions) > 0 else '',
+            '경력': conditions[1] if len(conditions) > 1 else '',
+            '고용형태': conditions[3] if len(conditions) > 3 else '',
+            '마감일': deadline,
+        }
+        # 기준일 검사 뒤에 비교해야 이미 처리한 옛 공고에서도 중단 조건이 동작합니다.
+        if is_seen(existing_rec_idx, job_info): continue
+        jobs_on_page.append(job_info)
+    return jobs_on_page, should_stop
+
+async def fetch_job_details(client, jobs_on_page, budget):
+    """공고별 상세 내용(필요하면 OCR 포함)을 동시에 수집합니다."""
+    async def fetch_detail_with_semaphore(job_info):
+        async with budget.slot():
+            detail = await get_job_detail(client, job_info['rec_idx'], budget)
+            if detail is None:
+                metrics.count('detail_failures')
+                return None
+            detail_text, image_urls = detail
+            if len(detail_text) < 100 and image_urls:
+                print(f"✅ [{job_info['제목']}] 상세 내용이 짧아 OCR 시도")
+                ocr_tasks = [get_ocr_text_from_image(url) for url in image_urls]
+                ocr_results = await asyncio.gather(*ocr_tasks)
+                ocr_texts = [preprocess_text(text) for text in ocr_results if text]
+                if ocr_texts:
+                    detail_text += "\n\n--- OCR 결과 ---\n" + "\n\n".join(ocr_texts)
+            job_info['상세내용'] = detail_text
+            return job_info
 
-async def crawl_saramin(search_start_date: datetime, existing_ids: set, total_page_limit: int, search_keyword: str):
-    """사람인 스크레이퍼: 특정 날짜 이후 데이터를 페이지별로 `yield`하는 비동기 제너레이터"""
-    semaphore = asyncio.Semaphore(CONCURRENT_REQUESTS_LIMIT)
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    tasks = [fetch_detail_with_semaphore(job) for job in jobs_on_page]
+    return [job for job in await asyncio.gather(*tasks) if job]
+
+
+async def crawl_saramin(search_start_date: datetime, existing_ids, total_page_limit: int, search_keyword: str,
+                        budget: RequestBudget = None, prefetch_pages: int = PAGE_PREFETCH,
+                        client: httpx.AsyncClient = None):
+    """사람인 스크레이퍼: 특정 날짜 이후 데이터를 페이지별로 `yield`하는 비동기 제너레이터
+
+    `existing_ids`는 rec_idx 집합 또는 {rec_idx: 내용 지문} 딕셔너리입니다. 딕셔너리를 넘기면
+    지문이 같은(수정되지 않은) 공고만 건너뛰고, 수정된 공고는 다시 수집합니다.
+    현재 페이지의 상세 내용을 받는 동안 다음 `prefetch_pages`개의 목록 페이지를 미리 요청합니다.
+    `budget`을 넘기면 여러 키워드가 하나의 동시성/속도 제한을 공유합니다.
+    `client`를 넘기면 그 클라이언트(crawler.main의 공용 클라이언트 등)를 사용하고, 없으면 직접 만듭니다.
+    """
+    budget = budget or RequestBudget(CONCURRENT_REQUESTS_LIMIT, REQUESTS_PER_SECOND)
+    pending = {}  # page -> 목록 페이지 요청 Task
+    next_page = 1
+    listing_failures = 0
+    owns_client = client is None
+    if owns_client:
+        client = create_http_client(CONCURRENT_REQUESTS_LIMIT)
+    try:
         for page in range(1, total_page_limit + 1):
+            while next_page <= total_page_limit and next_page <= page + prefetch_pages:
+                pending[next_page] = asyncio.create_task(fetch_listing_page(client, next_page, search_keyword, budget))
+                next_page += 1
+
             print(f"--- 키워드 '{search_keyword}'에 대한 페이지 {page} ---")
-            jobs_from_page, stop_now = await get_job_postings_on_page(client, page, semaphore, search_start_date, existing_ids, search_keyword)
+            html = await pending.pop(page)
+            if html is None:
+                # 재시도까지 실패한 페이지만 건너뛰고 다음 페이지는 계속 수집합니다.
+                metrics.count('listing_failures')
+                listing_failures += 1
+                if listing_failures >= LISTING_MAX_CONSECUTIVE_FAILURES:
+                    print(f"🚨 키워드 '{search_keyword}' 목록 페이지가 {listing_failures}번 연속 실패하여 중단합니다.")
+                    break
+                print(f"⚠️ 키워드 '{search_keyword}' 페이지 {page}를 건너뜁니다.")
+                continue
+            listing_failures = 0
+            jobs_from_page, stop_now = parse_job_listings(html, search_start_date, existing_ids)
+            if stop_now:
+                # 기준일 이전에 도달했으므로 미리 요청한 뒤 페이지는 필요 없습니다.
+                for task in pending.values():
+                    task.cancel()
 
             new_jobs = []
             for job in jobs_from_page:
-                if job and job.get('rec_idx') not in existing_ids:
+                if not is_seen(existing_ids, job):
                     new_jobs.append(job)
-                    existing_ids.add(job['rec_idx']) # 중복 수집 방지를 위해 세트에 바로 추가
+                    mark_seen(existing_ids, job) # 다른 키워드와의 중복 수집 방지를 위해 바로 추가
 
+            fetched = await fetch_job_details(client, new_jobs, budget)
+            fetched_ids = {job['rec_idx'] for job in fetched}
+            for job in new_jobs:
+                if job['rec_idx'] not in fetched_ids:
+                    forget_seen(existing_ids, job)  # 상세 수집에 실패한 공고는 다음 실행에서 다시 수집
+            new_jobs = fetched
             if new_jobs:
+                metrics.count('postings', len(new_jobs))
                 yield new_jobs
 
             if stop_now:
                 print("설정한 날짜 이전의 공고에 도달하여 중단합니다.")
                 break
-            
-            await asyncio.sleep(0.5)
\ No newline at end of file
+    finally:
+        for task in pending.values():
+            task.cancel()
+        if owns_client:
+            await client.aclose()
+
+
+async def crawl_saramin_keywords(search_start_date: datetime, existing_ids, total_page_limit: int, search_keywords,
+                                 budget: RequestBudget = None, keyword_concurrency: int = KEYWORD_CONCURRENCY,
+                                 client: httpx.AsyncClient = None):
+    """여러 키워드를 동시에 크롤링하며 완료된 페이지를 도착 순서대로 `yield`합니다.
+
+    모든 키워드가 하나의 `RequestBudget`과 HTTP 클라이언트(연결 풀)를 공유하므로 전체 요청량은 키워드 수와 무관하게
+    제한되고, 키워드가 바뀌어도 연결을 다시 맺지 않습니다.
+    """
+    budget = budget or RequestBudget(CONCURRENT_REQUESTS_LIMIT, REQUESTS_PER_SECOND)
+    owns_client = client is None
+    if owns_client:
+        client = create_http_client(CONCURRENT_REQUESTS_LIMIT)
+    keyword_semaphore = asyncio.Semaphore(keyword_concurrency)
+    queue = asyncio.Queue(maxsize=keyword_concurrency)
+    done = object()
+
+    async def run_keyword(keyword):
+        try:
+            async with keyword_semaphore:
+                print(f"\n> 키워드: '{keyword}' 크롤링 중...")
+                async for jobs_from_page in crawl_saramin(search_start_date, existing_ids, total_page_limit, keyword, budget,
+                                                               client=client):
+                    await queue.put(jobs_from_page)
+        except Exception as e:
+            print(f"키워드 '{keyword}' 크롤링 중 오류: {e}")
+        await queue.put(done)
+
+    tasks = [asyncio.create_task(run_keyword(keyword)) for keyword in search_keywords]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            item = await queue.get()
+            if item is done:
+                remaining -= 1
+                continue
+            yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        if owns_client:
+            await client.aclose()
@@ -0,0 +1,137 @@
+import os
+import re
+
+from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
+
+# 사람인 목록/상세 페이지에서 필요한 값만 뽑아내는 파서 계층
+# lxml(기본): 미리 컴파일한 XPath 사용 / bs4: 기존 BeautifulSoup('html.parser') 동작 (비교·대체용)
+HTML_PARSER = os.getenv("SARAMIN_HTML_PARSER", "lxml")
+
+# 텍스트로 취급하지 않는 태그 (bs4 get_text와 동일하게 맞춤)
+_NON_TEXT_TAGS = frozenset(['script', 'style', 'template'])
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+_ITEMS = etree.XPath(f"//*[{_has_class('item_recruit')}]")
+_TITLE = etree.XPath(f"(.//*[{_has_class('job_tit')}]//a)[1]")
+_SECTOR = etree.XPath(f"(.//*[{_has_class('job_sector')}])[1]")
+_CONDITIONS = etree.XPath(f".//*[{_has_class('job_condition')}]//span")
+_DEADLINE = etree.XPath(f"(.//*[{_has_class('job_date')}]//*[{_has_class('date')}])[1]")
+_COMPANY = etree.XPath(f"(.//*[{_has_class('corp_name')}]//a)[1]")
+_CONTENT_AREA = etree.XPath(f"(//*[{_has_class('wrap_jv_cont')}])[1]")
+_BODY = etree.XPath("(//body)[1]")
+# lxml은 <body>가 없는 조각에도 body를 만들어 넣으므로, 원문에 실제 body 태그가 있었는지는 따로 봅니다. (bs4 soup.body와 동일)
+_BODY_TAG = re.compile(r'<body[\s/>]', re.IGNORECASE)
+# 문자열은 XML 선언(<?xml ... encoding=...?>)이 있으면 파싱할 수 없으므로 UTF-8 bytes로 넘기고 인코딩을 고정합니다.
+_UTF8_HTML_PARSER = lxml_html.HTMLParser(encoding='utf-8')
+
+
+def _first(xpath, element):
+    found = xpath(element)
+    return found[0] if found else None
+
+def _text_fragments(element):
+    """element 아래의 텍스트 조각을 문서 순서대로 돌려줍니다. (주석/스크립트 제외)"""
+    if element.text and element.tag not in _NON_TEXT_TAGS:
+        yield element.text
+    for child in element:
+        if isinstance(child.tag, str) and child.tag not in _NON_TEXT_TAGS:
+            yield from _text_fragments(child)
+        if child.tail:
+            yield child.tail
+
+def _get_text(element, separator='', strip=False):
+    fragments = _text_fragments(element)
+    if strip:
+        fragments = (fragment.strip() for fragment in fragments)
+        fragments = (fragment for fragment in fragments if fragment)
+    return separator.join(fragments)
+
+def _parse_document(page_html):
+    if not page_html or not page_html.strip():
+        return None
+    try:
+        return lxml_html.document_fromstring(page_html.encode('utf-8'), parser=_UTF8_HTML_PARSER)
+    except (etree.ParserError, ValueError):
+        return None
+
+
+def _listing_items_lxml(page_html):
+    document = _parse_document(page_html)
+    if document is None:
+        return []
+    items = []
+    for job in _ITEMS(document):
+        title_element = _first(_TITLE, job)
+        sector_element = _first(_SECTOR, job)
+        deadline_element = _first(_DEADLINE, job)
+        company_element = _first(_COMPANY, job)
+        items.append({
+            'href': title_element.get('href', '') if title_element is not None else '',
+            'title': title_element.get('title', '제목 없음') if title_element is not None else '제목 없음',
+            'sector': _get_text(sector_element) if sector_element is not None else '',
+            'conditions': [_get_text(span).strip() for span in _CONDITIONS(job)],
+            'deadline': _get_text(deadline_element).strip() if deadline_element is not None else None,
+            'company': _get_text(company_element).strip() if company_element is not None else None,
+        })
+    return items
+
+def _detail_content_lxml(page_html):
+    document = _parse_document(page_html)
+    if document is None:
+        return None, []
+    content_area = _first(_CONTENT_AREA, document)
+    if content_area is None and _BODY_TAG.search(page_html):
+        content_area = _first(_BODY, document)
+    if content_area is None:
+        return None, []
+    sources = [img.get('src') for img in content_area.iter('img')]
+    return _get_text(content_area, '\n', strip=True), sources
+
+
+def _listing_items_bs4(page_html):
+    soup = BeautifulSoup(page_html, 'html.parser')
+    items = []
+    for job in soup.select('.item_recruit'):
+        title_element = job.select_one('.job_tit a')
+        sector_element = job.select_one('.job_sector')
+        deadline_element = job.select_one('.job_date .date')
+        company_element = job.select_one('.corp_name a')
+        items.append({
+            'href': title_element.get('href', '') if title_element else '',
+            'title': title_element.get('title', '제목 없음') if title_element else '제목 없음',
+            'sector': sector_element.text if sector_element else '',
+            'conditions': [cond.text.strip() for cond in job.select('.job_condition span')],
+            'deadline': deadline_element.text.strip() if deadline_element else None,
+            'company': company_element.text.strip() if company_element else None,
+        })
+    return items
+
+def _detail_content_bs4(page_html):
+    soup = BeautifulSoup(page_html, 'html.parser')
+    content_area = soup.select_one('.wrap_jv_cont') or soup.body
+    if not content_area:
+        return None, []
+    sources = [img_tag.get('src') for img_tag in content_area.find_all('img')]
+    return content_area.get_text('\n', strip=True), sources
+
+
+_PARSERS = {
+    'lxml': (_listing_items_lxml, _detail_content_lxml),
+    'bs4': (_listing_items_bs4, _detail_content_bs4),
+}
+
+
+def extract_listing_items(page_html, parser: str = None):
+    """목록 페이지의 `.item_recruit`마다 원본 필드(href, title, sector, conditions, deadline, company)를 추출합니다.
+
+    deadline/company는 요소가 없으면 None입니다.
+    """
+    return _PARSERS[parser or HTML_PARSER][0](page_html)
+
+def extract_detail_content(page_html, parser: str = None):
+    """상세 페이지 본문(`.wrap_jv_cont`, 없으면 body)의 (텍스트, 이미지 src 목록)을 반환합니다. 본문이 없으면 (None, [])."""
+    return _PARSERS[parser or HTML_PARSER][1](page_html)
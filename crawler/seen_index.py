@@ -0,0 +1,92 @@
+import hashlib
+import os
+import re
+import sqlite3
+from datetime import datetime, timedelta
+
+# 이전 실행에서 처리한 공고(rec_idx)와 내용 지문을 보관하는 로컬 SQLite 파일
+SEEN_INDEX_PATH = os.getenv("SEEN_INDEX_PATH", "data/seen_index.sqlite3")
+SEEN_INDEX_RETENTION_DAYS = 60
+
+# 목록 페이지에서 바로 얻을 수 있는 필드만 지문에 사용해야 상세 요청 전에 비교할 수 있습니다.
+FINGERPRINT_FIELDS = ('제목', '회사명', '지역', '경력', '고용형태', '마감일')
+# 마감일은 절대 날짜(YYYY/MM/DD)나 상시/채용시 문구만 지문에 씁니다.
+# 크롤러가 날짜로 바꾸지 못한 상대 문구('D-3' 등)는 실행 날짜마다 달라지므로 지문에서 뺍니다.
+_ABSOLUTE_DEADLINE_RE = re.compile(r'^\d{4}/\d{2}/\d{2}$')
+
+
+def _fingerprint_value(job: dict, field: str) -> str:
+    value = str(job.get(field, ''))
+    if field == '마감일' and not (_ABSOLUTE_DEADLINE_RE.match(value) or '상시' in value or '채용시' in value):
+        return ''
+    return value
+
+
+def job_fingerprint(job: dict) -> str:
+    """목록 정보로 만든 공고 내용 지문 (제목/마감일 등이 수정되면 값이 바뀝니다)"""
+    raw = "\x1f".join(_fingerprint_value(job, field) for field in FINGERPRINT_FIELDS)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def is_seen(existing_ids, job: dict) -> bool:
+    """`existing_ids`가 set이면 rec_idx만, dict(rec_idx→지문)이면 지문까지 비교합니다."""
+    if isinstance(existing_ids, dict):
+        return existing_ids.get(job['rec_idx']) == job_fingerprint(job)
+    return job['rec_idx'] in existing_ids
+
+
+def mark_seen(existing_ids, job: dict):
+    if isinstance(existing_ids, dict):
+        existing_ids[job['rec_idx']] = job_fingerprint(job)
+    else:
+        existing_ids.add(job['rec_idx'])
+
+
+def forget_seen(existing_ids, job: dict):
+    if isinstance(existing_ids, dict):
+        existing_ids.pop(job['rec_idx'], None)
+    else:
+        existing_ids.discard(job['rec_idx'])
+
+
+class SeenIndex:
+    """실행 간에 유지되는 rec_idx → 내용 지문 인덱스"""
+
+    def __init__(self, path: str = SEEN_INDEX_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            " rec_idx TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, last_seen TEXT NOT NULL)"
+        )
+        self.conn.commit()
+
+    def load(self) -> dict:
+        """`crawl_saramin`의 `existing_ids`로 넘길 {rec_idx: 지문} 딕셔너리를 반환합니다."""
+        return dict(self.conn.execute("SELECT rec_idx, fingerprint FROM seen"))
+
+    def record(self, jobs: list):
+        """업로드가 끝난 공고들을 처리 완료로 기록합니다."""
+        self.record_keys([(str(job['rec_idx']), job_fingerprint(job)) for job in jobs])
+
+    def record_keys(self, keys: list):
+        """(rec_idx, 지문) 목록을 처리 완료로 기록합니다."""
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.conn.executemany(
+            "INSERT INTO seen (rec_idx, fingerprint, last_seen) VALUES (?, ?, ?) "
+            "ON CONFLICT(rec_idx) DO UPDATE SET fingerprint = excluded.fingerprint, last_seen = excluded.last_seen",
+            [(rec_idx, fingerprint, now) for rec_idx, fingerprint in keys],
+        )
+        self.conn.commit()
+
+    def prune(self, retention_days: int = SEEN_INDEX_RETENTION_DAYS) -> int:
+        """오랫동안 다시 기록되지 않은 항목을 지워 인덱스 크기를 제한합니다."""
+        cutoff = (datetime.now() - timedelta(days=retention_days)).strftime('%Y-%m-%d %H:%M:%S')
+        deleted = self.conn.execute("DELETE FROM seen WHERE last_seen < ?", (cutoff,)).rowcount
+        self.conn.commit()
+        return deleted
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,193 @@
+import io
+import os
+import threading
+
+# 파이프라인 산출물(JSONL part 파일 등)을 쓰는 저장소 추상화
+# - gs://버킷        : Google Cloud Storage (운영)
+# - file:///경로, 경로 : 로컬 디렉터리 (오프라인 실행/부하 테스트)
+# - memory://        : 프로세스 메모리 (테스트/벤치마크)
+
+
+class StorageSink:
+    """이름(경로) 단위로 바이트를 쓰고 읽는 저장소 인터페이스"""
+    scheme = ""
+
+    def write(self, name: str, data: bytes, content_type: str = "application/jsonl"):
+        raise NotImplementedError
+
+    def open_text(self, name: str):
+        """조금씩 쓰는 텍스트 스트림을 엽니다. `close()`(또는 with 블록 종료) 시점에 저장이 완료됩니다."""
+        raise NotImplementedError
+
+    def read(self, name: str) -> bytes:
+        raise NotImplementedError
+
+    def list(self, prefix: str = "") -> list:
+        raise NotImplementedError
+
+    def list_versions(self, prefix: str = "") -> dict:
+        """{이름: 버전 토큰}. 같은 이름에 다시 쓰면 토큰이 바뀝니다."""
+        raise NotImplementedError
+
+    def delete(self, name: str):
+        raise NotImplementedError
+
+    def uri(self, name: str = "") -> str:
+        raise NotImplementedError
+
+
+class _AtomicTextFile(io.TextIOWrapper):
+    """임시 파일에 쓰고 close() 때 원래 이름으로 교체하는 텍스트 파일"""
+
+    def __init__(self, path):
+        self._final_path = path
+        self._tmp_path = f"{path}.tmp"
+        super().__init__(open(self._tmp_path, "wb"), encoding="utf-8")
+
+    def close(self):
+        if not self.closed:
+            super().close()
+            os.replace(self._tmp_path, self._final_path)
+
+
+class _MemoryTextFile(io.StringIO):
+    def __init__(self, sink, name):
+        super().__init__()
+        self._sink = sink
+        self._name = name
+
+    def close(self):
+        if not self.closed:
+            self._sink.write(self._name, self.getvalue().encode("utf-8"))
+            super().close()
+
+
+class GcsSink(StorageSink):
+    scheme = "gs"
+
+    def __init__(self, bucket_name: str, project: str = None):
+        from google.cloud import storage
+
+        self.bucket_name = bucket_name
+        self.bucket = storage.Client(project=project).bucket(bucket_name)
+
+    def write(self, name, data, content_type="application/jsonl"):
+        self.bucket.blob(name).upload_from_string(data, content_type=content_type)
+
+    def open_text(self, name):
+        return self.bucket.blob(name).open("w", encoding="utf-8")
+
+    def read(self, name):
+        return self.bucket.blob(name).download_as_bytes()
+
+    def list(self, prefix=""):
+        return sorted(blob.name for blob in self.bucket.list_blobs(prefix=prefix))
+
+    def list_versions(self, prefix=""):
+        return {blob.name: str(blob.generation) for blob in self.bucket.list_blobs(prefix=prefix)}
+
+    def delete(self, name):
+        self.bucket.blob(name).delete()
+
+    def uri(self, name=""):
+        return f"gs://{self.bucket_name}/{name}"
+
+
+class LocalDirSink(StorageSink):
+    scheme = "file"
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def _path(self, name):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def write(self, name, data, content_type="application/jsonl"):
+        # 임시 파일에 쓴 뒤 교체해서, 읽는 쪽이 절반만 쓰인 파일을 보지 않도록 합니다.
+        path = self._path(name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def open_text(self, name):
+        return _AtomicTextFile(self._path(name))
+
+    def read(self, name):
+        with open(os.path.join(self.root, name), "rb") as f:
+            return f.read()
+
+    def list(self, prefix=""):
+        names = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith(".tmp"):
+                    continue
+                name = os.path.relpath(os.path.join(dirpath, filename), self.root).replace(os.sep, "/")
+                if name.startswith(prefix):
+                    names.append(name)
+        return sorted(names)
+
+    def list_versions(self, prefix=""):
+        versions = {}
+        for name in self.list(prefix):
+            stat = os.stat(os.path.join(self.root, name))
+            versions[name] = f"{stat.st_mtime_ns}-{stat.st_size}"
+        return versions
+
+    def delete(self, name):
+        os.remove(os.path.join(self.root, name))
+
+    def uri(self, name=""):
+        return f"file://{os.path.join(self.root, name)}"
+
+
+class MemorySink(StorageSink):
+    scheme = "memory"
+
+    def __init__(self):
+        self.objects = {}
+        self.versions = {}
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def write(self, name, data, content_type="application/jsonl"):
+        with self._lock:
+            self.objects[name] = bytes(data)
+            self._writes += 1
+            self.versions[name] = str(self._writes)
+
+    def open_text(self, name):
+        return _MemoryTextFile(self, name)
+
+    def read(self, name):
+        return self.objects[name]
+
+    def list(self, prefix=""):
+        with self._lock:
+            return sorted(name for name in self.objects if name.startswith(prefix))
+
+    def list_versions(self, prefix=""):
+        with self._lock:
+            return {name: version for name, version in self.versions.items() if name.startswith(prefix)}
+
+    def delete(self, name):
+        with self._lock:
+            self.objects.pop(name, None)
+            self.versions.pop(name, None)
+
+    def uri(self, name=""):
+        return f"memory://{name}"
+
+
+def create_sink(uri: str, project: str = None) -> StorageSink:
+    """URI로 저장소를 만듭니다. (gs://버킷, file:///경로 또는 경로, memory://)"""
+    if uri.startswith("gs://"):
+        return GcsSink(uri[len("gs://"):].strip("/"), project=project)
+    if uri.startswith("memory://"):
+        return MemorySink()
+    if uri.startswith("file://"):
+        uri = uri[len("file://"):]
+    return LocalDirSink(uri)
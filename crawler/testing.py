@@ -0,0 +1,65 @@
+import hashlib
+import threading
+import time
+from types import SimpleNamespace
+
+# 외부 서비스 없이 크롤러를 실행하기 위한 OCR 대역 (OCR_ENGINE=fake, 녹화 재생/벤치마크/테스트에서 사용)
+# 크롤러 패키지 안에 두어 benchmarks 패키지가 없는 실행 이미지에서도 OCR_ENGINE=fake가 동작합니다.
+
+
+def _fake_response(content: bytes, error: str = ""):
+    # UTF-8로 읽히는 가짜 이미지는 그 내용을, 아니면 해시 기반 문자열을 OCR 결과로 돌려줍니다.
+    try:
+        text = content.decode('utf-8')
+    except UnicodeDecodeError:
+        text = f"OCR {hashlib.sha256(content).hexdigest()[:12]}"
+    return SimpleNamespace(
+        error=SimpleNamespace(message=error),
+        full_text_annotation=SimpleNamespace(text="" if error else text),
+    )
+
+
+def fake_vision_request(content: bytes):
+    """google-cloud-vision 없이 VisionBatcher를 쓸 때의 요청 (`make_request`로 넘김)"""
+    return SimpleNamespace(image=SimpleNamespace(content=content))
+
+
+class FakeVisionClient:
+    """`vision.ImageAnnotatorClient` 대역. 호출 수와 배치 크기를 기록합니다.
+
+    `latency`는 요청 한 번(단건/배치 모두)의 왕복 시간을 흉내 냅니다.
+    `fail_prefix`로 시작하는 이미지는 그 이미지의 응답에만 오류를 담고, `fail_batches`면 배치 요청 전체가 실패합니다.
+    """
+
+    def __init__(self, latency: float = 0.0, per_image_latency: float = 0.0, fail_prefix: bytes = None,
+                 fail_batches: bool = False):
+        self.latency = latency
+        self.per_image_latency = per_image_latency
+        self.fail_prefix = fail_prefix
+        self.fail_batches = fail_batches
+        self.calls = 0
+        self.images = 0
+        self.batch_sizes = []
+        self._lock = threading.Lock()
+
+    def _record(self, count):
+        with self._lock:
+            self.calls += 1
+            self.images += count
+        time.sleep(self.latency + self.per_image_latency * count)
+
+    def _response(self, content):
+        failed = self.fail_prefix is not None and content.startswith(self.fail_prefix)
+        return _fake_response(content, "fake vision error" if failed else "")
+
+    def document_text_detection(self, image):
+        self._record(1)
+        return self._response(image.content)
+
+    def batch_annotate_images(self, requests):
+        with self._lock:
+            self.batch_sizes.append(len(requests))
+        self._record(len(requests))
+        if self.fail_batches:
+            raise RuntimeError("fake batch failure")
+        return SimpleNamespace(responses=[self._response(request.image.content) for request in requests])
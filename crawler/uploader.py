@@ -0,0 +1,120 @@
+import asyncio
+import io
+import json
+import random
+
+from crawler.metrics import metrics
+from crawler.seen_index import job_fingerprint
+
+UPLOAD_QUEUE_SIZE = 4      # 업로드를 기다리는 part 수 상한 (가득 차면 크롤러가 기다림)
+UPLOAD_WORKERS = 3         # 동시에 part를 올리는 업로더 수
+UPLOAD_MAX_ATTEMPTS = 4    # part 하나당 최대 업로드 시도 횟수
+UPLOAD_RETRY_BASE_DELAY = 1.0
+
+
+def job_to_jsonl_line(job: dict) -> bytes:
+    """채용 공고 하나를 RAG Engine용 JSONL 한 줄(bytes, 줄바꿈 제외)로 직렬화합니다."""
+    content = job.get('제목', '') + "\n\n" + job.get('상세내용', '')
+    metadata = {k: v for k, v in job.items() if k not in ['rec_idx', '제목', '상세내용']}
+    json_record = {
+        "id": str(job.get('rec_idx')),
+        "structData": metadata,
+        "content": content
+    }
+    return json.dumps(json_record, ensure_ascii=False).encode('utf-8')
+
+
+class PartUploader:
+    """크롤링 결과를 part 파일 단위로 직렬화해 여러 업로더 스레드로 올리는 업로드 단계
+
+    - 공고는 `add` 시점에 바로 JSONL로 직렬화되어 part 버퍼(BytesIO)에 쌓입니다.
+    - part가 `batch_size`개가 되면 크기가 제한된 큐에 넣고, 큐가 가득 차면 `add`가 기다립니다(역압).
+    - 업로더는 `upload_part(file_index, data: bytes)`를 워커 스레드에서 호출하며, 실패하면 지수 백오프로 재시도합니다.
+    - 업로드에 성공한 part의 (rec_idx, 지문) 목록은 `on_uploaded`로 전달됩니다.
+    """
+
+    def __init__(self, upload_part, batch_size: int, on_uploaded=None, workers: int = UPLOAD_WORKERS,
+                 queue_size: int = UPLOAD_QUEUE_SIZE, max_attempts: int = UPLOAD_MAX_ATTEMPTS, start_index: int = 1):
+        self.upload_part = upload_part
+        self.batch_size = batch_size
+        self.on_uploaded = on_uploaded
+        self.max_attempts = max_attempts
+        self.workers = workers
+        self._queue = asyncio.Queue(maxsize=queue_size)
+        self._tasks = []
+        self._next_index = start_index
+        self._buffer = None
+        self._keys = []
+        self.uploaded_jobs = 0
+        self.uploaded_parts = 0
+        self.failed_parts = []
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.close()
+        else:
+            for task in self._tasks:
+                task.cancel()
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def add(self, jobs: list):
+        for job in jobs:
+            if self._buffer is None:
+                self._buffer = io.BytesIO()
+            elif self._keys:
+                self._buffer.write(b"\n")
+            self._buffer.write(job_to_jsonl_line(job))
+            self._keys.append((str(job['rec_idx']), job_fingerprint(job)))
+            if len(self._keys) >= self.batch_size:
+                await self._enqueue()
+
+    async def _enqueue(self):
+        if not self._keys:
+            return
+        part = (self._next_index, self._buffer.getvalue(), self._keys)
+        self._next_index += 1
+        self._buffer, self._keys = None, []
+        await self._queue.put(part)
+
+    async def _worker(self):
+        while True:
+            part = await self._queue.get()
+            try:
+                if part is None:
+                    return
+                await self._upload_with_retry(*part)
+            finally:
+                self._queue.task_done()
+
+    async def _upload_with_retry(self, file_index, data, keys):
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                with metrics.timer('upload'):
+                    await asyncio.to_thread(self.upload_part, file_index, data)
+                break
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    print(f"🚨 part {file_index} 업로드 최종 실패 ({attempt}회 시도): {e}")
+                    self.failed_parts.append(file_index)
+                    return
+                delay = UPLOAD_RETRY_BASE_DELAY * 2 ** (attempt - 1) * (0.5 + random.random())
+                print(f"⚠️ part {file_index} 업로드 실패, {delay:.1f}초 후 재시도 ({attempt}/{self.max_attempts}): {e}")
+                await asyncio.sleep(delay)
+        self.uploaded_jobs += len(keys)
+        self.uploaded_parts += 1
+        if self.on_uploaded:
+            self.on_uploaded(keys)
+
+    async def close(self) -> int:
+        """남은 버퍼를 올리고 모든 업로더가 끝날 때까지 기다린 뒤, 업로드된 공고 수를 반환합니다."""
+        await self._enqueue()
+        for _ in self._tasks:
+            await self._queue.put(None)
+        await asyncio.gather(*self._tasks)
+        return self.uploaded_jobs
@@ -1,15 +1,34 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+import asyncio
+import json
 import os
 import uvicorn
-from rag_service.rag import rerank_model
+from rag_service.limiter import ConcurrencyLimiter, Overloaded
+from rag_service.rag import rerank_model_async, stream_answer_async, warmup
+
+# 인스턴스당 동시 처리 한도 (Cloud Run --concurrency와 맞춰 설정)
+MAX_CONCURRENT_ASKS = int(os.getenv("MAX_CONCURRENT_ASKS", "200"))
+MAX_WAITING_ASKS = int(os.getenv("MAX_WAITING_ASKS", "100"))      # 자리를 기다릴 수 있는 요청 수, 넘치면 429
+ASK_QUEUE_TIMEOUT = float(os.getenv("ASK_QUEUE_TIMEOUT", "2"))     # 자리를 기다리는 최대 시간(초), 넘기면 503
+ASK_TIMEOUT = float(os.getenv("ASK_TIMEOUT", "60"))                # 요청 하나의 최대 처리 시간(초), 넘기면 504
+
+ask_limiter = ConcurrencyLimiter(MAX_CONCURRENT_ASKS, MAX_WAITING_ASKS, ASK_QUEUE_TIMEOUT)
 
 # Pydantic 모델 정의
 class QuestionRequest(BaseModel):
     question: str
 
+# 서버 시작 시 Vertex 초기화와 모델/검색 Tool 생성을 미리 해 두고 요청 간에 재사용
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup()
+    yield
+
 # FastAPI 앱 생성
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # --- FastAPI 엔드포인트 ---
 @app.get("/")
@@ -18,7 +37,7 @@ def health_check():
     return {"status": "healthy"}
 
 @app.post("/ask")
-def ask_question(request: QuestionRequest):
+async def ask_question(request: QuestionRequest):
     """
     사용자 질문을 받아 답변을 생성하는 엔드포인트.
     """
@@ -26,14 +45,73 @@ def ask_question(request: QuestionRequest):
         raise HTTPException(status_code=400, detail="Question not provided")
 
     try:
-        # RAG 서비스 호출
-        response = rerank_model(request.question)
+        async with ask_limiter.slot():
+            # RAG 서비스 호출
+            response = await asyncio.wait_for(rerank_model_async(request.question), timeout=ASK_TIMEOUT)
         assistant_response = response.text
         return {"answer": assistant_response}
-        
+
+    except Overloaded as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail,
+                            headers={"Retry-After": str(e.retry_after)})
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Answer generation timed out")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _sse(data: dict, event: str = None) -> str:
+    lines = [f"event: {event}"] if event else []
+    lines.append("data: " + json.dumps(data, ensure_ascii=False))
+    return "\n".join(lines) + "\n\n"
+
+async def _answer_events(question: str):
+    """답변 조각을 SSE 이벤트로 보냅니다. 끝나면 done, 실패하면 error 이벤트를 보냅니다."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + ASK_TIMEOUT
+    try:
+        chunks = stream_answer_async(question)
+        while True:
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), timeout=max(deadline - loop.time(), 0))
+            except StopAsyncIteration:
+                break
+            yield _sse({"text": chunk})
+        yield _sse({}, event="done")
+    except asyncio.TimeoutError:
+        yield _sse({"detail": "Answer generation timed out"}, event="error")
+    except Exception as e:
+        yield _sse({"detail": str(e)}, event="error")
+
+class _LimitedStreamingResponse(StreamingResponse):
+    """응답 전송이 어떻게 끝나든(완료, 클라이언트 연결 끊김, 생성기를 시작하기 전 취소) 동시 처리 자리를 돌려줍니다."""
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            ask_limiter.release()
+
+@app.post("/ask/stream")
+async def ask_question_stream(request: QuestionRequest):
+    """
+    답변을 생성되는 대로 Server-Sent Events로 보내는 엔드포인트.
+    data: {"text": "..."} 이벤트가 이어지고, 마지막에 event: done (실패 시 event: error)이 옵니다.
+    """
+    if not request.question:
+        raise HTTPException(status_code=400, detail="Question not provided")
+
+    try:
+        await ask_limiter.acquire()
+    except Overloaded as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail,
+                            headers={"Retry-After": str(e.retry_after)})
+    try:
+        return _LimitedStreamingResponse(_answer_events(request.question), media_type="text/event-stream",
+                                         headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    except BaseException:
+        ask_limiter.release()
+        raise
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8080))
     uvicorn.run("app:app", host="0.0.0.0", port=port, reload=False)
\ No newline at end of file
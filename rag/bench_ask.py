@@ -0,0 +1,137 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+
+import httpx
+from fastapi import FastAPI
+
+import app as app_module
+from rag_service import rag
+from rag_service.limiter import ConcurrencyLimiter
+
+# /ask API 부하 테스트 (Gemini 호출은 지연만 흉내 내는 가짜 모델로 대체)
+# 사용법: cd rag && python bench_ask.py --clients 10,50,200 --latency 0.5
+# 비교를 위해 예전 동기 엔드포인트(def + 스레드풀)와 현재 비동기 엔드포인트를 같은 조건으로 돌립니다.
+
+
+class _StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubChat:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def send_message(self, message, **kwargs):
+        time.sleep(self.latency)
+        return _StubResponse(f"추천 공고: {message}")
+
+    async def send_message_async(self, message, **kwargs):
+        await asyncio.sleep(self.latency)
+        return _StubResponse(f"추천 공고: {message}")
+
+
+class StubModel:
+    """GenerativeModel 대역. 응답 지연만 흉내 내고 네트워크를 쓰지 않습니다."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def _parsed(self, question):
+        return _StubResponse(json.dumps({"keywords": question, "filter_string": ""}, ensure_ascii=False))
+
+    def generate_content(self, contents=None, **kwargs):
+        time.sleep(self.latency)
+        return self._parsed(contents)
+
+    async def generate_content_async(self, contents=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return self._parsed(contents)
+
+    def start_chat(self):
+        return StubChat(self.latency)
+
+
+def install_stub_models(latency: float):
+    model = StubModel(latency)
+    rag.get_rag_model = lambda *args, **kwargs: model
+    rag.get_parser_model = lambda *args, **kwargs: model
+    rag.get_answer_model = lambda *args, **kwargs: model
+    # 요청 처리 경로 자체를 재기 위해 쿼리/답변 캐시는 끔
+    rag.get_query_cache = lambda: None
+    rag.get_answer_cache = lambda: None
+
+
+def sync_baseline_app() -> FastAPI:
+    """변경 전과 같은 동기 /ask (FastAPI가 스레드풀에서 실행)"""
+    baseline = FastAPI()
+
+    @baseline.post("/ask")
+    def ask_question(request: app_module.QuestionRequest):
+        return {"answer": rag.rerank_model(request.question).text}
+
+    return baseline
+
+
+async def run_load(asgi_app, clients: int, duration: float, reject_backoff: float) -> dict:
+    statuses = Counter()
+    latencies = []
+    deadline = time.perf_counter() + duration
+    transport = httpx.ASGITransport(app=asgi_app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+        async def user(user_id):
+            n = 0
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.post("/ask", json={"question": f"서울 백엔드 신입 공고 {user_id}-{n}"})
+                statuses[response.status_code] += 1
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    await asyncio.sleep(reject_backoff)  # 거절되면 실제 클라이언트처럼 잠시 쉬었다 재시도
+                n += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user(i) for i in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'clients': clients,
+        'ok_qps': round(statuses[200] / elapsed, 1),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+        'p95_ms': round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else None,
+        'statuses': dict(statuses),
+    }
+
+
+async def main(args):
+    install_stub_models(args.latency)
+    app_module.ask_limiter = ConcurrencyLimiter(args.max_concurrent, args.max_waiting, args.queue_timeout)
+    apps = {'sync': sync_baseline_app(), 'async': app_module.app}
+
+    results = []
+    for clients in args.clients:
+        for name, asgi_app in apps.items():
+            result = dict(await run_load(asgi_app, clients, args.duration, args.reject_backoff), endpoint=name)
+            print(f"[{name:5}] clients={clients:4} ok_qps={result['ok_qps']:7} "
+                  f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms statuses={result['statuses']}")
+            results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="/ask API 부하 테스트 (가짜 모델)")
+    parser.add_argument("--clients", type=lambda v: [int(x) for x in v.split(',')], default=[10, 50, 200],
+                        help="동시 사용자 수 후보 (쉼표 구분)")
+    parser.add_argument("--duration", type=float, default=5.0, help="설정별 실행 시간(초)")
+    parser.add_argument("--latency", type=float, default=0.5, help="가짜 Gemini 호출 한 번의 지연(초)")
+    parser.add_argument("--reject-backoff", type=float, default=0.2, help="429/503을 받은 사용자가 쉬는 시간(초)")
+    parser.add_argument("--max-concurrent", type=int, default=app_module.MAX_CONCURRENT_ASKS)
+    parser.add_argument("--max-waiting", type=int, default=app_module.MAX_WAITING_ASKS)
+    parser.add_argument("--queue-timeout", type=float, default=app_module.ASK_QUEUE_TIMEOUT)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,43 @@
+import argparse
+import time
+from datetime import date
+
+from rag_service.ann_index import ANN_INDEX_DIR, update_from_records
+from rag_service.embedding_pipeline import EMBEDDING_CACHE_PATH, EmbeddingCache, EmbeddingPipeline
+from rag_service.embeddings import create_embedder
+from rag_service.local_index import LOCAL_INDEX_DIR, LocalIndex, read_source_records
+
+# 수집 단계 임베딩 (매일 크롤링 뒤 실행)
+# 사용법: cd rag && python embed_corpus.py --source gs://job-agent-raw-json/rag-source-data/
+# - 공고 content를 청크로 나눠 임베딩 캐시(EMBEDDING_CACHE_PATH)에 없는 청크만 임베딩합니다.
+#   어제와 같은 공고/공통 문구는 캐시에서 꺼내므로 임베딩 비용은 새로 생긴 내용에만 비례합니다.
+# - 같은 벡터로 로컬 검색 인덱스와 ANN 인덱스를 갱신합니다.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="공고 임베딩 + 로컬/ANN 인덱스 갱신")
+    parser.add_argument("--source", required=True, help="JSONL이 있는 디렉터리 또는 gs://버킷/접두사")
+    parser.add_argument("--cache", default=EMBEDDING_CACHE_PATH)
+    parser.add_argument("--local-index", default=LOCAL_INDEX_DIR, help="빈 문자열이면 만들지 않음")
+    parser.add_argument("--ann-index", default=ANN_INDEX_DIR, help="빈 문자열이면 만들지 않음")
+    parser.add_argument("--today", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    records = read_source_records(args.source)
+    print(f"📥 공고 {len(records)}개를 읽었습니다. ({time.perf_counter() - start:.1f}초)")
+
+    cache = EmbeddingCache(args.cache)
+    pipeline = EmbeddingPipeline(create_embedder(task_type="RETRIEVAL_DOCUMENT"), cache)
+    if args.local_index:
+        LocalIndex.build(records, pipeline=pipeline).save(args.local_index)
+        print(f"✅ 로컬 검색 인덱스를 저장했습니다: {args.local_index}")
+    if args.ann_index:
+        update_from_records(args.ann_index, records, pipeline, args.today)
+    cache.close()
+    print(f"🧮 임베딩: {pipeline.summary()}")
+    print(f"⏱️ 전체 {time.perf_counter() - start:.1f}초")
+
+
+if __name__ == "__main__":
+    main()
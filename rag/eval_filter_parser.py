@@ -0,0 +1,92 @@
+import argparse
+import json
+import re
+import time
+from datetime import date
+
+from rag_service.filter_parser import RULE_PARSER_MIN_CONFIDENCE, parse_query
+
+# 규칙 기반 필터 파서 평가 (라벨 데이터: eval/filter_cases.jsonl)
+# 사용법: cd rag && python eval_filter_parser.py [--llm]
+# - 규칙으로 처리한 질문의 정확도, LLM으로 넘겨야 할 질문을 제대로 넘겼는지, 질문당 처리 시간을 봅니다.
+# - --llm 을 주면 같은 질문을 Gemini 쿼리 분석 모델에도 보내 정답/규칙 결과와 비교합니다.
+
+CASES_PATH = "eval/filter_cases.jsonl"
+_CLAUSE_RE = re.compile(r'(\w+)\s*(<=|>=|=|<|>)\s*\\?"?([^"\\]*)\\?"?')
+
+
+def clause_set(filter_string: str) -> frozenset:
+    """'a = "x" AND b <= "y"' → {('a', '=', 'x'), ('b', '<=', 'y')} (순서/따옴표 차이 무시)"""
+    clauses = set()
+    for part in re.split(r"\s+AND\s+", filter_string.strip(), flags=re.IGNORECASE):
+        m = _CLAUSE_RE.search(part)
+        if m:
+            clauses.add((m.group(1), m.group(2), m.group(3).strip()))
+    return frozenset(clauses)
+
+
+def load_cases(path=CASES_PATH):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def llm_filter(question: str, today: str):
+    from rag_service.rag import MODEL_ID, get_parser_model
+
+    response = get_parser_model(MODEL_ID, today).generate_content(contents=question)
+    text = response.text.strip().replace("```json", "").replace("```", "")
+    return json.loads(text).get("filter_string", "")
+
+
+def evaluate(cases, use_llm=False, repeat=200):
+    resolved = correct = deferred_ok = deferred_expected = 0
+    llm_correct = agree = llm_seconds = 0.0
+    mistakes = []
+
+    for case in cases:
+        today = date.fromisoformat(case["today"])
+        parsed = parse_query(case["question"], today)
+        gold = clause_set(case["filter_string"])
+        is_resolved = parsed.confidence >= RULE_PARSER_MIN_CONFIDENCE
+
+        if case["needs_llm"]:
+            deferred_expected += 1
+            deferred_ok += not is_resolved
+        if is_resolved:
+            resolved += 1
+            if clause_set(parsed.filter_string) == gold:
+                correct += 1
+        if (is_resolved and clause_set(parsed.filter_string) != gold) or (case["needs_llm"] and is_resolved):
+            mistakes.append((case["question"], parsed.filter_string, case["filter_string"], parsed.confidence))
+
+        if use_llm:
+            start = time.perf_counter()
+            llm = clause_set(llm_filter(case["question"], case["today"]))
+            llm_seconds += time.perf_counter() - start
+            llm_correct += llm == gold
+            agree += is_resolved and llm == clause_set(parsed.filter_string)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for case in cases:
+            parse_query(case["question"], date.fromisoformat(case["today"]))
+    per_query_us = (time.perf_counter() - start) / (repeat * len(cases)) * 1e6
+
+    print(f"📋 질문 {len(cases)}개 (LLM으로 넘겨야 하는 질문 {deferred_expected}개)")
+    print(f"⚡ 규칙으로 처리: {resolved}개, 그중 정답 {correct}개 ({correct / max(resolved, 1):.1%})")
+    print(f"↪️ LLM으로 넘겨야 할 질문을 넘긴 비율: {deferred_ok}/{deferred_expected}")
+    print(f"⏱️ 규칙 파서 평균 처리 시간: {per_query_us:.1f}µs/질문")
+    if use_llm:
+        print(f"🤖 LLM 정답률: {llm_correct / len(cases):.1%}, 규칙 처리 질문에서 LLM과 일치: {int(agree)}/{resolved}, "
+              f"LLM 평균 {llm_seconds / len(cases) * 1000:.0f}ms/질문")
+    for question, got, expected, confidence in mistakes:
+        print(f"  ❌ {question}\n     규칙: {got!r} (confidence={confidence})\n     정답: {expected!r}")
+    return not mistakes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="규칙 기반 필터 파서 평가")
+    parser.add_argument("--cases", default=CASES_PATH)
+    parser.add_argument("--llm", action="store_true", help="Gemini 쿼리 분석 결과와도 비교 (Vertex AI 인증 필요)")
+    args = parser.parse_args()
+    raise SystemExit(0 if evaluate(load_cases(args.cases), use_llm=args.llm) else 1)
@@ -1,10 +1,22 @@
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+import argparse
+import hashlib
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import date, datetime
 from dotenv import load_dotenv
 import json
-from google.cloud import storage
 
+from crawler.sinks import create_sink
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json으로 직렬화 (느림. 날짜/Decimal은 _json_default로 같은 문자열이 됨)
+    orjson = None
+
+# 실행: 저장소 루트에서 `python -m rag.extract_load`
 # .env 파일에서 환경 변수 로드
 load_dotenv()
 
@@ -14,59 +26,297 @@ DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
-GCS_BUCKET_NAME = "job-agent-raw-json"
+# 지정하면 위 MySQL 설정 대신 사용 (예: sqlite:///data/jobs.sqlite3 로 로컬 측정)
+DB_URL = os.getenv("DB_URL", "")
+GCS_BUCKET_NAME = os.getenv("GCS_BUCKET_NAME", "job-agent-raw-json")
 GCS_DESTINATION_FOLDER = "rag-source-data" # 파일을 저장할 GCS 폴더
+STORAGE_URI = os.getenv("STORAGE_URI", f"gs://{GCS_BUCKET_NAME}")  # 로컬 경로나 memory://도 가능
 
 # --- 2. 분할 설정 ---
-LINES_PER_FILE = 2500  # 파일당 최대 라인 수 (10MB를 넘지 않도록 조절)
+LINES_PER_FILE = 2500  # 파일당 최대 라인 수
+MAX_PART_BYTES = int(os.getenv("MAX_PART_BYTES", 9 * 1024 * 1024))  # 파일당 최대 크기 (RAG Engine 파일 제한 10MB 아래)
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "10000"))  # DB에서 한 번에 읽는 행 수 (메모리 사용량 상한)
 
-def process_and_upload_in_chunks():
-    """DB 데이터를 여러 개의 작은 JSONL 파일로 분할하여 GCS에 직접 업로드합니다."""
-    
-    print("--- 1. 데이터베이스 연결 및 전체 데이터 추출 ---")
+# --- 3. 병렬 내보내기 설정 ---
+# rec_idx 구간(구간당 LINES_PER_FILE행)을 작업 단위로 나눠 EXPORT_WORKERS개 프로세스가 동시에 읽고 씁니다.
+# 작업이 끝날 때마다 매니페스트(part별 행 수/sha256)를 저장하므로 --resume으로 실패한 구간만 다시 실행할 수 있습니다.
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "0"))  # 0이면 순차 내보내기
+EXPORT_MANIFEST_BLOB = "rag-serving/export_manifest.json"
+# 순차(job_data_part_{n})와 병렬(job_data_part_{구간}_{n}) 내보내기가 같이 쓰는 접두사.
+# 어느 쪽이든 끝나면 이번 실행이 쓰지 않은 이 접두사의 파일을 지워 두 방식의 결과가 섞이지 않게 합니다.
+# (같은 폴더의 크롤러 part 파일 job_{날짜}_{실행 시각}_part_{n}은 건드리지 않습니다.)
+EXPORT_PART_PREFIX = f"{GCS_DESTINATION_FOLDER}/job_data_part_"
+
+EXPORT_COLUMNS = "rec_idx, title, company, description, location, experience, employment_type, posted_date, deadline_date, link"
+EXPORT_WHERE = "description IS NOT NULL AND description != ''"
+EXPORT_QUERY = f"SELECT {EXPORT_COLUMNS} FROM job_raw WHERE {EXPORT_WHERE}"
+
+
+def db_engine(url: str = None):
+    url = url or DB_URL
+    if url:
+        return create_engine(url)
     connection_string = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-    engine = create_engine(connection_string)
-    query = "SELECT rec_idx, title, company, description, location, experience, employment_type, posted_date, deadline_date, link FROM job_raw WHERE description IS NOT NULL AND description != ''"
-    df = pd.read_sql(query, engine)
-    df = df.where(pd.notnull(df), None)
-    print(f"✅ 총 {len(df)}개의 데이터를 DB에서 가져왔습니다.")
-
-    print(f"--- 2. GCS 버킷 '{GCS_BUCKET_NAME}'으로 분할 업로드 시작 ---")
-    
-    storage_client = storage.Client(project=os.getenv("PROJECT_ID"))
-    bucket = storage_client.bucket(GCS_BUCKET_NAME)
-    
-    file_index = 1
-    line_count = 0
-    
-    # 첫 번째 파일을 엽니다.
-    gcs_blob_name = f"{GCS_DESTINATION_FOLDER}/job_data_part_{file_index}.jsonl"
-    blob = bucket.blob(gcs_blob_name)
-    f = blob.open("w", encoding="utf-8")
-
-    for index, row in df.iterrows():
-        # 설정한 라인 수를 초과하면, 현재 파일을 닫고 새 파일을 엽니다.
-        if line_count >= LINES_PER_FILE:
-            f.close() # 현재 파일 스트림을 닫아 업로드를 완료합니다.
-            print(f"✅ {gcs_blob_name} 업로드 완료.")
-            
-            file_index += 1
-            line_count = 0
-            gcs_blob_name = f"{GCS_DESTINATION_FOLDER}/job_data_part_{file_index}.jsonl"
-            blob = bucket.blob(gcs_blob_name)
-            f = blob.open("w", encoding="utf-8")
-
-        # JSONL 레코드 생성 및 파일에 쓰기
-        content = row['title'] + "\n\n" + row['description']
-        metadata = {k: v for k, v in row.items() if k not in ['rec_idx', 'description']}
-        json_record = {"id": str(row['rec_idx']), "structData": metadata, "content": content, }
-        f.write(json.dumps(json_record, ensure_ascii=False) + "\n")
-        line_count += 1
-        
-    # 마지막 파일 닫기
-    f.close()
-    print(f"✅ {gcs_blob_name} 업로드 완료.")
-    print(f"\n총 {file_index}개의 파일로 분할하여 업로드를 완료했습니다.")
+    return create_engine(connection_string)
+
+
+def _json_default(value):
+    """JSON 기본 타입이 아닌 DB 값(DATE/DATETIME, DECIMAL 등) → 문자열. orjson과 표준 json이 같은 결과를 내도록 둘 다 씁니다."""
+    if isinstance(value, date):  # datetime 포함
+        return value.isoformat()  # orjson의 날짜 직렬화와 같은 형식
+    return str(value)
+
+
+def _dumps(record: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(record, default=_json_default)
+    return json.dumps(record, ensure_ascii=False, default=_json_default).encode("utf-8")
+
+
+def iter_chunks(engine, query: str = EXPORT_QUERY, chunksize: int = EXPORT_CHUNK_ROWS):
+    """서버 측 커서(stream_results)로 chunksize행씩 DataFrame을 돌려줍니다. 전체 테이블을 메모리에 올리지 않습니다."""
+    with engine.connect().execution_options(stream_results=True) as conn:
+        yield from pd.read_sql(text(query), conn, chunksize=chunksize)
+
+
+def serialize_chunk(df: pd.DataFrame) -> list:
+    """DataFrame 청크 → JSONL 줄(bytes, 줄바꿈 포함) 목록
+
+    content/id는 열 단위 연산으로 한 번에 만들고, 행마다 하는 일은 dict 하나를 직렬화하는 것뿐입니다.
+    """
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = df[column].dt.strftime('%Y-%m-%d')
+    df = df.astype(object).where(pd.notnull(df), None)
+    ids = df['rec_idx'].astype(str).tolist()
+    contents = (df['title'].fillna('').astype(str) + "\n\n" + df['description'].fillna('').astype(str)).tolist()
+    meta_columns = [column for column in df.columns if column not in ('rec_idx', 'description')]
+    meta_values = zip(*(df[column].tolist() for column in meta_columns))
+    return [_dumps({"id": rec_id, "structData": dict(zip(meta_columns, values)), "content": content}) + b"\n"
+            for rec_id, values, content in zip(ids, meta_values, contents)]
+
+
+class PartWriter:
+    """JSONL 줄을 모아 크기(max_bytes)나 줄 수(max_lines)가 차면 part 파일 하나로 씁니다."""
+
+    def __init__(self, sink, name_format: str, max_bytes: int = MAX_PART_BYTES, max_lines: int = LINES_PER_FILE,
+                 start_index: int = 1):
+        self.sink = sink
+        self.name_format = name_format
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+        self.file_index = start_index
+        self.parts = []  # {"name", "rows", "bytes", "sha256"}
+        self._lines = []
+        self._bytes = 0
+
+    def add(self, line: bytes):
+        if self._lines and (self._bytes + len(line) > self.max_bytes or len(self._lines) >= self.max_lines):
+            self.flush()
+        self._lines.append(line)
+        self._bytes += len(line)
+
+    def flush(self):
+        if not self._lines:
+            return
+        name = self.name_format.format(index=self.file_index)
+        data = b"".join(self._lines)
+        self.sink.write(name, data, content_type="application/jsonl")
+        self.parts.append({"name": name, "rows": len(self._lines), "bytes": self._bytes,
+                           "sha256": hashlib.sha256(data).hexdigest()})
+        print(f"✅ {name} 업로드 완료. ({len(self._lines)}줄, {self._bytes / 1024:.0f} KB)")
+        self.file_index += 1
+        self._lines = []
+        self._bytes = 0
+
+
+def process_and_upload_in_chunks():
+    """DB 데이터를 청크 단위로 읽어 여러 개의 작은 JSONL 파일로 분할 업로드합니다."""
+
+    print("--- 1. 데이터베이스 연결 ---")
+    engine = db_engine()
+
+    sink = create_sink(STORAGE_URI, project=os.getenv("PROJECT_ID"))
+    print(f"--- 2. 저장소 '{sink.uri()}'으로 분할 업로드 시작 (청크 {EXPORT_CHUNK_ROWS}행, part 최대 {MAX_PART_BYTES / 1024 / 1024:.0f}MB) ---")
+
+    start = time.perf_counter()
+    writer = PartWriter(sink, f"{EXPORT_PART_PREFIX}{{index}}.jsonl")
+    total_rows = 0
+    for chunk in iter_chunks(engine):
+        for line in serialize_chunk(chunk):
+            writer.add(line)
+        total_rows += len(chunk)
+    # 마지막 파일 쓰기
+    writer.flush()
+    delete_stale_parts(sink, {part["name"] for part in writer.parts})
+    # 이전 병렬 내보내기의 매니페스트가 --resume으로 다시 쓰이지 않도록 이번 결과로 바꿉니다.
+    save_export_manifest(sink, {
+        "query": EXPORT_QUERY, "status": "done", "mode": "sequential",
+        "finished_at": datetime.now().isoformat(timespec="seconds"), "total_rows": total_rows,
+        "total_parts": len(writer.parts),
+        "tasks": [{"id": 0, "after": None, "upto": None, "status": "done", "rows": total_rows, "parts": writer.parts}],
+    })
+    elapsed = time.perf_counter() - start
+    print(f"\n총 {total_rows}개의 데이터를 {len(writer.parts)}개의 파일로 분할하여 업로드를 완료했습니다. "
+          f"({elapsed:.1f}초, {total_rows / max(elapsed, 1e-9):.0f}행/초)")
+
+
+# --- 병렬 내보내기 ---
+
+def _keyset_condition(after, upto, where: str = EXPORT_WHERE) -> str:
+    conditions = [where] if where else []
+    if after is not None:
+        conditions.append("rec_idx > :after")
+    if upto is not None:
+        conditions.append("rec_idx <= :upto")
+    return " AND ".join(conditions) or "1 = 1"
+
+
+def plan_ranges(engine, rows_per_range: int = LINES_PER_FILE) -> list:
+    """rec_idx 순서로 rows_per_range행씩 끊은 구간 [(after, upto)] (after 초과 ~ upto 이하, None은 끝이 열림)
+
+    구간은 기본 키(rec_idx)만으로 나누고 본문 조건(EXPORT_WHERE)은 내보낼 때 적용하므로, 계획 단계에서는 본문 열을 읽지 않습니다.
+    (본문이 빈 행은 구간 안에서 빠지므로 구간의 실제 내보내기 행 수는 rows_per_range 이하입니다.)
+    """
+    ranges, after = [], None
+    with engine.connect() as conn:
+        while True:
+            query = (f"SELECT rec_idx FROM job_raw WHERE {_keyset_condition(after, None, where=None)} "
+                     f"ORDER BY rec_idx LIMIT 1 OFFSET {rows_per_range - 1}")
+            upto = conn.execute(text(query), {"after": after}).scalar()
+            if upto is None:
+                ranges.append((after, None))
+                return ranges
+            ranges.append((after, upto))
+            after = upto
+
+
+def iter_keyset_chunks(engine, after, upto, page_rows: int = EXPORT_CHUNK_ROWS):
+    """(after, upto] 구간을 rec_idx 키셋 페이지네이션으로 page_rows행씩 읽습니다. (OFFSET 없이 인덱스로 바로 이동)"""
+    with engine.connect() as conn:
+        while True:
+            query = (f"SELECT {EXPORT_COLUMNS} FROM job_raw WHERE {_keyset_condition(after, upto)} "
+                     f"ORDER BY rec_idx LIMIT {page_rows}")
+            chunk = pd.read_sql(text(query), conn, params={"after": after, "upto": upto})
+            if chunk.empty:
+                return
+            yield chunk
+            if len(chunk) < page_rows:
+                return
+            after = chunk['rec_idx'].tolist()[-1]  # numpy 값이 아닌 파이썬 값으로 바인딩
+
+
+_worker_resources = {}
+
+
+def export_range(task_id: int, after, upto, db_url: str, storage_uri: str):
+    """구간 하나를 읽어 job_data_part_{task_id}_{n}.jsonl로 씁니다. 워커 프로세스/스레드에서 실행됩니다."""
+    key = (db_url, storage_uri)
+    if key not in _worker_resources:
+        _worker_resources[key] = (db_engine(db_url), create_sink(storage_uri, project=os.getenv("PROJECT_ID")))
+    engine, sink = _worker_resources[key]
+    writer = PartWriter(sink, f"{EXPORT_PART_PREFIX}{task_id}_{{index}}.jsonl")
+    rows = 0
+    for chunk in iter_keyset_chunks(engine, after, upto):
+        for line in serialize_chunk(chunk):
+            writer.add(line)
+        rows += len(chunk)
+    writer.flush()
+    return task_id, rows, writer.parts
+
+
+def load_export_manifest(sink):
+    try:
+        return json.loads(sink.read(EXPORT_MANIFEST_BLOB))
+    except Exception:
+        return None
+
+
+def save_export_manifest(sink, manifest: dict):
+    sink.write(EXPORT_MANIFEST_BLOB, json.dumps(manifest, ensure_ascii=False, indent=1).encode("utf-8"),
+               content_type="application/json")
+
+
+def delete_stale_parts(sink, keep: set) -> int:
+    """EXPORT_PART_PREFIX 파일 중 이번 실행이 쓰지 않은 것(이전 순차/병렬 내보내기의 남은 part)을 지웁니다."""
+    stale = [name for name in sink.list(EXPORT_PART_PREFIX) if name not in keep]
+    for name in stale:
+        sink.delete(name)
+    if stale:
+        print(f"🧹 이전 내보내기에서 남은 part {len(stale)}개를 지웠습니다.")
+    return len(stale)
+
+
+def export_parallel(workers: int = EXPORT_WORKERS, resume: bool = False, db_url: str = DB_URL,
+                    storage_uri: str = STORAGE_URI):
+    """rec_idx 구간을 workers개 워커로 동시에 내보내고 매니페스트를 남깁니다. 성공하면 매니페스트를 반환합니다."""
+    engine = db_engine(db_url)
+    sink = create_sink(storage_uri, project=os.getenv("PROJECT_ID"))
+    start = time.perf_counter()
+
+    previous = load_export_manifest(sink)
+    if resume and previous and previous.get("query") == EXPORT_QUERY and previous.get("status") != "done":
+        manifest = previous
+        existing = set(sink.list(f"{GCS_DESTINATION_FOLDER}/"))
+        for task in manifest["tasks"]:
+            # 기록은 완료인데 part가 사라졌으면 다시 실행합니다.
+            if task["status"] == "done" and not all(part["name"] in existing for part in task["parts"]):
+                task["status"] = "pending"
+        print(f"--- 이전 내보내기를 이어서 실행합니다. (남은 구간 {sum(t['status'] != 'done' for t in manifest['tasks'])}개) ---")
+    else:
+        ranges = plan_ranges(engine)
+        manifest = {
+            "query": EXPORT_QUERY, "status": "running", "started_at": datetime.now().isoformat(timespec="seconds"),
+            "tasks": [{"id": i, "after": after, "upto": upto, "status": "pending", "rows": 0, "parts": []}
+                      for i, (after, upto) in enumerate(ranges, 1)],
+        }
+        print(f"--- rec_idx 구간 {len(ranges)}개로 나눴습니다. ({time.perf_counter() - start:.1f}초) ---")
+    save_export_manifest(sink, manifest)
+
+    pending = [task for task in manifest["tasks"] if task["status"] != "done"]
+    # memory:// 저장소는 프로세스 사이에 공유되지 않으므로 스레드로 실행합니다.
+    executor_class = ThreadPoolExecutor if sink.scheme == "memory" else ProcessPoolExecutor
+    if sink.scheme == "memory":
+        _worker_resources[(db_url, storage_uri)] = (engine, sink)
+    failed = 0
+    with executor_class(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(export_range, task["id"], task["after"], task["upto"], db_url, storage_uri): task
+                   for task in pending}
+        for future in as_completed(futures):
+            task = futures[future]
+            try:
+                _, task["rows"], task["parts"] = future.result()
+                task["status"] = "done"
+            except Exception as e:
+                task["status"] = "failed"
+                failed += 1
+                print(f"❗ 구간 {task['id']} ({task['after']} ~ {task['upto']}) 내보내기 실패: {e}")
+            save_export_manifest(sink, manifest)
+
+    if failed:
+        print(f"🚨 {failed}개 구간이 실패했습니다. --resume으로 실패한 구간만 다시 실행하세요.")
+        return None
+
+    # 이전 내보내기(순차/병렬)에만 있던 part는 지웁니다.
+    current = {part["name"] for task in manifest["tasks"] for part in task["parts"]}
+    delete_stale_parts(sink, current)
+
+    elapsed = time.perf_counter() - start
+    manifest.update(status="done", finished_at=datetime.now().isoformat(timespec="seconds"),
+                    total_rows=sum(task["rows"] for task in manifest["tasks"]),
+                    total_parts=len(current))
+    save_export_manifest(sink, manifest)
+    print(f"\n총 {manifest['total_rows']}개의 데이터를 {len(current)}개의 파일로 병렬 업로드했습니다. "
+          f"(워커 {workers}개, {elapsed:.1f}초, {manifest['total_rows'] / max(elapsed, 1e-9):.0f}행/초)")
+    return manifest
+
 
 if __name__ == "__main__":
-    process_and_upload_in_chunks()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="job_raw → JSONL part 파일 내보내기")
+    parser.add_argument("--workers", type=int, default=EXPORT_WORKERS, help="0이면 순차, 1 이상이면 rec_idx 구간 병렬")
+    parser.add_argument("--resume", action="store_true", help="병렬 모드에서 이전에 실패/중단된 구간만 다시 실행")
+    args = parser.parse_args()
+    if args.workers > 0:
+        export_parallel(args.workers, args.resume)
+    else:
+        process_and_upload_in_chunks()
@@ -1,13 +1,15 @@
+import os
+
 import vertexai
 from vertexai import rag
 
-# --- 설정 ---
-PROJECT_ID = "job-agent-471006" # 본인 프로젝트 ID
-LOCATION = "us-east4"
-CORPUS_DISPLAY_NAME = "job-agent-corpus" # RAG 코퍼스 이름
+# --- 설정 (환경 변수로 덮어쓸 수 있습니다) ---
+PROJECT_ID = os.getenv("PROJECT_ID", "job-agent-471006") # 본인 프로젝트 ID
+LOCATION = os.getenv("LOCATION", "us-east4")
+CORPUS_DISPLAY_NAME = os.getenv("CORPUS_DISPLAY_NAME", "job-agent-corpus") # RAG 코퍼스 이름
 
 # 2단계에서 출력된 GCS URI를 여기에 붙여넣으세요.
-GCS_URI_TO_INGEST = "gs://job-agent-raw-json/rag-source-data/"
+GCS_URI_TO_INGEST = os.getenv("GCS_URI_TO_INGEST", "gs://job-agent-raw-json/rag-source-data/")
 
 def load_data_to_rag_engine():
     """GCS의 파일들을 RAG Engine으로 가져옵니다."""
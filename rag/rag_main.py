@@ -8,6 +8,8 @@ from vertexai.preview import rag
 from vertexai.generative_models import GenerativeModel, Tool
 from datetime import datetime
 
+from rag_service.corpus_version import CorpusVersion
+
 import json
 import os
 import uvicorn
@@ -48,6 +50,13 @@ RAG 시스템을 통해 검색된 채용 공고 문서들을 바탕으로 아래
 - **[회사명]:** [추천 이유 설명]
 """
 
+# 크롤러가 동기화를 마친 코퍼스를 가리키는 서빙 코퍼스 표식 (CORPUS_VERSION_URI). 없으면 위 CORPUS_NAME
+corpus_version = CorpusVersion()
+
+
+def serving_corpus():
+    return corpus_version.corpus() or CORPUS_NAME
+
 def vertex_init(PROJECT_ID=PROJECT_ID, LOCATION=LOCATION):
     vertexai.init(project=PROJECT_ID, location=LOCATION)
 
@@ -108,8 +117,9 @@ def query_rebuilder(question: str, MODEL_ID=MODEL_ID):
     return search_keywords + final_filter_string
 
 
-def rerank_model(question: str, CORPUS_NAME=CORPUS_NAME, MODEL_ID=MODEL_ID,
+def rerank_model(question: str, CORPUS_NAME=None, MODEL_ID=MODEL_ID,
                  similarity_top_k=similarity_top_k, system_prompt=system_prompt):
+    CORPUS_NAME = CORPUS_NAME or serving_corpus()
     vertex_init()
     config = rag.RagRetrievalConfig(
         top_k=similarity_top_k,
@@ -0,0 +1,375 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from datetime import date
+
+import numpy as np
+
+from rag_service.embedding_pipeline import EMBEDDING_CACHE_PATH, EmbeddingCache, EmbeddingPipeline
+from rag_service.local_index import day_number, read_source_records
+
+# 공고 임베딩용 IVF(inverted file) 근사 최근접 이웃 인덱스
+# - 벡터를 k-means 중심(centroid) 목록으로 나누고, 질의와 가까운 IVF_NPROBE개 목록만 정확히 계산합니다.
+# - 모든 배열은 디렉터리의 raw 파일로 두고 memmap으로 열어 시작이 빠릅니다.
+# - 매일 새 공고는 파일 끝에 덧붙이고(append), 마감된 공고는 tombstone으로 지웁니다.
+# - 학습 시점보다 공고가 IVF_RETRAIN_GROWTH배 이상 늘거나 지운 행 비율이 IVF_COMPACT_RATIO를 넘으면
+#   중심을 다시 학습하고 목록 순서대로 파일을 다시 써서(compact) 목록 하나가 파일에서 연속되게 합니다.
+# - 행마다 공고 본문 해시(hashes.u64)를 두어, 본문이 바뀐 공고는 다시 임베딩해 바꿔 넣습니다.
+ANN_INDEX_DIR = os.getenv("ANN_INDEX_DIR", "data/ann_index")
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "8"))
+IVF_TRAIN_SAMPLE = 20000
+IVF_TRAIN_ITERATIONS = 10
+IVF_RETRAIN_GROWTH = 4.0
+IVF_COMPACT_RATIO = 0.3
+NO_DEADLINE = np.iinfo(np.int32).max  # 상시채용/마감일 없음
+
+_FILES = {  # 파일 이름 → (dtype, 행당 원소 수가 dim인지)
+    'vectors.f32': (np.float32, True),
+    'lists.i32': (np.int32, False),
+    'expires.i32': (np.int32, False),
+    'deleted.u8': (np.uint8, False),
+    'hashes.u64': (np.uint64, False),  # 본문 해시 (0이면 알 수 없음: 이 파일이 생기기 전에 만든 행)
+}
+
+
+def content_hash(text: str) -> int:
+    """공고 본문의 64비트 해시 (0은 '알 수 없음'으로 쓰므로 피합니다)"""
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little") or 1
+
+
+def default_nlist(count: int) -> int:
+    return max(1, min(int(4 * np.sqrt(count)), count))
+
+
+def train_centroids(vectors: np.ndarray, nlist: int, iterations: int = IVF_TRAIN_ITERATIONS, seed: int = 0):
+    """정규화된 벡터에 대한 구면(spherical) k-means. 표본 IVF_TRAIN_SAMPLE개로 학습합니다."""
+    rng = np.random.default_rng(seed)
+    sample = vectors
+    if len(vectors) > IVF_TRAIN_SAMPLE:
+        sample = vectors[np.sort(rng.choice(len(vectors), IVF_TRAIN_SAMPLE, replace=False))]
+    sample = np.asarray(sample, dtype=np.float32)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        empty = ~sums.any(axis=1)
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]  # 빈 목록은 임의 표본으로 다시 시작
+        centroids = sums / np.linalg.norm(sums, axis=1, keepdims=True)
+    return centroids.astype(np.float32)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, batch_size: int = 8192) -> np.ndarray:
+    return np.concatenate([np.argmax(np.asarray(vectors[i:i + batch_size]) @ centroids.T, axis=1)
+                           for i in range(0, len(vectors), batch_size)] or [np.empty(0)]).astype(np.int32)
+
+
+def exact_topk(vectors: np.ndarray, queries: np.ndarray, k: int):
+    """비교 기준용 전수 코사인 top-k (행 번호 (B, k))"""
+    scores = queries @ np.asarray(vectors).T
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+
+
+class IVFIndex:
+    """덧붙이기/지우기가 가능한 memmap 기반 IVF-Flat 인덱스
+
+    기본(읽기 전용)으로 열면 meta.json의 count행만 읽기 전용으로 매핑하고 파일은 건드리지 않습니다.
+    갱신 작업이 덧붙이는 중에 서버가 인덱스를 열어도 쓰는 쪽의 새 행을 잘라내지 않습니다.
+    `writable=True`(갱신 작업)로 열 때만 중단된 덧붙이기를 정리하고 add/delete/expire를 쓸 수 있습니다.
+    """
+
+    def __init__(self, directory: str, writable: bool = False):
+        self.directory = directory
+        self.writable = writable
+        with open(self._path("meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.dim = self.meta['dim']
+        self.count = self.meta['count']
+        self.centroids = np.load(self._path("centroids.npy"))
+        with open(self._path("ids.txt"), encoding="utf-8") as f:
+            self.ids = [line.rstrip("\n") for line, _ in zip(f, range(self.count))]
+        if len(self.ids) != self.count:
+            raise ValueError(f"ids.txt에 {len(self.ids)}행뿐이지만 meta.json의 count는 {self.count}입니다. ({directory})")
+        if writable:
+            self._recover()
+        self._row_by_id = {rec_id: row for row, rec_id in enumerate(self.ids)}
+        self._open_arrays()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _recover(self):
+        """덧붙이다 중간에 멈췄으면 meta.json의 count 뒤쪽을 버립니다. (ids.txt도 같이 잘라야 다음 덧붙이기가 어긋나지 않음)"""
+        with open(self._path("ids.txt"), encoding="utf-8") as f:
+            lines = sum(1 for _ in f)
+        if lines != self.count:
+            tmp = self._path("ids.txt.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.writelines(f"{rec_id}\n" for rec_id in self.ids)
+            os.replace(tmp, self._path("ids.txt"))
+        for name, (dtype, per_dim) in _FILES.items():
+            size = self.count * np.dtype(dtype).itemsize * (self.dim if per_dim else 1)
+            if not os.path.exists(self._path(name)):
+                open(self._path(name), "wb").close()
+            if os.path.getsize(self._path(name)) != size:
+                os.truncate(self._path(name), size)  # 없던 파일(hashes.u64)은 0으로 채워집니다.
+
+    def _open_arrays(self):
+        def view(name, mode="r"):
+            dtype, per_dim = _FILES[name]
+            shape = (self.count, self.dim) if per_dim else (self.count,)
+            if self.count == 0:
+                return np.zeros(shape, dtype=dtype)
+            if name == 'hashes.u64' and not self.writable and not os.path.exists(self._path(name)):
+                return np.zeros(shape, dtype=dtype)  # 이 파일이 생기기 전에 만든 인덱스: 해시를 알 수 없음
+            # count행까지만 매핑하므로 쓰는 쪽이 그 뒤에 덧붙이는 중이어도 영향이 없습니다.
+            return np.memmap(self._path(name), dtype=dtype, mode=mode, shape=shape)
+
+        self.vectors = view('vectors.f32')
+        self.expires = view('expires.i32')
+        self.deleted = view('deleted.u8', mode="r+" if self.writable else "r")
+        self.hashes = view('hashes.u64')
+        lists = np.asarray(view('lists.i32'))
+        # 목록별 행 번호 (CSR): order[offsets[c]:offsets[c+1]]가 목록 c의 행들
+        self.order = np.argsort(lists, kind="stable").astype(np.int64)
+        self.offsets = np.searchsorted(lists[self.order], np.arange(len(self.centroids) + 1))
+
+    @classmethod
+    def create(cls, directory: str, vectors: np.ndarray, ids: list, expires: np.ndarray = None,
+               nlist: int = None, embedder_name: str = None, hashes: np.ndarray = None):
+        """벡터로 중심을 학습하고, 목록 순서대로 정렬해 새 인덱스를 씁니다."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        expires = np.full(len(ids), NO_DEADLINE, dtype=np.int32) if expires is None else np.asarray(expires, np.int32)
+        hashes = np.zeros(len(ids), dtype=np.uint64) if hashes is None else np.asarray(hashes, np.uint64)
+        centroids = train_centroids(vectors, nlist or default_nlist(len(vectors)))
+        lists = _assign(vectors, centroids)
+        order = np.argsort(lists, kind="stable")
+
+        tmp = directory.rstrip("/") + ".tmp"
+        os.makedirs(tmp, exist_ok=True)
+        np.save(os.path.join(tmp, "centroids.npy"), centroids)
+        vectors[order].tofile(os.path.join(tmp, "vectors.f32"))
+        lists[order].tofile(os.path.join(tmp, "lists.i32"))
+        expires[order].tofile(os.path.join(tmp, "expires.i32"))
+        np.zeros(len(ids), dtype=np.uint8).tofile(os.path.join(tmp, "deleted.u8"))
+        hashes[order].tofile(os.path.join(tmp, "hashes.u64"))
+        with open(os.path.join(tmp, "ids.txt"), "w", encoding="utf-8") as f:
+            f.writelines(f"{ids[row]}\n" for row in order)
+        meta = {'dim': int(vectors.shape[1]), 'count': len(ids), 'trained_count': len(ids),
+                'nlist': len(centroids), 'embedder': embedder_name}
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        # 완성된 디렉터리로 한 번에 바꿔 읽는 쪽이 반쯤 쓴 인덱스를 보지 않게 합니다.
+        if os.path.exists(directory):
+            old = directory.rstrip("/") + ".old"
+            os.rename(directory, old)
+            os.rename(tmp, directory)
+            for name in os.listdir(old):
+                os.remove(os.path.join(old, name))
+            os.rmdir(old)
+        else:
+            os.rename(tmp, directory)
+        return cls(directory, writable=True)
+
+    def _write_meta(self):
+        tmp = self._path("meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, self._path("meta.json"))
+
+    def __contains__(self, rec_id):
+        row = self._row_by_id.get(rec_id)
+        return row is not None and not self.deleted[row]
+
+    def content_hash_of(self, rec_id) -> int:
+        """살아 있는 행의 본문 해시 (없거나 알 수 없으면 0)"""
+        row = self._row_by_id.get(rec_id)
+        return 0 if row is None or self.deleted[row] else int(self.hashes[row])
+
+    @property
+    def live_count(self) -> int:
+        return self.count - int(np.count_nonzero(self.deleted))
+
+    def add(self, ids: list, vectors: np.ndarray, expires: np.ndarray = None, hashes: np.ndarray = None):
+        """새 공고를 파일 끝에 덧붙입니다. 이미 있는 id면 이전 행을 지우고 새 벡터로 바꿉니다."""
+        if not ids:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        expires = np.full(len(ids), NO_DEADLINE, dtype=np.int32) if expires is None else np.asarray(expires, np.int32)
+        hashes = np.zeros(len(ids), dtype=np.uint64) if hashes is None else np.asarray(hashes, np.uint64)
+        self.delete([rec_id for rec_id in ids if rec_id in self._row_by_id])
+        lists = _assign(vectors, self.centroids)
+
+        for name, values in (('vectors.f32', vectors), ('lists.i32', lists), ('expires.i32', expires),
+                             ('deleted.u8', np.zeros(len(ids), dtype=np.uint8)), ('hashes.u64', hashes)):
+            with open(self._path(name), "ab") as f:
+                values.tofile(f)
+        with open(self._path("ids.txt"), "a", encoding="utf-8") as f:
+            f.writelines(f"{rec_id}\n" for rec_id in ids)
+        for rec_id in ids:
+            self._row_by_id[rec_id] = len(self.ids)
+            self.ids.append(rec_id)
+        # count는 모든 파일을 쓴 뒤 마지막에 늘립니다.
+        self.count += len(ids)
+        self.meta['count'] = self.count
+        self._write_meta()
+        self._open_arrays()
+
+    def delete(self, ids: list) -> int:
+        rows = [self._row_by_id[rec_id] for rec_id in ids if rec_id in self._row_by_id]
+        if rows:
+            self.deleted[rows] = 1
+            self.deleted.flush()
+        return len(rows)
+
+    def expire(self, today: date = None) -> int:
+        """마감일이 지난 공고를 지우고, 새로 지운 개수를 돌려줍니다."""
+        today = (today or date.today()).toordinal()
+        expired = (np.asarray(self.expires) < today) & (self.deleted == 0)
+        if expired.any():
+            self.deleted[expired] = 1
+            self.deleted.flush()
+        return int(expired.sum())
+
+    def needs_rebuild(self) -> bool:
+        grown = self.count >= self.meta['trained_count'] * IVF_RETRAIN_GROWTH
+        return grown or (self.count and 1 - self.live_count / self.count > IVF_COMPACT_RATIO)
+
+    def rebuild(self, nlist: int = None):
+        """지운 행을 빼고 중심을 다시 학습해 파일을 새로 씁니다."""
+        live = np.flatnonzero(self.deleted == 0)
+        return IVFIndex.create(self.directory, self.vectors[live], [self.ids[row] for row in live],
+                               self.expires[live], nlist, self.meta.get('embedder'), self.hashes[live])
+
+    def search(self, queries: np.ndarray, k: int = 10, nprobe: int = IVF_NPROBE):
+        """질의 묶음(B, dim)별 (id 목록, 점수 배열). 가까운 nprobe개 목록만 계산합니다."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        nprobe = min(nprobe, len(self.centroids))
+        probes = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+        results = []
+        for query, lists in zip(queries, probes):
+            rows = np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in lists])
+            rows = rows[self.deleted[rows] == 0]
+            if len(rows) == 0:
+                results.append(([], np.empty(0, dtype=np.float32)))
+                continue
+            rows.sort()  # 파일 순서대로 읽어 memmap 접근을 순차적으로
+            scores = self.vectors[rows] @ query
+            top = min(k, len(rows))
+            best = np.argpartition(-scores, top - 1)[:top]
+            best = best[np.argsort(-scores[best])]
+            results.append(([self.ids[rows[i]] for i in best], scores[best]))
+        return results
+
+
+def record_expiry(record: dict) -> int:
+    day = day_number(record.get('structData', {}).get('마감일', ''))
+    return NO_DEADLINE if day < 0 else day
+
+
+def record_hash(record: dict) -> int:
+    return content_hash(record.get('content', ''))
+
+
+def update_from_records(directory: str, records: list, pipeline: EmbeddingPipeline, today: date = None):
+    """하루치 갱신: 마감된 공고를 지우고, 인덱스에 없거나 본문이 바뀐 공고만 임베딩해 덧붙입니다."""
+    embedder = pipeline.embedder
+    today = today or date.today()
+    records = [record for record in records if record_expiry(record) >= today.toordinal()]
+    if not os.path.exists(os.path.join(directory, "meta.json")):
+        if not records:
+            print("⚠️ 인덱스를 만들 공고가 없습니다.")
+            return None
+        index = IVFIndex.create(directory, pipeline.embed_records(records), [r['id'] for r in records],
+                                [record_expiry(r) for r in records], embedder_name=embedder.name,
+                                hashes=[record_hash(r) for r in records])
+        print(f"✅ 새 ANN 인덱스를 만들었습니다: 공고 {index.count}개, 목록 {len(index.centroids)}개")
+        return index
+
+    index = IVFIndex(directory, writable=True)
+    if index.meta.get('embedder') != embedder.name:
+        raise ValueError(f"인덱스 임베딩({index.meta.get('embedder')})과 현재 임베딩({embedder.name})이 다릅니다.")
+    expired = index.expire(today)
+    new = [record for record in records if record['id'] not in index]
+    changed = [record for record in records
+               if record['id'] in index and index.content_hash_of(record['id']) != record_hash(record)]
+    if new or changed:
+        # add는 이미 있는 id의 이전 행을 지우고 새 행으로 바꿉니다.
+        upserts = new + changed
+        index.add([r['id'] for r in upserts], pipeline.embed_records(upserts), [record_expiry(r) for r in upserts],
+                  [record_hash(r) for r in upserts])
+    print(f"🔄 ANN 인덱스 갱신: 새 공고 {len(new)}개 추가, 본문 변경 {len(changed)}개 재임베딩, "
+          f"마감 {expired}개 삭제 (유효 {index.live_count}개)")
+    if index.needs_rebuild():
+        index = index.rebuild()
+        print(f"🧱 ANN 인덱스를 다시 학습했습니다: 공고 {index.count}개, 목록 {len(index.centroids)}개")
+    return index
+
+
+def synthetic_vectors(n: int, dim: int, clusters: int = 200, seed: int = 0) -> np.ndarray:
+    """벤치마크용 군집 구조가 있는 정규화 벡터"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(clusters, size=n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def benchmark(n: int, dim: int, queries: int, k: int, nprobes: list, directory: str):
+    """전수 검색 대비 nprobe별 recall@k와 질의당 지연 시간"""
+    data = synthetic_vectors(n + queries, dim)
+    vectors, query_vectors = data[:n], data[n:]
+    start = time.perf_counter()
+    index = IVFIndex.create(directory, vectors, [str(i) for i in range(n)])
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    truth = exact_topk(vectors, query_vectors, k)
+    exact_ms = (time.perf_counter() - start) / queries * 1000
+    # 배치 전수 검색은 질의당 시간이 과소평가되므로 한 건씩도 잽니다.
+    start = time.perf_counter()
+    for query in query_vectors[:50]:
+        exact_topk(vectors, query[None, :], k)
+    exact_single_ms = (time.perf_counter() - start) / min(queries, 50) * 1000
+
+    rows = []
+    for nprobe in nprobes:
+        start = time.perf_counter()
+        found = [index.search(query[None, :], k, nprobe)[0][0] for query in query_vectors]
+        latency_ms = (time.perf_counter() - start) / queries * 1000
+        hits = sum(len(set(map(int, ids)) & set(expected.tolist())) for ids, expected in zip(found, truth))
+        rows.append({'nprobe': nprobe, 'recall_at_k': round(hits / (queries * k), 4), 'latency_ms': round(latency_ms, 3)})
+    return {'n': n, 'dim': dim, 'k': k, 'nlist': len(index.centroids), 'build_seconds': round(build_seconds, 2),
+            'exact_batched_ms': round(exact_ms, 3), 'exact_single_ms': round(exact_single_ms, 3), 'ivf': rows}
+
+
+if __name__ == "__main__":
+    from rag_service.embeddings import create_embedder
+
+    parser = argparse.ArgumentParser(description="공고 임베딩 ANN(IVF) 인덱스")
+    sub = parser.add_subparsers(dest="command", required=True)
+    update_parser = sub.add_parser("update", help="새 공고를 덧붙이고 마감된 공고를 지웁니다")
+    update_parser.add_argument("--source", required=True, help="JSONL이 있는 디렉터리 또는 gs://버킷/접두사")
+    update_parser.add_argument("--index", default=ANN_INDEX_DIR)
+    update_parser.add_argument("--today", type=date.fromisoformat, default=None)
+    update_parser.add_argument("--cache", default=EMBEDDING_CACHE_PATH, help="임베딩 캐시 경로 (빈 문자열이면 사용 안 함)")
+    bench_parser = sub.add_parser("benchmark", help="전수 검색 대비 recall@k / 지연 시간")
+    bench_parser.add_argument("--n", type=int, default=100000)
+    bench_parser.add_argument("--dim", type=int, default=256)
+    bench_parser.add_argument("--queries", type=int, default=200)
+    bench_parser.add_argument("--k", type=int, default=10)
+    bench_parser.add_argument("--nprobe", default="1,4,8,16,32")
+    bench_parser.add_argument("--index", default="/tmp/ann_benchmark")
+    args = parser.parse_args()
+
+    if args.command == "update":
+        pipeline = EmbeddingPipeline(create_embedder(task_type="RETRIEVAL_DOCUMENT"),
+                                     EmbeddingCache(args.cache) if args.cache else None)
+        update_from_records(args.index, read_source_records(args.source), pipeline, args.today)
+        print(f"🧮 임베딩: {pipeline.summary()}")
+    else:
+        result = benchmark(args.n, args.dim, args.queries, args.k,
+                           [int(x) for x in args.nprobe.split(",")], args.index)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
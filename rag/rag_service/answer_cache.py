@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# /ask 최종 답변 캐시
+# 코퍼스는 하루 한 번만 갱신되므로, 같은 질문 + 같은 재구성 쿼리 + 같은 코퍼스 버전이면 답변도 같다고 봅니다.
+# - 메모리 계층: 프로세스 내 LRU
+# - SQLite 계층(선택): 같은 호스트의 여러 워커/재시작 사이에 공유 (ANSWER_CACHE_PATH를 지정할 때만)
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH", "")
+ANSWER_CACHE_MEMORY_ITEMS = int(os.getenv("ANSWER_CACHE_MEMORY_ITEMS", "1024"))
+
+# 캐시에서 꺼낸 답변. Gemini 응답처럼 .text로 읽습니다.
+CachedAnswer = namedtuple('CachedAnswer', ['text'])
+
+
+def answer_cache_key(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """코퍼스 버전 단위로 무효화되는 2계층(메모리 + SQLite) 답변 캐시"""
+
+    def __init__(self, path: str = ANSWER_CACHE_PATH, memory_items: int = ANSWER_CACHE_MEMORY_ITEMS):
+        self.memory_items = memory_items
+        self.version = None
+        self._memory = OrderedDict()  # key -> text
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+        self.conn = None
+        if path:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.executescript(
+                "CREATE TABLE IF NOT EXISTS answer ("
+                " key TEXT PRIMARY KEY, corpus_version TEXT NOT NULL, text TEXT NOT NULL, created_at REAL NOT NULL);"
+            )
+
+    def set_corpus_version(self, version: str):
+        """코퍼스 버전이 바뀌면 이전 버전의 답변을 모두 지웁니다."""
+        if version == self.version:
+            return
+        with self._lock:
+            if version == self.version:
+                return
+            self._memory.clear()
+            if self.conn is not None:
+                deleted = self.conn.execute("DELETE FROM answer WHERE corpus_version != ?", (version,)).rowcount
+                self.conn.commit()
+                if deleted:
+                    print(f"🧹 코퍼스 버전이 바뀌어 이전 답변 {deleted}개를 지웠습니다. ({version})")
+            self.version = version
+
+    def get(self, key: str):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return self._memory[key]
+            if self.conn is not None:
+                row = self.conn.execute("SELECT text FROM answer WHERE key = ? AND corpus_version = ?",
+                                        (key, self.version)).fetchone()
+                if row is not None:
+                    self.stats['disk_hits'] += 1
+                    self._remember(key, row[0])
+                    return row[0]
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, key: str, text: str):
+        with self._lock:
+            self._remember(key, text)
+            if self.conn is not None:
+                self.conn.execute("INSERT OR REPLACE INTO answer (key, corpus_version, text, created_at) "
+                                  "VALUES (?, ?, ?, ?)", (key, self.version, text, time.time()))
+                self.conn.commit()
+
+    def _remember(self, key, text):
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
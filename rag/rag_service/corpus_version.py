@@ -0,0 +1,101 @@
+import asyncio
+import json
+import os
+import time
+
+# 서빙 코퍼스 표식. 크롤러(crawler.main)가 RAG 코퍼스 동기화를 마칠 때마다
+# {"corpus": ..., "display_name": ..., "imported_at": ...} JSON을 CORPUS_VERSION_URI에 씁니다.
+# RAG 서비스는 "corpus"를 검색 대상 코퍼스로 쓰고, 답변 캐시는 버전이 바뀌면 이전 답변을 모두 버립니다.
+# 표식을 읽지 못하면 같은 폴더의 임포트 매니페스트(CORPUS_IMPORT_MANIFEST_URI)에서 마지막 임포트 시각으로 버전을 만듭니다.
+CORPUS_VERSION_URI = os.getenv("CORPUS_VERSION_URI", "gs://job-agent-raw-json/rag-serving/corpus_version.json")  # 로컬 경로도 가능
+CORPUS_IMPORT_MANIFEST_URI = os.getenv("CORPUS_IMPORT_MANIFEST_URI",
+                                       "gs://job-agent-raw-json/rag-serving/import_manifest.json")
+CORPUS_VERSION_TTL = float(os.getenv("CORPUS_VERSION_TTL", "300"))  # 버전 표식을 다시 읽는 주기(초)
+UNVERSIONED = "job_corpus_unversioned"  # 표식도 매니페스트도 읽지 못했을 때 (임포트 전까지 바뀌지 않음)
+
+
+def read_corpus_stamp(uri: str) -> dict:
+    if uri.startswith("gs://"):
+        from google.cloud import storage
+
+        bucket_name, _, blob_name = uri[len("gs://"):].partition("/")
+        data = storage.Client().bucket(bucket_name).blob(blob_name).download_as_bytes()
+    else:
+        with open(uri, "rb") as f:
+            data = f.read()
+    return json.loads(data)
+
+
+def stamp_version(stamp: dict) -> str:
+    return f"{stamp['display_name']}@{stamp['imported_at']}"
+
+
+def manifest_corpus_version(uri: str = CORPUS_IMPORT_MANIFEST_URI) -> str:
+    """표식이 없을 때의 버전: 임포트 매니페스트의 코퍼스 + 마지막 임포트 시각 (임포트가 돌 때만 바뀝니다)"""
+    manifest = read_corpus_stamp(uri)
+    imported = [entry['imported_at'] for entry in manifest.get('files', {}).values() if entry.get('imported_at')]
+    if not imported:
+        raise ValueError("임포트 기록이 없습니다.")
+    return f"{manifest.get('display_name', manifest.get('corpus'))}@{max(imported)}"
+
+
+class CorpusVersion:
+    """버전 표식을 TTL 동안 캐시해 두고 돌려줍니다. 읽기에 실패하면 매니페스트 → 마지막 값 → UNVERSIONED 순으로 씁니다.
+
+    비동기 핸들러는 `await refresh_async()`를 먼저 불러 GCS 읽기를 스레드에서 끝내 두면,
+    이어지는 `current()`/`corpus()`는 캐시된 값만 돌려주므로 이벤트 루프를 막지 않습니다.
+    """
+
+    def __init__(self, uri: str = CORPUS_VERSION_URI, ttl: float = CORPUS_VERSION_TTL,
+                 manifest_uri: str = CORPUS_IMPORT_MANIFEST_URI):
+        self.uri = uri
+        self.manifest_uri = manifest_uri
+        self.ttl = ttl
+        self._value = None
+        self._corpus = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _stale(self) -> bool:
+        return self._value is None or time.monotonic() - self._checked_at >= self.ttl
+
+    def _read(self):
+        """(버전, 코퍼스 또는 None)"""
+        if self.uri:
+            try:
+                stamp = read_corpus_stamp(self.uri)
+                return stamp_version(stamp), stamp.get('corpus')
+            except Exception as e:
+                print(f"⚠️ 코퍼스 버전 표식을 읽지 못했습니다 ({self.uri}): {e}")
+        if self.manifest_uri:
+            try:
+                return manifest_corpus_version(self.manifest_uri), None
+            except Exception as e:
+                print(f"⚠️ 임포트 매니페스트에서 코퍼스 버전을 만들지 못했습니다 ({self.manifest_uri}): {e}")
+        return None, None
+
+    def _apply(self, value, corpus):
+        self._checked_at = time.monotonic()
+        self._value = value or self._value or UNVERSIONED
+        self._corpus = corpus or self._corpus
+
+    def _refresh(self):
+        if self._stale():
+            self._apply(*self._read())
+
+    async def refresh_async(self):
+        """TTL이 지났으면 표식을 스레드에서 다시 읽습니다. (동시 요청은 한 번의 읽기를 기다림)"""
+        if not self._stale():
+            return
+        async with self._lock:
+            if self._stale():
+                self._apply(*await asyncio.to_thread(self._read))
+
+    def current(self) -> str:
+        self._refresh()
+        return self._value
+
+    def corpus(self):
+        """표식에 적힌 서빙 코퍼스 이름 (표식이 없으면 None)"""
+        self._refresh()
+        return self._corpus
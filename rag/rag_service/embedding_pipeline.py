@@ -0,0 +1,142 @@
+import hashlib
+import os
+import re
+import sqlite3
+import time
+
+import numpy as np
+
+# 수집 단계 임베딩 파이프라인
+# - 공고 content를 문단 단위 청크로 나눕니다.
+# - 청크 텍스트 해시로 중복을 없애고, 영구 캐시(SQLite)에 없는 청크만 배치로 임베딩합니다.
+#   (회사 소개/복리후생 같은 공통 문구와 바뀌지 않은 공고는 다시 임베딩하지 않습니다.)
+# - 공고 벡터는 청크 벡터의 평균을 정규화한 값입니다.
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "data/embedding_cache.sqlite3")
+CHUNK_MAX_CHARS = 1000
+CHUNK_OVERLAP = 100       # 문단 하나가 CHUNK_MAX_CHARS보다 길어 잘라야 할 때 앞 조각과 겹치는 글자 수
+EMBED_BATCH_SIZE = 64     # 임베딩 호출 한 번에 보내는 청크 수
+CHUNK_MIN_CHARS = 200     # 이보다 짧은 문단은 다음 문단과 합칩니다
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+
+def chunk_text(text: str, max_chars: int = CHUNK_MAX_CHARS, overlap: int = CHUNK_OVERLAP) -> list:
+    """빈 줄로 나눈 문단 단위 청크 목록. 짧은 문단은 다음 문단과 합치고, 긴 문단은 겹치게 자릅니다.
+
+    청크 경계가 문단을 따라가므로 여러 공고에 똑같이 들어간 문단은 같은 청크(같은 해시)가 됩니다.
+    """
+    chunks, current = [], ""
+    for paragraph in _PARAGRAPH_RE.split(text):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        current = f"{current}\n{paragraph}" if current else paragraph
+        if len(current) < CHUNK_MIN_CHARS:
+            continue
+        while len(current) > max_chars:
+            chunks.append(current[:max_chars])
+            current = current[max_chars - overlap:]
+        chunks.append(current)
+        current = ""
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def chunk_hash(embedder_name: str, text: str) -> str:
+    return hashlib.sha256(f"{embedder_name}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """(임베딩 모델, 청크 텍스트) sha256 → float32 벡터 영구 캐시"""
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS embedding ("
+            " hash TEXT PRIMARY KEY, dim INTEGER NOT NULL, vector BLOB NOT NULL, created_at REAL NOT NULL);"
+        )
+
+    def get_many(self, hashes: list) -> dict:
+        found = {}
+        for i in range(0, len(hashes), 500):  # SQLite 변수 개수 제한
+            batch = hashes[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT hash, vector FROM embedding WHERE hash IN ({','.join('?' * len(batch))})", batch)
+            for digest, blob in rows:
+                found[digest] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items: dict):
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO embedding (hash, dim, vector, created_at) VALUES (?, ?, ?, ?)",
+            [(digest, len(vector), np.asarray(vector, dtype=np.float32).tobytes(), now)
+             for digest, vector in items.items()])
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class EmbeddingPipeline:
+    """청크 분할 → 해시 중복 제거 → 캐시 조회 → 캐시에 없는 청크만 배치 임베딩"""
+
+    def __init__(self, embedder, cache: EmbeddingCache = None, batch_size: int = EMBED_BATCH_SIZE,
+                 max_chars: int = CHUNK_MAX_CHARS):
+        self.embedder = embedder
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_chars = max_chars
+        self.stats = {'records': 0, 'chunks': 0, 'unique_chunks': 0, 'cache_hits': 0, 'embedded': 0,
+                      'embed_calls': 0, 'embed_seconds': 0.0}
+
+    def embed_texts(self, texts: list) -> np.ndarray:
+        """텍스트(청크) 목록의 벡터 (len(texts), dim). 같은 텍스트는 한 번만 임베딩합니다."""
+        hashes = [chunk_hash(self.embedder.name, text) for text in texts]
+        unique = dict(zip(hashes, texts))
+        self.stats['chunks'] += len(texts)
+        self.stats['unique_chunks'] += len(unique)
+
+        vectors = self.cache.get_many(list(unique)) if self.cache is not None else {}
+        self.stats['cache_hits'] += len(vectors)
+        missing = [digest for digest in unique if digest not in vectors]
+        for i in range(0, len(missing), self.batch_size):
+            batch = missing[i:i + self.batch_size]
+            start = time.perf_counter()
+            embedded = self.embedder.embed([unique[digest] for digest in batch])
+            self.stats['embed_seconds'] += time.perf_counter() - start
+            self.stats['embed_calls'] += 1
+            new = dict(zip(batch, embedded))
+            if self.cache is not None:
+                self.cache.put_many(new)
+            vectors.update(new)
+        self.stats['embedded'] += len(missing)
+        if not hashes:
+            return np.zeros((0, self.embedder.dim or 0), dtype=np.float32)
+        return np.vstack([vectors[digest] for digest in hashes]).astype(np.float32)
+
+    def embed_records(self, records: list) -> np.ndarray:
+        """공고별 벡터 (len(records), dim): 청크 벡터 평균을 정규화한 값"""
+        chunks, owners = [], []
+        for row, record in enumerate(records):
+            record_chunks = chunk_text(record.get('content', ''), self.max_chars) or [record.get('content', '')]
+            chunks.extend(record_chunks)
+            owners.extend([row] * len(record_chunks))
+        self.stats['records'] += len(records)
+        chunk_vectors = self.embed_texts(chunks)
+        if not len(records):
+            return chunk_vectors
+        sums = np.zeros((len(records), chunk_vectors.shape[1]), dtype=np.float32)
+        np.add.at(sums, np.asarray(owners), chunk_vectors)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return sums / norms
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"공고 {s['records']}개, 청크 {s['chunks']}개(중복 제외 {s['unique_chunks']}개), "
+                f"캐시 적중 {s['cache_hits']}개, 새로 임베딩 {s['embedded']}개 "
+                f"(호출 {s['embed_calls']}번, {s['embed_seconds']:.1f}초)")
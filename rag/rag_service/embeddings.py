@@ -0,0 +1,91 @@
+import asyncio
+import hashlib
+import os
+import unicodedata
+
+import numpy as np
+
+# 텍스트 임베딩 백엔드
+# - vertex : Vertex AI 텍스트 임베딩 모델 (운영)
+# - local  : 문자 n-gram 해싱 임베딩. 네트워크 없이 항상 같은 결과를 내므로 테스트/오프라인용
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "vertex")
+EMBEDDING_MODEL_ID = os.getenv("EMBEDDING_MODEL_ID", "text-multilingual-embedding-002")
+LOCAL_EMBEDDING_DIM = 256
+
+
+class Embedder:
+    """텍스트 목록을 L2 정규화된 float32 행렬 (len(texts), dim)로 바꿉니다."""
+    dim = None
+    name = ""  # 인덱스에 저장해 두고, 다른 임베딩으로 만든 벡터를 섞어 쓰지 않도록 확인합니다.
+
+    def embed(self, texts: list) -> np.ndarray:
+        raise NotImplementedError
+
+    async def embed_async(self, texts: list) -> np.ndarray:
+        return await asyncio.to_thread(self.embed, texts)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+class VertexEmbedder(Embedder):
+    def __init__(self, model_id: str = EMBEDDING_MODEL_ID, task_type: str = "RETRIEVAL_QUERY"):
+        from vertexai.language_models import TextEmbeddingModel
+
+        self.model = TextEmbeddingModel.from_pretrained(model_id)
+        self.task_type = task_type
+        self.name = f"vertex:{model_id}"
+
+    def _inputs(self, texts):
+        from vertexai.language_models import TextEmbeddingInput
+
+        return [TextEmbeddingInput(text, self.task_type) for text in texts]
+
+    def embed(self, texts):
+        embeddings = self.model.get_embeddings(self._inputs(texts))
+        return _normalize_rows(np.array([e.values for e in embeddings], dtype=np.float32))
+
+    async def embed_async(self, texts):
+        embeddings = await self.model.get_embeddings_async(self._inputs(texts))
+        return _normalize_rows(np.array([e.values for e in embeddings], dtype=np.float32))
+
+
+class LocalEmbedder(Embedder):
+    """단어와 단어 안의 문자 2-gram/3-gram을 해싱해 만드는 결정적 임베딩 (어순에 둔감)"""
+
+    def __init__(self, dim: int = LOCAL_EMBEDDING_DIM, task_type: str = None):
+        self.dim = dim
+        self.name = f"local:{dim}"
+
+    def _features(self, text):
+        text = unicodedata.normalize("NFKC", text).lower()
+        words = text.split()
+        features = list(words)
+        for word in words:
+            for n in (2, 3):
+                features.extend(word[i:i + n] for i in range(len(word) - n + 1))
+        return features or [text]
+
+    def embed(self, texts):
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                matrix[row, value % self.dim] += 1.0 if (value >> 63) & 1 else -1.0
+        return _normalize_rows(matrix)
+
+    async def embed_async(self, texts):
+        return self.embed(texts)
+
+
+def create_embedder(name: str = EMBEDDING_BACKEND, **kwargs) -> Embedder:
+    """EMBEDDING_BACKEND 이름으로 임베딩 백엔드를 만듭니다."""
+    if name == "vertex":
+        return VertexEmbedder(**kwargs)
+    if name == "local":
+        return LocalEmbedder(**kwargs)
+    raise ValueError(f"지원하지 않는 임베딩 백엔드: {name}")
@@ -0,0 +1,260 @@
+import calendar
+import os
+import re
+import unicodedata
+from collections import namedtuple
+from datetime import date, timedelta
+
+# 질문에서 지역/경력/고용형태/마감일(등록일) 필터를 규칙으로 뽑는 빠른 경로
+# 모르는 조건(연봉, 재택, '9월 말' 등)이 섞여 있으면 confidence를 낮춰 LLM(query_rebuilder)으로 넘깁니다.
+RULE_PARSER_ENABLED = os.getenv("RULE_PARSER_ENABLED", "true").lower() == "true"
+RULE_PARSER_MIN_CONFIDENCE = float(os.getenv("RULE_PARSER_MIN_CONFIDENCE", "0.8"))
+
+ParsedQuery = namedtuple('ParsedQuery', ['keywords', 'filter_string', 'confidence', 'unresolved'])
+
+# --- 사전 (gazetteer) ---
+REGIONS = {
+    '서울': '서울', '서울시': '서울', '서울특별시': '서울',
+    '경기': '경기', '경기도': '경기',
+    '인천': '인천', '인천시': '인천', '인천광역시': '인천',
+    '부산': '부산', '부산시': '부산', '부산광역시': '부산',
+    '대구': '대구', '대구시': '대구', '대구광역시': '대구',
+    '광주': '광주', '광주광역시': '광주',
+    '대전': '대전', '대전시': '대전', '대전광역시': '대전',
+    '울산': '울산', '울산시': '울산', '울산광역시': '울산',
+    '세종': '세종', '세종시': '세종', '세종특별자치시': '세종',
+    '강원': '강원', '강원도': '강원',
+    '충북': '충북', '충청북도': '충북', '충남': '충남', '충청남도': '충남',
+    '전북': '전북', '전라북도': '전북', '전남': '전남', '전라남도': '전남',
+    '경북': '경북', '경상북도': '경북', '경남': '경남', '경상남도': '경남',
+    '제주': '제주', '제주도': '제주',
+}
+# 여러 시/도에 같은 이름이 있는 구(중구, 동구, 서구 등)는 넣지 않습니다.
+DISTRICTS = {
+    **{gu: f'서울 {gu}' for gu in ['강남구', '강동구', '강북구', '강서구', '관악구', '광진구', '구로구', '금천구',
+                                  '노원구', '도봉구', '동대문구', '동작구', '마포구', '서대문구', '서초구', '성동구',
+                                  '성북구', '송파구', '양천구', '영등포구', '용산구', '은평구', '종로구', '중랑구']},
+    '강남': '서울 강남구', '여의도': '서울 영등포구', '판교': '경기 성남시', '분당': '경기 성남시',
+    **{city: f'경기 {city}시' for city in ['성남', '수원', '용인', '고양', '화성', '안양', '부천', '평택', '안산', '하남']},
+}
+EXPERIENCE = {
+    '신입': '신입', '신입사원': '신입', '신입직': '신입',
+    '경력': '경력', '경력직': '경력', '경력자': '경력',
+    '경력무관': '경력무관', '무관': '경력무관',
+}
+EMPLOYMENT_TYPES = {
+    '정규직': '정규직', '계약직': '계약직', '인턴': '인턴', '인턴십': '인턴', '체험형인턴': '인턴',
+    '파견': '파견직', '파견직': '파견직', '프리랜서': '프리랜서', '위촉직': '위촉직',
+    '아르바이트': '아르바이트', '알바': '아르바이트',
+}
+# 필터처럼 보이지만 규칙으로 풀 수 없는 표현 → LLM으로 넘김
+UNRESOLVED_HINTS = {
+    '연봉', '급여', '월급', '시급', '연차', '재택', '원격', '주말', '월말', '연말', '연초', '올해', '내년', '작년',
+    '상반기', '하반기', '중순', '초순', '하순', '지난', '최근', '근처', '주변', '가까운', '제외', '빼고', '말고',
+    '아닌', '또는', '혹은', '이나', '임박', '급구', '복지', '대기업', '중소기업', '스타트업', '공기업',
+}
+STOPWORDS = {
+    '공고', '채용', '채용공고', '구인', '일자리', '자리', '찾아줘', '찾아', '찾아주세요', '보여줘', '보여주세요',
+    '알려줘', '알려주세요', '추천', '추천해줘', '추천해주세요', '해줘', '줘', '주세요', '좀', '그냥', '다', '모두',
+    '전부', '관련', '관련된', '있는', '있어', '있나요', '뭐', '어떤', '마감', '마감되는', '마감인', '마감하는',
+    '지역', '쪽', '근무', '근무하는', '하는', '인', '중', '중에', '등록된', '등록', '올라온', '게시된', '새로',
+}
+# 조사/어미: 사전 단어 뒤에 붙어 있으면 떼고 찾습니다. (긴 것부터)
+PARTICLES = sorted(['에서', '에서의', '지역', '지역의', '쪽', '으로', '로', '에', '의', '은', '는', '이', '가', '을',
+                    '를', '도', '만', '인', '인데', '이고', '이면', '이랑', '랑', '과', '와', '으로만', '이나', '나', '한', '하는'],
+                   key=len, reverse=True)
+
+_PUNCT_RE = re.compile(r"[^\w\s↑]")
+_POSTED_RE = re.compile(r"등록|게시|올라온|올린|올라|새로 뜬")
+_NUMBER_RE = re.compile(r"\d")
+_BOUND = r"\s*(?P<bound>까지|부터|이후|이전|안에|내에|내로|이내)?"
+_WEEKDAYS = "월화수목금토일"
+_WEEK_OFFSET = {'이번': 0, '다음': 1, '다다음': 2}
+
+_WEEKDAY_RE = re.compile(r"(?P<week>이번|다음|다다음)\s*주\s*(?P<day>[월화수목금토일])요일" + _BOUND)
+_WEEK_RE = re.compile(r"(?P<week>이번|다음|다다음)\s*주(?!말)" + _BOUND)
+_MONTH_REL_RE = re.compile(r"(?P<month>이번|다음)\s*달" + _BOUND)
+_MONTH_DAY_RE = re.compile(r"(?P<month>\d{1,2})\s*월\s*(?P<day>\d{1,2})\s*일" + _BOUND)
+_MONTH_RE = re.compile(r"(?P<month>\d{1,2})\s*월(?!\s*(?:말|초|중순|중|\d))" + _BOUND)
+_DAY_WORD_RE = re.compile(r"(?P<day>오늘|금일|내일|모레)" + _BOUND)
+_WITHIN_DAYS_RE = re.compile(r"(?P<days>\d{1,3})\s*일\s*(?P<bound>이내|안에|내에|내)")
+_EXPERIENCE_YEARS_RE = re.compile(r"(?:경력\s*)?(?<!\d)(?P<years>\d{1,2})\s*년\s*(?:차|이상|↑)?(?:\s*이상)?")
+_EXPERIENCE_YEARS_NEEDS = re.compile(r"경력|년\s*차|년\s*이상|년\s*↑")
+_NO_EXPERIENCE_RE = re.compile(r"경력\s*무관|신입\s*[/·,]?\s*경력\s*무관")
+
+
+def _lookup(token, table):
+    """조사를 뗀 토큰이 사전에 있으면 사전의 키를 반환합니다."""
+    if token in table:
+        return token
+    for particle in PARTICLES:
+        if token.endswith(particle) and token[:-len(particle)] in table:
+            return token[:-len(particle)]
+    return None
+
+
+def _resolve_year(month, today, field):
+    # 마감일은 앞으로의 날짜, 등록일은 지난 날짜로 해석합니다.
+    if field == 'posted_date':
+        return today.year if month <= today.month else today.year - 1
+    return today.year if month >= today.month else today.year + 1
+
+
+def _month_range(year, month):
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _date_ranges(text, today, field, unresolved):
+    """(시작, 끝, 경계) 목록과 날짜 표현을 지운 텍스트를 반환합니다."""
+    ranges = []
+
+    def weekday(m):
+        monday = today - timedelta(days=today.weekday()) + timedelta(weeks=_WEEK_OFFSET[m['week']])
+        day = monday + timedelta(days=_WEEKDAYS.index(m['day']))
+        # 일요일에 '이번 주 금요일까지 마감'처럼 이미 지난 요일을 마감일로(또는 아직 안 온 요일을 등록일로) 말하면
+        # '다음 주'를 뜻했을 수 있으므로 규칙으로 정하지 않고 LLM으로 넘깁니다.
+        if (day < today) if field == 'deadline_date' else (day > today):
+            unresolved.append(m.group(0).strip())
+        return day, day
+
+    def week(m):
+        monday = today - timedelta(days=today.weekday()) + timedelta(weeks=_WEEK_OFFSET[m['week']])
+        if m['week'] == '이번':
+            return (today, monday + timedelta(days=6)) if field == 'deadline_date' else (monday, today)
+        return monday, monday + timedelta(days=6)
+
+    def month_rel(m):
+        year, month = today.year, today.month
+        if m['month'] == '다음':
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return _month_range(year, month)
+
+    def month_day(m):
+        month, day = int(m['month']), int(m['day'])
+        try:
+            target = date(_resolve_year(month, today, field), month, day)
+        except ValueError:
+            return None
+        return target, target
+
+    def month(m):
+        value = int(m['month'])
+        if not 1 <= value <= 12:
+            return None
+        return _month_range(_resolve_year(value, today, field), value)
+
+    def day_word(m):
+        offset = {'오늘': 0, '금일': 0, '내일': 1, '모레': 2}[m['day']]
+        return today + timedelta(days=offset), today + timedelta(days=offset)
+
+    def within_days(m):
+        return today, today + timedelta(days=int(m['days']))
+
+    for pattern, handler in [(_WEEKDAY_RE, weekday), (_WEEK_RE, week), (_MONTH_REL_RE, month_rel),
+                             (_MONTH_DAY_RE, month_day), (_MONTH_RE, month), (_DAY_WORD_RE, day_word),
+                             (_WITHIN_DAYS_RE, within_days)]:
+        for m in pattern.finditer(text):
+            result = handler(m)
+            if result is not None:
+                bound = m['bound']
+                if pattern is _WITHIN_DAYS_RE:
+                    bound = '까지'
+                ranges.append((result[0], result[1], bound))
+        text = pattern.sub(" ", text)
+    return ranges, text
+
+
+def _date_clauses(ranges, field, unresolved, today):
+    lower, upper, exact = [], [], []
+    for start, end, bound in ranges:
+        if bound in ('까지', '이전', '안에', '내에', '내로', '이내'):
+            upper.append(end)
+        elif bound in ('부터', '이후'):
+            lower.append(start)
+        elif start == end:
+            exact.append(start)
+        else:
+            lower.append(start)
+            upper.append(end)
+    if len(lower) > 1 or len(upper) > 1 or len(exact) > 1 or (exact and (lower or upper)):
+        unresolved.append('날짜 조건 여러 개')
+        return []
+    if exact:
+        return [(field, '=', exact[0])]
+    if field == 'deadline_date' and upper and not lower:
+        lower.append(today)  # '5일 이내 마감'에 이미 마감된 공고는 넣지 않습니다.
+    return [(field, '>=', d) for d in lower] + [(field, '<=', d) for d in upper]
+
+
+def format_filter(clauses) -> str:
+    """[(필드, 연산자, 값)] → 'location = "서울" AND deadline_date <= "2025-09-22"'"""
+    return " AND ".join(f'{field} {op} "{value}"' for field, op, value in clauses)
+
+
+def parse_query(question: str, today: date = None) -> ParsedQuery:
+    """질문을 (keywords, filter_string, confidence, unresolved)로 나눕니다. LLM 없이 마이크로초 단위로 동작합니다."""
+    today = today or date.today()
+    text = unicodedata.normalize("NFKC", question)
+    text = _PUNCT_RE.sub(" ", _NO_EXPERIENCE_RE.sub(" 경력무관 ", text))
+    unresolved = []
+
+    date_field = 'posted_date' if _POSTED_RE.search(text) else 'deadline_date'
+    ranges, text = _date_ranges(text, today, date_field, unresolved)
+    date_clauses = _date_clauses(ranges, date_field, unresolved, today)
+
+    experiences = []
+    if _EXPERIENCE_YEARS_NEEDS.search(text):
+        for m in _EXPERIENCE_YEARS_RE.finditer(text):
+            experiences.append(f"경력 {int(m['years'])}년 이상")
+        text = _EXPERIENCE_YEARS_RE.sub(" ", text)
+
+    locations, employment_types, keywords = [], [], []
+    for token in text.split():
+        key = _lookup(token, DISTRICTS)
+        if key:
+            locations.append(DISTRICTS[key])
+            continue
+        key = _lookup(token, REGIONS)
+        if key:
+            locations.append(REGIONS[key])
+            continue
+        key = _lookup(token, EXPERIENCE)
+        if key:
+            experiences.append(EXPERIENCE[key])
+            keywords.append(EXPERIENCE[key])
+            continue
+        key = _lookup(token, EMPLOYMENT_TYPES)
+        if key:
+            employment_types.append(EMPLOYMENT_TYPES[key])
+            keywords.append(EMPLOYMENT_TYPES[key])
+            continue
+        if _lookup(token, UNRESOLVED_HINTS) or _NUMBER_RE.search(token):
+            unresolved.append(token)
+            keywords.append(token)
+            continue
+        if _lookup(token, STOPWORDS):
+            continue
+        keywords.append(token)
+
+    clauses = []
+    # '서울 강남구'처럼 시/도와 구가 같이 나오면 더 구체적인 쪽을 씁니다.
+    locations = [loc for loc in dict.fromkeys(locations)
+                 if not any(other != loc and other.startswith(loc + " ") for other in locations)]
+    if len(locations) > 1:
+        unresolved.append('지역 여러 개')
+    elif locations:
+        clauses.append(('location', '=', locations[0]))
+    experiences = list(dict.fromkeys(experiences))
+    if len(experiences) > 1:
+        unresolved.append('경력 조건 여러 개')
+    elif experiences:
+        clauses.append(('experience', '=', experiences[0]))
+    employment_types = list(dict.fromkeys(employment_types))
+    if len(employment_types) > 1:
+        unresolved.append('고용형태 여러 개')
+    elif employment_types:
+        clauses.append(('employment_type', '=', employment_types[0]))
+    clauses.extend(date_clauses)
+
+    confidence = 0.5 ** len(unresolved)
+    return ParsedQuery(" ".join(dict.fromkeys(keywords)) or "채용 공고", format_filter(clauses), confidence, unresolved)
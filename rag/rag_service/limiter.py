@@ -0,0 +1,57 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+
+class Overloaded(Exception):
+    """동시 처리 한도를 넘어 요청을 받을 수 없을 때 발생합니다. (429: 대기열 가득 참, 503: 대기 시간 초과)"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int = 1):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """동시에 처리하는 요청 수를 제한하고, 넘치는 요청은 기다리게 하지 않고 바로 거절합니다.
+
+    - 처리 중인 요청이 `max_concurrent`개면 새 요청은 최대 `wait_timeout`초까지 자리를 기다립니다.
+    - 기다리는 요청이 이미 `max_waiting`개면 즉시 429, 기다리다 시간이 지나면 503을 냅니다.
+    """
+
+    def __init__(self, max_concurrent: int, max_waiting: int = 0, wait_timeout: float = 1.0):
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.in_flight = 0  # 처리 중 + 자리를 기다리는 요청 수
+        self.rejected = 0
+
+    async def acquire(self):
+        """자리를 얻을 때까지 기다립니다. 못 얻으면 Overloaded를 냅니다. 성공하면 반드시 release()를 불러야 합니다."""
+        if self.in_flight >= self.max_concurrent + self.max_waiting:
+            self.rejected += 1
+            raise Overloaded(429, "Too many concurrent requests")
+
+        self.in_flight += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.wait_timeout)
+        except asyncio.TimeoutError:
+            self.in_flight -= 1
+            self.rejected += 1
+            raise Overloaded(503, "Server busy, try again later")
+        except BaseException:
+            self.in_flight -= 1
+            raise
+
+    def release(self):
+        self._semaphore.release()
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
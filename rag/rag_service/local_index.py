@@ -0,0 +1,376 @@
+import argparse
+import json
+import os
+import re
+import time
+import unicodedata
+from datetime import date
+
+import numpy as np
+
+from rag_service.embedding_pipeline import EMBEDDING_CACHE_PATH, EmbeddingCache, EmbeddingPipeline
+
+# 크롤러가 올린 JSONL 레코드({"id", "structData", "content"})로 만드는 로컬 하이브리드 검색 엔진
+# - BM25 역색인 (한국어: 조사 떼기 + 문자 2-gram)
+# - 임베딩 행렬 코사인 top-k
+# - 지역/경력/고용형태/마감일/등록일/회사명 컬럼 배열로 필터를 먼저 적용해 후보를 줄인 뒤 점수 계산
+# 두 검색 결과는 RRF(reciprocal rank fusion)로 합칩니다.
+LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", "data/local_index")
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60
+CANDIDATES_PER_RETRIEVER = 100  # BM25/임베딩 각각에서 합치기 전에 뽑는 후보 수
+ANN_MIN_CANDIDATES = 20000      # ANN 인덱스가 붙어 있을 때, 필터 후 후보가 이보다 많으면 전수 계산 대신 ANN 사용
+ANN_OVERFETCH = 4               # 필터가 있을 때 ANN에서 더 뽑아 두는 배수 (필터로 걸러지는 몫)
+
+# filter_string의 영문 필드 → structData 한글 키
+FIELD_KEYS = {
+    'location': '지역', 'experience': '경력', 'employment_type': '고용형태',
+    'deadline_date': '마감일', 'posted_date': '등록일', 'company': '회사명',
+}
+
+_TOKEN_RE = re.compile(r"[가-힣]+|[a-z0-9][a-z0-9+#.]*")
+_MULTI_PARTICLES = ('에서', '으로', '에게', '까지', '부터', '이나', '이랑', '하고')
+_SINGLE_PARTICLES = ('은', '는', '을', '를', '의', '에', '와', '과', '로', '도', '가', '이')
+_CLAUSE_RE = re.compile(r"""^\s*(\w+)\s*(<=|>=|!=|=|<|>)\s*\\?["']([^"'\\]*)\\?["']\s*$""")
+_DATE_RE = re.compile(r"(\d{4})\D(\d{1,2})\D(\d{1,2})")
+_YEARS_RE = re.compile(r"(\d+)\s*년")
+
+
+def _strip_particle(word):
+    for particle in _MULTI_PARTICLES:
+        if word.endswith(particle) and len(word) > len(particle) + 1:
+            return word[:-len(particle)]
+    if len(word) >= 3 and word[-1] in _SINGLE_PARTICLES:
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> list:
+    """한국어 단어는 조사를 뗀 형태 + 문자 2-gram, 영문/숫자는 소문자 단어 그대로"""
+    tokens = []
+    for word in _TOKEN_RE.findall(unicodedata.normalize("NFKC", text).lower()):
+        if '가' <= word[0] <= '힣':
+            stem = _strip_particle(word)
+            tokens.append(stem)
+            if len(stem) > 2:
+                tokens.extend(stem[i:i + 2] for i in range(len(stem) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def parse_filter_string(filter_string: str):
+    """'a = "x" AND b <= "y"' → ([(필드, 연산자, 값)], [해석하지 못한 조건])"""
+    clauses, unparsed = [], []
+    if not filter_string or not filter_string.strip():
+        return clauses, unparsed
+    for part in re.split(r"\s+AND\s+", filter_string.strip(), flags=re.IGNORECASE):
+        m = _CLAUSE_RE.match(part)
+        if m and m.group(1) in FIELD_KEYS:
+            clauses.append((m.group(1), m.group(2), m.group(3).strip()))
+        else:
+            unparsed.append(part)
+    return clauses, unparsed
+
+
+def day_number(value) -> int:
+    m = _DATE_RE.search(value or "")
+    if not m:
+        return -1
+    try:
+        return date(int(m.group(1)), int(m.group(2)), int(m.group(3))).toordinal()
+    except ValueError:
+        return -1
+
+
+def _min_years(experience: str) -> int:
+    m = _YEARS_RE.search(experience)
+    if m:
+        return int(m.group(1))
+    return 0 if '신입' in experience else -1
+
+
+class MetadataColumns:
+    """필터에 쓰는 메타데이터를 공고 순서대로 나열한 컬럼 배열"""
+
+    def __init__(self, records):
+        meta = [record.get('structData', {}) for record in records]
+        self.location = np.array([m.get('지역', '') for m in meta], dtype=str)
+        self.experience = np.array([m.get('경력', '') for m in meta], dtype=str)
+        self.min_years = np.array([_min_years(m.get('경력', '')) for m in meta], dtype=np.int16)
+        self.employment_type = np.array([m.get('고용형태', '') for m in meta], dtype=str)
+        self.company = np.array([m.get('회사명', '') for m in meta], dtype=str)
+        deadlines = [m.get('마감일', '') for m in meta]
+        self.deadline = np.array([day_number(d) for d in deadlines], dtype=np.int32)
+        self.rolling = np.array(['상시' in d or '채용시' in d for d in deadlines], dtype=bool)  # 마감일 없는 공고
+        self.posted = np.array([day_number(m.get('등록일', '')) for m in meta], dtype=np.int32)
+
+    def _contains(self, column, value):
+        return np.char.find(column, value) >= 0
+
+    def _compare_days(self, column, op, value):
+        day = day_number(value)
+        if day < 0:
+            return None
+        valid = column >= 0
+        result = {'=': column == day, '!=': column != day, '<': column < day,
+                  '<=': column <= day, '>': column > day, '>=': column >= day}[op]
+        return valid & result
+
+    def mask(self, field, op, value):
+        """조건 하나를 만족하는 공고의 bool 배열. 적용할 수 없는 조건이면 None"""
+        if field in ('deadline_date', 'posted_date'):
+            if field == 'deadline_date' and ('상시' in value or '채용시' in value):
+                result = self.rolling
+            else:
+                return self._compare_days(self.deadline if field == 'deadline_date' else self.posted, op, value)
+        elif field == 'location':
+            result = np.char.startswith(self.location, value)
+        elif field == 'experience':
+            years = _YEARS_RE.search(value)
+            if years:
+                # '경력 N년 이상' → 최소 요구 연차가 N년 이상인 경력 공고
+                result = self._contains(self.experience, '경력') & (self.min_years >= int(years.group(1)))
+            elif '무관' in value:
+                result = self._contains(self.experience, '무관')
+            else:
+                result = self._contains(self.experience, value)
+        elif field == 'employment_type':
+            result = self._contains(self.employment_type, value)
+        elif field == 'company':
+            result = self._contains(self.company, value)
+        else:
+            return None
+        if op == '!=':
+            return ~result
+        return result if op == '=' else None
+
+
+class BM25Index:
+    """CSR 형태(용어별 문서 번호/빈도 배열)의 역색인"""
+
+    def __init__(self, docs_tokens, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1, self.b = k1, b
+        self.vocab = {}
+        postings = []
+        doc_len = np.zeros(len(docs_tokens), dtype=np.float32)
+        for doc_id, tokens in enumerate(docs_tokens):
+            doc_len[doc_id] = len(tokens)
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                term_id = self.vocab.setdefault(token, len(self.vocab))
+                postings.append((term_id, doc_id, tf))
+
+        postings.sort()
+        terms = np.array([p[0] for p in postings], dtype=np.int64)
+        self.doc_ids = np.array([p[1] for p in postings], dtype=np.int32)
+        self.tfs = np.array([p[2] for p in postings], dtype=np.float32)
+        self.offsets = np.searchsorted(terms, np.arange(len(self.vocab) + 1)).astype(np.int64)
+        n_docs = max(len(docs_tokens), 1)
+        df = np.diff(self.offsets).astype(np.float32)
+        self.idf = np.log(1.0 + (n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avg_len = float(doc_len.mean()) if len(doc_len) else 1.0
+        self.norm = (k1 * (1.0 - b + b * doc_len / max(avg_len, 1.0))).astype(np.float32)
+        self.n_docs = len(docs_tokens)
+
+    def scores(self, query_tokens, candidates: np.ndarray = None) -> np.ndarray:
+        """문서별 BM25 점수. candidates(bool 배열)가 있으면 후보 밖 문서는 계산하지 않습니다."""
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for token in set(query_tokens):
+            term_id = self.vocab.get(token)
+            if term_id is None:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs, tfs = self.doc_ids[start:end], self.tfs[start:end]
+            if candidates is not None:
+                keep = candidates[docs]
+                docs, tfs = docs[keep], tfs[keep]
+            scores[docs] += self.idf[term_id] * tfs * (self.k1 + 1.0) / (tfs + self.norm[docs])
+        return scores
+
+
+def dense_topk(matrix: np.ndarray, queries: np.ndarray, k: int, candidate_ids: np.ndarray = None):
+    """정규화된 임베딩 행렬에서 질의 묶음(B, dim)별 코사인 top-k (문서 번호, 점수) 목록"""
+    sub = matrix if candidate_ids is None else matrix[candidate_ids]
+    if sub.shape[0] == 0:
+        return [(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)) for _ in range(len(queries))]
+    scores = queries @ sub.T  # (B, 후보 수)
+    k = min(k, sub.shape[0])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    results = []
+    for row, idx in enumerate(top):
+        order = idx[np.argsort(-scores[row, idx])]
+        ids = order if candidate_ids is None else candidate_ids[order]
+        results.append((ids, scores[row, order]))
+    return results
+
+
+def _top_ids(scores: np.ndarray, k: int, candidates: np.ndarray = None):
+    if candidates is not None:
+        scores = np.where(candidates, scores, 0.0)
+    positive = np.flatnonzero(scores > 0)
+    if len(positive) > k:
+        positive = positive[np.argpartition(-scores[positive], k - 1)[:k]]
+    return positive[np.argsort(-scores[positive])]
+
+
+class LocalIndex:
+    """JSONL 레코드 위의 하이브리드(BM25 + 임베딩) 검색"""
+
+    def __init__(self, records: list, vectors: np.ndarray = None, embedder=None):
+        self.records = records
+        self.vectors = vectors
+        self.embedder = embedder
+        self.ann = None  # 선택: rag_service.ann_index.IVFIndex (같은 임베딩으로 만든 것)
+        self._row_by_id = {record['id']: row for row, record in enumerate(records)}
+        self.columns = MetadataColumns(records)
+        self.bm25 = BM25Index([tokenize(record.get('content', '')) for record in records])
+
+    @classmethod
+    def build(cls, records: list, embedder=None, pipeline=None):
+        """pipeline(EmbeddingPipeline)을 주면 그 캐시로 임베딩하고, 없으면 embedder로 새 파이프라인을 만듭니다."""
+        if pipeline is None and embedder is not None:
+            pipeline = EmbeddingPipeline(embedder)
+        vectors = pipeline.embed_records(records) if pipeline is not None and records else None
+        return cls(records, vectors, pipeline.embedder if pipeline is not None else embedder)
+
+    def save(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "records.jsonl"), "w", encoding="utf-8") as f:
+            for record in self.records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        if self.vectors is not None:
+            np.save(os.path.join(directory, "vectors.npy"), self.vectors)
+        meta = {'count': len(self.records), 'embedder': getattr(self.embedder, 'name', None)}
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory: str, embedder=None):
+        records = load_jsonl_records(os.path.join(directory, "records.jsonl"))
+        vectors = None
+        vectors_path = os.path.join(directory, "vectors.npy")
+        if os.path.exists(vectors_path):
+            with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            if embedder is not None and meta.get('embedder') != embedder.name:
+                raise ValueError(f"인덱스 임베딩({meta.get('embedder')})과 질의 임베딩({embedder.name})이 다릅니다.")
+            vectors = np.load(vectors_path, mmap_mode="r")
+        return cls(records, vectors, embedder)
+
+    def filter_mask(self, filter_string: str):
+        """(후보 bool 배열 또는 None(필터 없음), 적용하지 못한 조건 목록)"""
+        clauses, unapplied = parse_filter_string(filter_string)
+        mask = None
+        for field, op, value in clauses:
+            clause_mask = self.columns.mask(field, op, value)
+            if clause_mask is None:
+                unapplied.append(f'{field} {op} "{value}"')
+                continue
+            mask = clause_mask if mask is None else mask & clause_mask
+        return mask, unapplied
+
+    def _ann_topk(self, query_vector, candidates):
+        k = CANDIDATES_PER_RETRIEVER * (1 if candidates is None else ANN_OVERFETCH)
+        ids, _ = self.ann.search(query_vector[None, :], k)[0]
+        rows = [self._row_by_id.get(rec_id) for rec_id in ids]
+        rows = [row for row in rows if row is not None and (candidates is None or candidates[row])]
+        return rows[:CANDIDATES_PER_RETRIEVER]
+
+    def search(self, keywords: str, filter_string: str = "", top_k: int = 10, query_vector: np.ndarray = None):
+        """필터를 만족하는 공고 중 BM25/임베딩 순위를 RRF로 합친 상위 top_k개 [(레코드, 점수)]"""
+        candidates, _ = self.filter_mask(filter_string)
+        if candidates is not None and not candidates.any():
+            return []
+
+        fused = {}
+        bm25_ids = _top_ids(self.bm25.scores(tokenize(keywords), candidates), CANDIDATES_PER_RETRIEVER, candidates)
+        for rank, doc_id in enumerate(bm25_ids):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+
+        has_vectors = self.vectors is not None or self.ann is not None
+        if has_vectors and (query_vector is not None or self.embedder is not None):
+            if query_vector is None:
+                query_vector = self.embedder.embed([keywords])[0]
+            candidate_ids = None if candidates is None else np.flatnonzero(candidates)
+            if self.ann is not None and (candidate_ids is None or len(candidate_ids) > ANN_MIN_CANDIDATES):
+                dense_ids = self._ann_topk(query_vector, candidates)
+            else:
+                dense_ids, _ = dense_topk(self.vectors, query_vector[None, :], CANDIDATES_PER_RETRIEVER, candidate_ids)[0]
+            for rank, doc_id in enumerate(dense_ids):
+                fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+
+        if not fused and candidates is not None:
+            # 검색어와 겹치는 공고가 없으면 필터만 만족하는 최근 공고를 돌려줍니다.
+            recent = np.flatnonzero(candidates)
+            recent = recent[np.argsort(-self.columns.posted[recent], kind="stable")][:top_k]
+            return [(self.records[i], 0.0) for i in recent]
+        ranked = sorted(fused.items(), key=lambda item: -item[1])[:top_k]
+        return [(self.records[doc_id], score) for doc_id, score in ranked]
+
+
+def load_jsonl_records(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def read_source_records(source: str) -> list:
+    """로컬 디렉터리(하위 *.jsonl 전부) 또는 gs://버킷/접두사 아래 JSONL 레코드를 읽습니다. id가 같으면 나중 것 사용"""
+    by_id = {}
+    if source.startswith("gs://"):
+        from google.cloud import storage
+
+        bucket_name, _, prefix = source[len("gs://"):].partition("/")
+        for blob in storage.Client().bucket(bucket_name).list_blobs(prefix=prefix):
+            if blob.name.endswith(".jsonl"):
+                for line in blob.download_as_text(encoding="utf-8").splitlines():
+                    if line.strip():
+                        record = json.loads(line)
+                        by_id[record['id']] = record
+    else:
+        for dirpath, _, filenames in os.walk(source):
+            for filename in sorted(filenames):
+                if filename.endswith(".jsonl"):
+                    for record in load_jsonl_records(os.path.join(dirpath, filename)):
+                        by_id[record['id']] = record
+    return list(by_id.values())
+
+
+if __name__ == "__main__":
+    from rag_service.embeddings import create_embedder
+
+    parser = argparse.ArgumentParser(description="로컬 하이브리드 검색 인덱스 만들기/검색")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser("build", help="JSONL 레코드로 인덱스를 만듭니다")
+    build_parser.add_argument("--source", required=True, help="JSONL이 있는 디렉터리 또는 gs://버킷/접두사")
+    build_parser.add_argument("--output", default=LOCAL_INDEX_DIR)
+    build_parser.add_argument("--cache", default=EMBEDDING_CACHE_PATH, help="임베딩 캐시 경로 (빈 문자열이면 사용 안 함)")
+    search_parser = sub.add_parser("search", help="인덱스에서 검색하고 걸린 시간을 출력합니다")
+    search_parser.add_argument("keywords")
+    search_parser.add_argument("--filter", default="")
+    search_parser.add_argument("--index", default=LOCAL_INDEX_DIR)
+    search_parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        records = read_source_records(args.source)
+        start = time.perf_counter()
+        pipeline = EmbeddingPipeline(create_embedder(task_type="RETRIEVAL_DOCUMENT"),
+                                     EmbeddingCache(args.cache) if args.cache else None)
+        index = LocalIndex.build(records, pipeline=pipeline)
+        index.save(args.output)
+        print(f"✅ 공고 {len(records)}개로 인덱스를 만들었습니다: {args.output} ({time.perf_counter() - start:.1f}초)")
+        print(f"🧮 임베딩: {pipeline.summary()}")
+    else:
+        index = LocalIndex.load(args.index, create_embedder())
+        start = time.perf_counter()
+        hits = index.search(args.keywords, args.filter, args.top_k)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for record, score in hits:
+            meta = record.get('structData', {})
+            print(f"{score:.4f} | {meta.get('회사명', '')} | {record.get('content', '').splitlines()[0]} | "
+                  f"{meta.get('지역', '')} | {meta.get('경력', '')} | {meta.get('마감일', '')}")
+        print(f"⏱️ {len(hits)}건, {elapsed_ms:.1f}ms")
@@ -0,0 +1,129 @@
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import date, datetime
+
+import numpy as np
+
+from rag_service.filter_parser import parse_query
+
+# 쿼리 재구성 결과((검색 키워드, filter_string)) 캐시
+# 1) 정규화한 질문이 똑같으면 바로 사용
+# 2) 아니면 질문 임베딩의 코사인 유사도가 QUERY_CACHE_SIMILARITY 이상인 가장 가까운 질문의 결과를 사용
+# '다음 주', '내일' 같은 상대 날짜는 날마다 뜻이 바뀌므로 항목은 만든 날짜가 지나면 모두 버립니다.
+# 임베딩이 가까워도 규칙 파서(filter_parser)로 뽑은 필터(지역/경력/고용형태/날짜)가 다르면 쓰지 않습니다.
+# ('이번 주 마감'과 '다음 주 마감'은 임베딩 유사도가 0.93이지만 마감일 범위가 다릅니다.)
+QUERY_CACHE_ENABLED = os.getenv("QUERY_CACHE_ENABLED", "true").lower() == "true"
+QUERY_CACHE_MAX_ITEMS = int(os.getenv("QUERY_CACHE_MAX_ITEMS", "2048"))
+QUERY_CACHE_SIMILARITY = float(os.getenv("QUERY_CACHE_SIMILARITY", "0.92"))
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+_NUMBER_RE = re.compile(r"\d+")
+
+
+def normalize_question(question: str) -> str:
+    """대소문자, 전각/반각, 문장부호, 공백 차이를 없앤 질문 키"""
+    text = unicodedata.normalize("NFKC", question).lower()
+    text = _PUNCT_RE.sub(" ", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+class QueryCache:
+    """정확히 일치 → 임베딩 최근접 순으로 찾는 날짜 단위 LRU 캐시"""
+
+    def __init__(self, embedder, max_items: int = QUERY_CACHE_MAX_ITEMS,
+                 similarity: float = QUERY_CACHE_SIMILARITY, today=None):
+        self.embedder = embedder
+        self.max_items = max_items
+        self.similarity = similarity
+        self._today = today or (lambda: datetime.now().strftime('%Y-%m-%d'))
+        self._lock = threading.Lock()
+        self.stats = {'exact_hits': 0, 'semantic_hits': 0, 'misses': 0}
+        self._reset(self._today())
+
+    def _reset(self, date):
+        self.date = date
+        self._entries = OrderedDict()   # 정규화 질문 -> (행 번호, 결과)
+        self._vectors = None            # (max_items, dim) 임베딩 행렬, 빈 행은 _valid=False
+        self._valid = np.zeros(self.max_items, dtype=bool)
+        self._keys = [None] * self.max_items
+        self._filters = [None] * self.max_items  # 행별 filter_signature
+        self._free = list(range(self.max_items - 1, -1, -1))
+
+    def _roll_date(self):
+        today = self._today()
+        if today != self.date:
+            self._reset(today)
+
+    def filter_signature(self, question: str) -> tuple:
+        """질문에서 규칙으로 뽑은 필터와 풀지 못한 조건 (오늘 기준)"""
+        parsed = parse_query(question, date.fromisoformat(self.date))
+        return parsed.filter_string, tuple(parsed.unresolved)
+
+    def embed(self, question: str) -> np.ndarray:
+        return self.embedder.embed([normalize_question(question)])[0]
+
+    async def embed_async(self, question: str) -> np.ndarray:
+        return (await self.embedder.embed_async([normalize_question(question)]))[0]
+
+    def get_exact(self, question: str):
+        key = normalize_question(question)
+        with self._lock:
+            self._roll_date()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.stats['exact_hits'] += 1
+            return entry[1]
+
+    def get_similar(self, question: str, vector: np.ndarray):
+        """임베딩이 가장 가까운 질문의 결과. 질문에 든 숫자(날짜, 연차 등)나 필터가 다르면 쓰지 않습니다."""
+        key = normalize_question(question)
+        numbers = _NUMBER_RE.findall(key)
+        with self._lock:
+            self._roll_date()
+            signature = self.filter_signature(question)
+            if self._vectors is not None and self._valid.any():
+                scores = self._vectors @ vector
+                scores[~self._valid] = -1.0
+                for row in np.argsort(-scores)[:5]:
+                    if scores[row] < self.similarity:
+                        break
+                    candidate = self._keys[row]
+                    if _NUMBER_RE.findall(candidate) == numbers and self._filters[row] == signature:
+                        self._entries.move_to_end(candidate)
+                        self.stats['semantic_hits'] += 1
+                        return self._entries[candidate][1]
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, question: str, vector: np.ndarray, value):
+        key = normalize_question(question)
+        with self._lock:
+            self._roll_date()
+            if key in self._entries:
+                row = self._entries[key][0]
+                self._entries[key] = (row, value)
+                self._entries.move_to_end(key)
+                return
+            if not self._free:
+                _, (old_row, _) = self._entries.popitem(last=False)
+                self._valid[old_row] = False
+                self._keys[old_row] = None
+                self._filters[old_row] = None
+                self._free.append(old_row)
+            row = self._free.pop()
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_items, vector.shape[0]), dtype=np.float32)
+            self._vectors[row] = vector
+            self._valid[row] = True
+            self._keys[row] = key
+            self._filters[row] = self.filter_signature(question)
+            self._entries[key] = (row, value)
+
+    def __len__(self):
+        return len(self._entries)
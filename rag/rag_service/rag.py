@@ -2,7 +2,16 @@ import vertexai
 from vertexai.preview import rag
 from vertexai.generative_models import GenerativeModel, Tool
 
+from rag_service.ann_index import ANN_INDEX_DIR, IVFIndex
+from rag_service.answer_cache import ANSWER_CACHE_ENABLED, AnswerCache, CachedAnswer, answer_cache_key
+from rag_service.corpus_version import CorpusVersion
+from rag_service.embeddings import create_embedder
+from rag_service.filter_parser import RULE_PARSER_ENABLED, RULE_PARSER_MIN_CONFIDENCE, parse_query
+from rag_service.local_index import LOCAL_INDEX_DIR, LocalIndex
+from rag_service.query_cache import QUERY_CACHE_ENABLED, QueryCache, normalize_question
+
 from datetime import datetime
+from functools import lru_cache
 import json
 import os
 
@@ -14,6 +23,11 @@ CORPUS_NAME = f"projects/{PROJECT_ID}/locations/{LOCATION}/ragCorpora/3458764513
 MODEL_ID = "gemini-2.0-flash-001"
 similarity_top_k = 10
 vector_distance_threshold = 0.5
+# 검색 백엔드
+# - vertex : Vertex RAG Engine 검색 Tool (필터는 검색어에 붙여 보냄)
+# - local  : LOCAL_INDEX_DIR의 로컬 하이브리드 인덱스 (BM25 + 임베딩, 필터를 정확히 적용한 뒤 검색)
+RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "vertex")
+LOCAL_CONTEXT_MAX_CHARS = 1500  # 답변 모델에 넘기는 공고 하나당 본문 글자 수
 
 system_prompt = f"""
 ### **명령 (Instruction)**
@@ -37,13 +51,7 @@ RAG 시스템을 통해 검색된 채용 공고 문서들을 바탕으로 아래
 - **[회사명]:** [추천 이유 설명]
 """
 
-# --- 로컬 초기화 함수 ---
-def vertex_init(PROJECT_ID=PROJECT_ID, LOCATION=LOCATION):
-    vertexai.init(project=PROJECT_ID, location=LOCATION)
-
-# --- 쿼리 재구성 함수 ---
-def query_rebuilder(question: str, MODEL_ID=MODEL_ID):
-    parsing_prompt = f"""
+PARSING_PROMPT_TEMPLATE = """
     당신은 채용 공고 검색 시스템의 쿼리 분석 전문가입니다.
     사용자의 질문을 분석하여, 검색 시스템이 즉시 사용할 수 있는 JSON을 생성해주세요.
 
@@ -59,7 +67,7 @@ def query_rebuilder(question: str, MODEL_ID=MODEL_ID):
     1. 질문의 핵심 내용을 'keywords'로 추출합니다.
     2. 질문에 포함된 필터 조건을 분석하여 'filter_string'을 생성합니다.
     3. 'filter_string'은 SQL의 WHERE 절과 유사하며, 'AND'로 조건을 연결합니다.
-    4. 오늘 날짜는 '{datetime.now().strftime('%Y-%m-%d')}'입니다. 이를 기준으로 '올해', 내일', '이번 주', '다음 주' 등을 계산하여 'deadline_date' 필터를 YYYY-MM-DD 형식으로 정확하게 만드세요.
+    4. 오늘 날짜는 '{today}'입니다. 이를 기준으로 '올해', 내일', '이번 주', '다음 주' 등을 계산하여 'deadline_date' 필터를 YYYY-MM-DD 형식으로 정확하게 만드세요.
     5. 필터링 조건이 없으면 'filter_string'은 빈 문자열("")로 두세요.
     6. '9월'과 같은 월 단위 질문은 해당 월의 1일부터 마지막 날까지의 범위로 해석합니다. 사용자가 '마감일'인지 '등록일'인지 명확히 언급하지 않으면, 문맥상 더 자연스러운 필드를 선택하세요.
     
@@ -79,28 +87,26 @@ def query_rebuilder(question: str, MODEL_ID=MODEL_ID):
       "filter_string": ""
     }}
     
-    # 실제 질문
-    질문: "{question}"
-    JSON:
+    # 실제 질문은 사용자 메시지로 전달됩니다. 위 형식의 JSON만 출력하세요.
     """
-    client = GenerativeModel(
-        model_name=MODEL_ID,
-        system_instruction=parsing_prompt
-    )
-    
-    response = client.generate_content(contents=question)
-    
-    structured_query_str = response.text.strip().replace("```json", "").replace("```", "")
-    structured_query = json.loads(structured_query_str)
-    
-    search_keywords = structured_query.get("keywords", question)
-    final_filter_string = structured_query.get("filter_string", "")
-    
-    return search_keywords + final_filter_string
 
-# --- RAG 모델 호출 및 재랭킹 함수 ---
-def rerank_model(question: str, CORPUS_NAME=CORPUS_NAME, MODEL_ID=MODEL_ID,
-                 similarity_top_k=similarity_top_k, system_prompt=system_prompt):
+# --- 로컬 초기화 함수 ---
+# vertexai.init과 모델/검색 Tool 객체는 요청마다 만들지 않고 한 번 만들어 재사용합니다.
+# (프로젝트, 지역) / (코퍼스, 모델, top_k, 프롬프트) / (모델, 날짜) 별로 캐시되므로 설정이 바뀌면 새로 만들어집니다.
+_initialized_locations = set()
+
+
+def vertex_init(PROJECT_ID=PROJECT_ID, LOCATION=LOCATION):
+    if (PROJECT_ID, LOCATION) in _initialized_locations:
+        return
+    vertexai.init(project=PROJECT_ID, location=LOCATION)
+    _initialized_locations.add((PROJECT_ID, LOCATION))
+
+
+@lru_cache(maxsize=8)
+def get_rag_model(CORPUS_NAME=CORPUS_NAME, MODEL_ID=MODEL_ID, similarity_top_k=similarity_top_k,
+                  system_prompt=system_prompt):
+    """RAG 검색 Tool이 붙은 답변 모델을 (코퍼스, 모델, top_k, 프롬프트)별로 한 번만 만듭니다."""
     vertex_init()
     config = rag.RagRetrievalConfig(
         top_k=similarity_top_k,
@@ -122,14 +128,268 @@ def rerank_model(question: str, CORPUS_NAME=CORPUS_NAME, MODEL_ID=MODEL_ID,
         )
     )
     
-    rag_model = GenerativeModel(
+    return GenerativeModel(
         model_name=MODEL_ID,
         tools=[rag_retrieval_tool],
         system_instruction=system_prompt
     )
+
+
+@lru_cache(maxsize=8)
+def get_answer_model(MODEL_ID=MODEL_ID, system_prompt=system_prompt):
+    """검색 Tool 없이 답변만 만드는 모델 (로컬 검색 결과를 프롬프트로 받습니다)"""
+    vertex_init()
+    return GenerativeModel(
+        model_name=MODEL_ID,
+        system_instruction=system_prompt
+    )
+
+
+@lru_cache(maxsize=4)
+def get_parser_model(MODEL_ID=MODEL_ID, today=None):
+    """쿼리 분석 모델을 (모델, 날짜)별로 한 번만 만듭니다. 질문은 프롬프트가 아니라 요청 본문으로 보냅니다."""
+    vertex_init()
+    return GenerativeModel(
+        model_name=MODEL_ID,
+        system_instruction=PARSING_PROMPT_TEMPLATE.format(today=today)
+    )
+
+
+_query_cache = None
+
+
+def get_query_cache():
+    """쿼리 재구성 결과 캐시 (QUERY_CACHE_ENABLED=false면 None)"""
+    global _query_cache
+    if QUERY_CACHE_ENABLED and _query_cache is None:
+        vertex_init()
+        _query_cache = QueryCache(create_embedder())
+    return _query_cache
+
+
+_local_index = None
+
+
+def get_local_index():
+    """LOCAL_INDEX_DIR의 로컬 검색 인덱스를 한 번만 읽어 둡니다. ANN_INDEX_DIR에 ANN 인덱스가 있으면 함께 씁니다."""
+    global _local_index
+    if _local_index is None:
+        _local_index = LocalIndex.load(LOCAL_INDEX_DIR, create_embedder())
+        if os.path.exists(os.path.join(ANN_INDEX_DIR, "meta.json")):
+            _local_index.ann = IVFIndex(ANN_INDEX_DIR)
+        print(f"📚 로컬 검색 인덱스를 불러왔습니다: {LOCAL_INDEX_DIR} (공고 {len(_local_index.records)}개)")
+    return _local_index
+
+
+_answer_cache = None
+corpus_version = CorpusVersion()
+
+
+def serving_corpus():
+    """서빙 코퍼스 표식(CORPUS_VERSION_URI)에 적힌 코퍼스. 표식이 없으면 기본 CORPUS_NAME"""
+    return corpus_version.corpus() or CORPUS_NAME
+
+
+def get_answer_cache():
+    """최종 답변 캐시 (ANSWER_CACHE_ENABLED=false면 None)"""
+    global _answer_cache
+    if ANSWER_CACHE_ENABLED and _answer_cache is None:
+        _answer_cache = AnswerCache()
+    return _answer_cache
+
+
+def _answer_cache_lookup(question, pre_question, CORPUS_NAME, MODEL_ID, similarity_top_k, system_prompt):
+    """(캐시, 키, 캐시된 답변 또는 None). 키에 코퍼스 버전이 들어가므로 코퍼스가 바뀌면 자동으로 빗나갑니다."""
+    cache = get_answer_cache()
+    if cache is None:
+        return None, None, None
+    version = corpus_version.current()
+    cache.set_corpus_version(version)
+    key = answer_cache_key(normalize_question(question), pre_question, version, RETRIEVAL_BACKEND,
+                           CORPUS_NAME, MODEL_ID, similarity_top_k, system_prompt)
+    return cache, key, cache.get(key)
+
+
+def warmup():
+    """서버 시작 시 vertexai 초기화와 모델 객체 생성을 미리 해 둡니다."""
+    vertex_init()
+    if RETRIEVAL_BACKEND == "local":
+        get_local_index()
+        get_answer_model(MODEL_ID, system_prompt)
+    else:
+        get_rag_model(serving_corpus(), MODEL_ID, similarity_top_k, system_prompt)
+    get_parser_model(MODEL_ID, datetime.now().strftime('%Y-%m-%d'))
+    get_query_cache()
+
+
+# --- 쿼리 재구성 함수 ---
+def _parse_structured_query(response_text: str, question: str) -> tuple:
+    structured_query_str = response_text.strip().replace("```json", "").replace("```", "")
+    structured_query = json.loads(structured_query_str)
+    
+    search_keywords = structured_query.get("keywords", question)
+    final_filter_string = structured_query.get("filter_string", "")
     
-    chat = rag_model.start_chat()
-    pre_question = query_rebuilder(question)
-    response = chat.send_message(pre_question)
+    return search_keywords, final_filter_string
+
+# 캐시에 같은 질문이 있거나, 규칙 파서로 필터를 모두 풀 수 있거나, 캐시에 충분히 비슷한 질문이 있으면
+# Gemini를 호출하지 않습니다.
+def _fast_rebuild(question: str, cache):
+    if cache is not None:
+        cached = cache.get_exact(question)
+        if cached is not None:
+            return cached
+    if RULE_PARSER_ENABLED:
+        parsed = parse_query(question)
+        if parsed.confidence >= RULE_PARSER_MIN_CONFIDENCE:
+            return parsed.keywords, parsed.filter_string
+    return None
+
+def rebuild_query(question: str, MODEL_ID=MODEL_ID) -> tuple:
+    """질문 → (검색 키워드, filter_string)"""
+    cache = get_query_cache()
+    fast = _fast_rebuild(question, cache)
+    if fast is not None:
+        return fast
+    if cache is not None:
+        vector = cache.embed(question)
+        cached = cache.get_similar(question, vector)
+        if cached is not None:
+            return cached
+
+    client = get_parser_model(MODEL_ID, datetime.now().strftime('%Y-%m-%d'))
+    
+    response = client.generate_content(contents=question)
+    rebuilt = _parse_structured_query(response.text, question)
+    if cache is not None:
+        cache.put(question, vector, rebuilt)
+    return rebuilt
+
+async def rebuild_query_async(question: str, MODEL_ID=MODEL_ID) -> tuple:
+    """rebuild_query의 비동기 버전 (API 서버용)"""
+    cache = get_query_cache()
+    fast = _fast_rebuild(question, cache)
+    if fast is not None:
+        return fast
+    if cache is not None:
+        vector = await cache.embed_async(question)
+        cached = cache.get_similar(question, vector)
+        if cached is not None:
+            return cached
+
+    client = get_parser_model(MODEL_ID, datetime.now().strftime('%Y-%m-%d'))
+    
+    response = await client.generate_content_async(contents=question)
+    rebuilt = _parse_structured_query(response.text, question)
+    if cache is not None:
+        cache.put(question, vector, rebuilt)
+    return rebuilt
+
+def query_rebuilder(question: str, MODEL_ID=MODEL_ID):
+    """Vertex RAG 검색어 (키워드 뒤에 filter_string을 붙인 문자열)"""
+    return "".join(rebuild_query(question, MODEL_ID))
+
+async def query_rebuilder_async(question: str, MODEL_ID=MODEL_ID):
+    return "".join(await rebuild_query_async(question, MODEL_ID))
+
+# --- 로컬 검색 ---
+def _local_context_prompt(question: str, hits: list) -> str:
+    """로컬 검색 결과를 답변 모델에 넘길 프롬프트로 만듭니다."""
+    lines = ["### 검색된 채용 공고"]
+    if not hits:
+        lines.append("(조건에 맞는 공고가 없습니다)")
+    for rank, (record, _) in enumerate(hits, 1):
+        meta = record.get('structData', {})
+        fields = " | ".join(f"{key}: {meta[key]}" for key in ('회사명', '지역', '경력', '고용형태', '마감일', '상세링크')
+                            if meta.get(key))
+        lines.append(f"[{rank}] {fields}\n{record.get('content', '')[:LOCAL_CONTEXT_MAX_CHARS]}")
+    lines.append(f"### 사용자 질문\n{question}")
+    return "\n\n".join(lines)
+
+def _retrieve(question, rebuilt, CORPUS_NAME, MODEL_ID, similarity_top_k, system_prompt, query_vector=None):
+    """(답변 모델, 보낼 메시지). local이면 필터를 적용해 직접 검색하고, vertex면 RAG 검색 Tool에 맡깁니다."""
+    keywords, filter_string = rebuilt
+    if RETRIEVAL_BACKEND == "local":
+        hits = get_local_index().search(keywords, filter_string, similarity_top_k, query_vector)
+        return get_answer_model(MODEL_ID, system_prompt), _local_context_prompt(question, hits)
+    return get_rag_model(CORPUS_NAME, MODEL_ID, similarity_top_k, system_prompt), keywords + filter_string
+
+async def _retrieve_async(question, rebuilt, CORPUS_NAME, MODEL_ID, similarity_top_k, system_prompt):
+    query_vector = None
+    if RETRIEVAL_BACKEND == "local":
+        index = get_local_index()
+        if index.vectors is not None and index.embedder is not None:
+            query_vector = (await index.embedder.embed_async([rebuilt[0]]))[0]
+    return _retrieve(question, rebuilt, CORPUS_NAME, MODEL_ID, similarity_top_k, system_prompt, query_vector)
+
+# --- RAG 모델 호출 및 재랭킹 함수 ---
+def rerank_model(question: str, CORPUS_NAME=None, MODEL_ID=MODEL_ID,
+                 similarity_top_k=similarity_top_k, system_prompt=system_prompt):
+    CORPUS_NAME = CORPUS_NAME or serving_corpus()
+    rebuilt = rebuild_query(question, MODEL_ID)
+    pre_question = "".join(rebuilt)
+    cache, key, cached = _answer_cache_lookup(question, pre_question, CORPUS_NAME, MODEL_ID, similarity_top_k, system_prompt)
+    if cached is not None:
+        return CachedAnswer(cached)
+
+    model, message = _retrieve(question, rebuilt, CORPUS_NAME, MODEL_ID, similarity_top_k, system_prompt)
+    
+    chat = model.start_chat()
+    response = chat.send_message(message)
+    if cache is not None and response.text:
+        cache.put(key, response.text)
+    
+    return response
+
+async def rerank_model_async(question: str, CORPUS_NAME=None, MODEL_ID=MODEL_ID,
+                             similarity_top_k=similarity_top_k, system_prompt=system_prompt):
+    """rerank_model의 비동기 버전. Gemini 응답을 기다리는 동안 이벤트 루프를 막지 않습니다."""
+    await corpus_version.refresh_async()  # 표식 읽기(GCS)는 스레드에서
+    CORPUS_NAME = CORPUS_NAME or serving_corpus()
+    rebuilt = await rebuild_query_async(question, MODEL_ID)
+    pre_question = "".join(rebuilt)
+    cache, key, cached = _answer_cache_lookup(question, pre_question, CORPUS_NAME, MODEL_ID, similarity_top_k, system_prompt)
+    if cached is not None:
+        return CachedAnswer(cached)
+
+    model, message = await _retrieve_async(question, rebuilt, CORPUS_NAME, MODEL_ID, similarity_top_k, system_prompt)
+    
+    chat = model.start_chat()
+    response = await chat.send_message_async(message)
+    if cache is not None and response.text:
+        cache.put(key, response.text)
+    
+    return response
+
+def _chunk_text(chunk) -> str:
+    # 검색 근거(grounding) 정보만 담긴 조각은 text가 없어 ValueError가 납니다.
+    try:
+        return chunk.text
+    except (ValueError, AttributeError):
+        return ""
+
+async def stream_answer_async(question: str, CORPUS_NAME=None, MODEL_ID=MODEL_ID,
+                              similarity_top_k=similarity_top_k, system_prompt=system_prompt):
+    """rerank_model_async의 스트리밍 버전. 답변 텍스트 조각을 생성되는 대로 돌려줍니다."""
+    await corpus_version.refresh_async()  # 표식 읽기(GCS)는 스레드에서
+    CORPUS_NAME = CORPUS_NAME or serving_corpus()
+    rebuilt = await rebuild_query_async(question, MODEL_ID)
+    pre_question = "".join(rebuilt)
+    cache, key, cached = _answer_cache_lookup(question, pre_question, CORPUS_NAME, MODEL_ID, similarity_top_k, system_prompt)
+    if cached is not None:
+        yield cached
+        return
+
+    model, message = await _retrieve_async(question, rebuilt, CORPUS_NAME, MODEL_ID, similarity_top_k, system_prompt)
     
-    return response
\ No newline at end of file
+    chat = model.start_chat()
+    responses = await chat.send_message_async(message, stream=True)
+    parts = []
+    async for chunk in responses:
+        text = _chunk_text(chunk)
+        if text:
+            parts.append(text)
+            yield text
+    # 끝까지 받은 답변만 캐시합니다.
+    if cache is not None and parts:
+        cache.put(key, "".join(parts))
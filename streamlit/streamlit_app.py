@@ -4,6 +4,21 @@ import json
 
 # 🚀 이 부분을 본인의 Cloud Run API URL로 변경하세요!
 API_URL = "https://rag-chatbot-941837367982.us-east4.run.app/ask"
+STREAM_API_URL = API_URL + "/stream"
+
+
+def iter_sse_events(response):
+    """SSE 응답을 (event, data) 튜플로 하나씩 돌려줍니다."""
+    event, data_lines = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:  # 빈 줄 = 이벤트 하나 끝
+            if data_lines:
+                yield event, json.loads("\n".join(data_lines))
+            event, data_lines = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:"):].strip())
 
 # --- Streamlit UI 설정 ---
 st.title("🤖 AI 채용 공고 챗봇")
@@ -31,20 +46,30 @@ if prompt := st.chat_input("질문을 입력하세요..."):
         "question": prompt
     }
 
-    # 로딩 스피너 표시
-    with st.spinner('답변을 생성하는 중입니다...'):
+    # 답변을 받는 대로 조금씩 표시 (SSE 스트리밍)
+    with st.chat_message("assistant"):
+        placeholder = st.empty()
+        placeholder.markdown("답변을 생성하는 중입니다...")
+        assistant_response = ""
         try:
-            # API 서버에 POST 요청 보내기
-            response = requests.post(API_URL, json=payload)
-            response.raise_for_status() # 오류가 있으면 예외 발생
+            # API 서버에 POST 요청 보내기 (연결 10초, 조각 사이 최대 120초 대기)
+            with requests.post(STREAM_API_URL, json=payload, stream=True, timeout=(10, 120)) as response:
+                response.raise_for_status() # 오류가 있으면 예외 발생
+                response.encoding = "utf-8"
 
-            # 답변 받아오기
-            assistant_response = response.json().get("answer", "답변을 받아오지 못했습니다.")
+                for event, data in iter_sse_events(response):
+                    if event == "error":
+                        raise RuntimeError(data.get("detail", "알 수 없는 오류"))
+                    if event == "done":
+                        break
+                    assistant_response += data.get("text", "")
+                    placeholder.markdown(assistant_response + "▌")
 
-            # AI 답변을 대화 기록에 추가하고 화면에 표시
+            assistant_response = assistant_response or "답변을 받아오지 못했습니다."
+            placeholder.markdown(assistant_response)
+            # AI 답변을 대화 기록에 추가
             st.session_state.messages.append({"role": "assistant", "content": assistant_response})
-            with st.chat_message("assistant"):
-                st.markdown(assistant_response)
 
-        except requests.exceptions.RequestException as e:
-            st.error(f"API 요청 중 오류가 발생했습니다: {e}")
\ No newline at end of file
+        except (requests.exceptions.RequestException, RuntimeError) as e:
+            placeholder.empty()
+            st.error(f"API 요청 중 오류가 발생했습니다: {e}")
@@ -0,0 +1,134 @@
+import json
+from datetime import date
+
+import pytest
+
+from benchmarks.fakes import FakeRagEngine
+from crawler.corpus_sync import load_manifest, sync_corpus
+from crawler.sinks import MemorySink
+
+FOLDER = "rag-source-data"
+TODAY = date(2026, 10, 18)
+
+
+def part(ids, deadline="2099/01/01", tag=""):
+    return "\n".join(json.dumps({"id": str(i), "structData": {"마감일": deadline}, "content": f"공고 {i}{tag}"},
+                                ensure_ascii=False) for i in ids).encode("utf-8")
+
+
+@pytest.fixture
+def sink():
+    return MemorySink()
+
+
+@pytest.fixture
+def engine():
+    return FakeRagEngine()
+
+
+def sync(sink, engine):
+    return sync_corpus(sink, engine, FOLDER, "job_corpus_test", TODAY)
+
+
+def rag_files(engine, corpus):
+    """코퍼스의 RagFile 표시 이름 목록"""
+    return sorted(engine.corpora[corpus].values())
+
+
+def test_first_sync_imports_every_part(sink, engine):
+    sink.write(f"{FOLDER}/p_1.jsonl", part(range(0, 10)))
+    sink.write(f"{FOLDER}/p_2.jsonl", part(range(10, 20)))
+    corpus, display_name, stats = sync(sink, engine)
+    assert display_name == "job_corpus_test"
+    assert stats['imported'] == 2
+    assert rag_files(engine, corpus) == ["p_1.jsonl", "p_2.jsonl"]
+    manifest = load_manifest(sink)
+    assert manifest['corpus'] == corpus
+    assert all(entry['rag_file'] in engine.corpora[corpus] for entry in manifest['files'].values())
+
+    # 바뀐 것이 없으면 아무것도 다시 임포트하지 않습니다.
+    _, _, stats = sync(sink, engine)
+    assert stats == {'imported': 0, 'deleted': 0, 'compacted': 0, 'unchanged': 2}
+
+
+def test_partial_import_failure_keeps_replaced_postings_served(sink, engine):
+    sink.write(f"{FOLDER}/p_1.jsonl", part(range(0, 10)))
+    corpus, _, _ = sync(sink, engine)
+
+    # p_2가 p_1의 공고를 모두 대체하지만 임포트에 실패하면 p_1은 지우지 않습니다.
+    sink.write(f"{FOLDER}/p_2.jsonl", part(range(0, 10), tag=" 수정"))
+    engine.fail_uris = {"p_2"}
+    assert sync(sink, engine) is None
+    assert rag_files(engine, corpus) == ["p_1.jsonl"]
+    assert f"{FOLDER}/p_2.jsonl" not in load_manifest(sink)['files']
+
+    # 다음 실행에서 임포트가 확인되면 대체된 p_1을 지웁니다.
+    engine.fail_uris = set()
+    _, _, stats = sync(sink, engine)
+    assert stats['imported'] == 1 and stats['deleted'] == 1
+    assert rag_files(engine, corpus) == ["p_2.jsonl"]
+    assert load_manifest(sink)['files'][f"{FOLDER}/p_1.jsonl"]['records'] == {}
+
+
+def test_rewritten_part_keeps_previous_rag_file_until_reimport_succeeds(sink, engine):
+    sink.write(f"{FOLDER}/p_1.jsonl", part(range(0, 10)))
+    corpus, _, _ = sync(sink, engine)
+    old_rag_file = load_manifest(sink)['files'][f"{FOLDER}/p_1.jsonl"]['rag_file']
+
+    sink.write(f"{FOLDER}/p_1.jsonl", part(range(0, 10), tag=" 수정"))
+    engine.fail_on_import = engine.import_calls + 1
+    assert sync(sink, engine) is None
+    assert list(engine.corpora[corpus]) == [old_rag_file]
+    assert load_manifest(sink)['files'][f"{FOLDER}/p_1.jsonl"]['rag_file'] == old_rag_file
+
+    engine.fail_on_import = None
+    _, _, stats = sync(sink, engine)
+    assert stats['imported'] == 1 and stats['deleted'] == 1
+    new_rag_file = load_manifest(sink)['files'][f"{FOLDER}/p_1.jsonl"]['rag_file']
+    assert list(engine.corpora[corpus]) == [new_rag_file] and new_rag_file != old_rag_file
+
+
+def test_failed_delete_is_retried_on_next_run(sink, engine):
+    sink.write(f"{FOLDER}/p_1.jsonl", part(range(0, 10), deadline="2026/10/20"))
+    corpus, _, _ = sync(sink, engine)
+
+    # 모든 공고가 마감되어 p_1을 지워야 하지만 삭제에 실패합니다.
+    engine.fail_delete = True
+    _, _, stats = sync_corpus(sink, engine, FOLDER, "job_corpus_test", date(2026, 10, 21))
+    assert stats['deleted'] == 0
+    assert rag_files(engine, corpus) == ["p_1.jsonl"]
+    pending = load_manifest(sink)['pending_deletes']
+    assert pending == list(engine.corpora[corpus])
+
+    engine.fail_delete = False
+    _, _, stats = sync_corpus(sink, engine, FOLDER, "job_corpus_test", date(2026, 10, 21))
+    assert stats['deleted'] == 1
+    assert rag_files(engine, corpus) == []
+    assert load_manifest(sink)['pending_deletes'] == []
+
+
+def test_mostly_replaced_part_is_compacted(sink, engine):
+    sink.write(f"{FOLDER}/p_1.jsonl", part(range(0, 10)))
+    corpus, _, _ = sync(sink, engine)
+
+    # p_2가 p_1의 공고 7개를 대체하면 p_1에는 3개(30%)만 살아 있어 살아 있는 줄만 새 파일로 옮깁니다.
+    sink.write(f"{FOLDER}/p_2.jsonl", part(range(0, 7), tag=" 수정"))
+    _, _, stats = sync(sink, engine)
+    compacted = f"{FOLDER}/compacted_{TODAY.isoformat()}_0.jsonl"
+    assert stats['compacted'] == 1
+    assert [json.loads(line)['id'] for line in sink.read(compacted).decode("utf-8").splitlines()] == ["7", "8", "9"]
+    assert rag_files(engine, corpus) == [f"compacted_{TODAY.isoformat()}_0.jsonl", "p_2.jsonl"]
+    files = load_manifest(sink)['files']
+    assert files[f"{FOLDER}/p_1.jsonl"]['records'] == {} and files[f"{FOLDER}/p_1.jsonl"]['rag_file'] is None
+    assert sorted(files[compacted]['records']) == ["7", "8", "9"]
+
+
+def test_failed_compaction_import_removes_the_compacted_file(sink, engine):
+    sink.write(f"{FOLDER}/p_1.jsonl", part(range(0, 10)))
+    corpus, _, _ = sync(sink, engine)
+
+    sink.write(f"{FOLDER}/p_2.jsonl", part(range(0, 7), tag=" 수정"))
+    engine.fail_uris = {"compacted_"}
+    assert sync(sink, engine) is None
+    assert not [name for name in sink.list(FOLDER) if "compacted_" in name]
+    assert "p_1.jsonl" in rag_files(engine, corpus)  # 원래 파일은 그대로 서빙
@@ -0,0 +1,49 @@
+import asyncio
+import sqlite3
+
+from crawler.db_sink import DbSink, SqliteBackend, create_db_sink
+
+
+def posting(rec_idx, title, deadline="2026/11/30"):
+    return {'rec_idx': rec_idx, '제목': title, '회사명': "회사", '상세내용': f"{title} 본문", '지역': "서울",
+            '경력': "신입", '고용형태': "정규직", '등록일': "2026-10-18", '마감일': deadline,
+            '상세링크': f"https://www.saramin.co.kr/zf_user/jobs/relay/view?rec_idx={rec_idx}"}
+
+
+def fetch_rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT rec_idx, title, description, deadline_date FROM job_raw ORDER BY rec_idx").fetchall()
+    finally:
+        conn.close()
+
+
+def test_upserting_the_same_posting_twice_keeps_one_updated_row(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+
+    async def main():
+        # 배치 크기 1, 작성기 1개: 두 번째 쓰기는 이미 있는 행에 대한 별도 upsert로, 첫 번째 뒤에 실행됩니다.
+        async with DbSink(SqliteBackend(str(path)), batch_rows=1, workers=1) as sink:
+            await sink.add([posting("100", "청소원 모집")])
+            await sink.add([posting("100", "청소원 모집 (수정)", deadline="상시채용"), posting("200", "경비원 모집")])
+        return sink
+
+    sink = asyncio.run(main())
+    assert sink.written_rows == 3 and not sink.failed_ids
+    assert fetch_rows(path) == [
+        (100, "청소원 모집 (수정)", "청소원 모집 (수정) 본문", "상시채용"),
+        (200, "경비원 모집", "경비원 모집 본문", "2026/11/30"),
+    ]
+
+
+def test_duplicates_within_a_batch_are_written_once(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+
+    async def main():
+        async with create_db_sink(f"sqlite:///{path}") as sink:
+            await sink.add([posting("100", "첫 번째"), posting("100", "두 번째")])
+        return sink
+
+    sink = asyncio.run(main())
+    assert sink.written_rows == 1 and sink.written_batches == 1
+    assert fetch_rows(path) == [(100, "두 번째", "두 번째 본문", "2026/11/30")]
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from crawler.db_sink import SQLITE_DDL
+from crawler.sinks import create_sink
+from rag import extract_load
+
+ROWS = 6000  # LINES_PER_FILE(2500)보다 많아 part와 구간이 여러 개로 나뉩니다.
+
+
+def expected_ids():
+    """본문이 있는 행(10번째마다 본문이 비어 있음)"""
+    return {str(rec_idx) for rec_idx in range(1, ROWS + 1) if rec_idx % 10}
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    conn = sqlite3.connect(path)
+    conn.execute(SQLITE_DDL)
+    conn.executemany(
+        "INSERT INTO job_raw VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [(rec_idx, f"공고 {rec_idx}", "회사", "" if rec_idx % 10 == 0 else f"본문 {rec_idx}", "서울", "신입",
+          "정규직", "2026-10-18", "2026/11/30", f"https://example.com/{rec_idx}")
+         for rec_idx in range(1, ROWS + 1)])
+    conn.commit()
+    conn.close()
+    return f"sqlite:///{path}"
+
+
+@pytest.fixture
+def storage(tmp_path):
+    root = tmp_path / "out"
+    sink = create_sink(str(root))
+    # 같은 폴더의 크롤러 part는 내보내기가 건드리지 않아야 합니다.
+    sink.write(f"{extract_load.GCS_DESTINATION_FOLDER}/job_2026-10-18_061014_part_1.jsonl", b"{}\n")
+    return str(root), sink
+
+
+def read_parts(sink, manifest):
+    """매니페스트의 part를 읽어 sha256/행 수를 확인하고 {id: 레코드}를 돌려줍니다."""
+    records = {}
+    for task in manifest['tasks']:
+        for part in task['parts']:
+            data = sink.read(part['name'])
+            assert hashlib.sha256(data).hexdigest() == part['sha256']
+            lines = data.decode("utf-8").splitlines()
+            assert len(lines) == part['rows'] <= extract_load.LINES_PER_FILE
+            for line in lines:
+                record = json.loads(line)
+                records[record['id']] = record
+    return records
+
+
+def test_sequential_export_writes_parts_and_manifest(monkeypatch, db_url, storage):
+    root, sink = storage
+    monkeypatch.setattr(extract_load, "DB_URL", db_url)
+    monkeypatch.setattr(extract_load, "STORAGE_URI", root)
+    extract_load.process_and_upload_in_chunks()
+
+    manifest = extract_load.load_export_manifest(sink)
+    assert manifest['status'] == "done" and manifest['mode'] == "sequential"
+    assert manifest['total_rows'] == len(expected_ids())
+    assert [part['name'] for part in manifest['tasks'][0]['parts']] == \
+        [f"{extract_load.EXPORT_PART_PREFIX}{index}.jsonl" for index in (1, 2, 3)]
+    records = read_parts(sink, manifest)
+    assert set(records) == expected_ids()
+    assert records["7"] == {
+        "id": "7", "content": "공고 7\n\n본문 7",
+        "structData": {"title": "공고 7", "company": "회사", "location": "서울", "experience": "신입",
+                       "employment_type": "정규직", "posted_date": "2026-10-18", "deadline_date": "2026/11/30",
+                       "link": "https://example.com/7"},
+    }
+
+
+def test_parallel_export_replaces_sequential_parts(monkeypatch, db_url, storage):
+    root, sink = storage
+    monkeypatch.setattr(extract_load, "DB_URL", db_url)
+    monkeypatch.setattr(extract_load, "STORAGE_URI", root)
+    extract_load.process_and_upload_in_chunks()
+
+    manifest = extract_load.export_parallel(workers=2, db_url=db_url, storage_uri=root)
+    assert manifest['status'] == "done"
+    # 구간은 기본 키만으로 나누므로 ROWS / LINES_PER_FILE개이고, 본문이 빈 행은 내보낼 때 빠집니다.
+    assert [(task['after'], task['upto']) for task in manifest['tasks']] == [(None, 2500), (2500, 5000), (5000, None)]
+    assert all(task['status'] == "done" for task in manifest['tasks'])
+    assert manifest['total_rows'] == len(expected_ids())
+    assert set(read_parts(sink, manifest)) == expected_ids()
+
+    # 순차 내보내기가 남긴 part는 지워지고, 크롤러 part는 남습니다.
+    names = set(sink.list(f"{extract_load.GCS_DESTINATION_FOLDER}/"))
+    current = {part['name'] for task in manifest['tasks'] for part in task['parts']}
+    assert names == current | {f"{extract_load.GCS_DESTINATION_FOLDER}/job_2026-10-18_061014_part_1.jsonl"}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_serializes_dates_and_decimals_with_or_without_orjson(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(extract_load, "orjson", None)
+    record = {"posted_date": date(2026, 10, 18), "updated_at": datetime(2026, 10, 18, 9, 30),
+              "salary": Decimal("3200.50"), "title": "청소원"}
+    assert json.loads(extract_load._dumps(record)) == {
+        "posted_date": "2026-10-18", "updated_at": "2026-10-18T09:30:00", "salary": "3200.50", "title": "청소원"}
@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from benchmarks.fakes import FakeSaraminServer
+from crawler import ratelimit
+from crawler.ratelimit import CircuitBreaker, CircuitOpenError, RequestScheduler
+
+
+@pytest.fixture
+def server():
+    with FakeSaraminServer(jobs_per_page=1) as fake:
+        yield fake
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    # 지수 백오프는 짧게 줄여서, 기다린 시간이 Retry-After/회로 차단기 때문인지 구분할 수 있게 합니다.
+    monkeypatch.setattr(ratelimit, "RETRY_BASE_DELAY", 0.01)
+    monkeypatch.setattr(ratelimit, "DECREASE_COOLDOWN", 0.0)
+
+
+def listing_url(server):
+    return f"{server.url}/zf_user/search?searchword=test&recruitPage=1"
+
+
+def run_requests(scheduler, url, count):
+    """같은 URL로 요청 count개를 동시에 보내고 (응답 또는 예외 목록, 걸린 시간)을 반환합니다."""
+    async def main():
+        async with httpx.AsyncClient() as client:
+            start = time.monotonic()
+            results = await asyncio.gather(*[scheduler.request(client, "GET", url) for _ in range(count)],
+                                           return_exceptions=True)
+            return results, time.monotonic() - start
+
+    return asyncio.run(main())
+
+
+def test_waits_for_retry_after_on_429(server):
+    server.throttle_rps = 1
+    scheduler = RequestScheduler(concurrency=10, rate=0)
+    # 1초 창에 1건만 받으므로 세 요청 중 적어도 하나는 429(Retry-After: 1)를 받습니다.
+    results, elapsed = run_requests(scheduler, listing_url(server), 3)
+    assert [response.status_code for response in results] == [200, 200, 200]
+    assert server.faults['throttle'] >= 1
+    assert elapsed >= 0.9  # 백오프(0.01초)가 아니라 Retry-After만큼 기다림
+    # 429는 서버가 살아 있다는 뜻이므로 회로는 열지 않습니다.
+    assert scheduler.host(listing_url(server)).breaker.opens == 0
+
+
+def test_aimd_cuts_concurrency_on_errors_and_recovers(server):
+    scheduler = RequestScheduler(concurrency=8, rate=0, max_attempts=1)
+    url = listing_url(server)
+    limiter = scheduler.host(url).limiter
+    assert limiter.limit == 4
+
+    server.fault_rate = 1.0
+    results, _ = run_requests(scheduler, url, 3)
+    assert all(isinstance(result, httpx.HTTPStatusError) for result in results)
+    assert limiter.limit == 1 and limiter.decreases >= 2
+
+    server.fault_rate = 0.0
+    for _ in range(30):
+        results, _ = run_requests(scheduler, url, 1)
+        assert results[0].status_code == 200
+    assert limiter.limit > 4  # 성공이 이어지면 처음 한도보다 늘어남
+    assert limiter.limit <= limiter.maximum
+
+
+def test_breaker_opens_on_outage_and_gives_up_after_max_open_seconds(server):
+    scheduler = RequestScheduler(concurrency=10, rate=0, max_attempts=50)
+    url = listing_url(server)
+    host = scheduler.host(url)
+    host.breaker = CircuitBreaker("fake", threshold=3, reset_seconds=0.1, max_open_seconds=0.5)
+
+    server.start_outage(60)
+    results, elapsed = run_requests(scheduler, url, 4)
+    assert host.breaker.opens >= 1
+    assert any(isinstance(result, CircuitOpenError) for result in results)
+    assert all(isinstance(result, (CircuitOpenError, httpx.HTTPStatusError)) for result in results)
+    assert 0.5 <= elapsed < 5.0
+    # 회로가 열린 동안에는 회복 확인 요청만 보내므로 서버가 받은 요청 수가 제한됩니다.
+    assert server.faults['outage'] < 50
+
+    # 회복 뒤 reset_seconds가 지나 도착한 요청이 회복 확인 요청이 되어 회로를 닫습니다.
+    server.start_outage(0)
+    time.sleep(0.15)
+    results, _ = run_requests(scheduler, url, 1)
+    assert results[0].status_code == 200
+    assert host.breaker.state == "closed"
@@ -0,0 +1,70 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from crawler.testing import FakeVisionClient, fake_vision_request
+from crawler.ocr_engines import VisionBatcher
+
+
+def run_batch(client, images, **options):
+    """images를 동시에 submit하고 (호출자별 결과 또는 예외, 걸린 시간)을 반환합니다."""
+    async def main():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            batcher = VisionBatcher(lambda: client, executor, asyncio.Semaphore(2),
+                                    make_request=fake_vision_request, **options)
+            start = time.monotonic()
+            results = await asyncio.gather(*[batcher.submit(image) for image in images], return_exceptions=True)
+            return results, time.monotonic() - start
+
+    return asyncio.run(main())
+
+
+def test_flushes_when_batch_is_full():
+    client = FakeVisionClient()
+    images = [f"이미지 {i}".encode() for i in range(6)]
+    results, elapsed = run_batch(client, images, max_images=3, max_wait=10.0)
+    assert results == [image.decode() for image in images]
+    assert client.batch_sizes == [3, 3]
+    assert elapsed < 1.0  # 타이머(10초)를 기다리지 않음
+
+
+def test_flushes_when_byte_limit_is_reached():
+    client = FakeVisionClient()
+    images = [b"a" * 40, b"b" * 40, b"c" * 40]
+    # 세 번째 이미지를 더하면 100바이트를 넘으므로 앞의 두 장을 먼저 보내고, 남은 한 장은 타이머로 보냅니다.
+    results, _ = run_batch(client, images, max_images=10, max_bytes=100, max_wait=0.05)
+    assert results == [image.decode() for image in images]
+    assert client.batch_sizes == [2, 1]
+
+
+def test_flushes_partial_batch_on_timer():
+    client = FakeVisionClient()
+    results, elapsed = run_batch(client, [b"first", b"second"], max_images=10, max_wait=0.05)
+    assert results == ["first", "second"]
+    assert client.batch_sizes == [2]
+    assert 0.04 <= elapsed < 1.0
+
+
+def test_routes_per_image_errors_to_their_callers():
+    client = FakeVisionClient(fail_prefix=b"bad")
+    results, _ = run_batch(client, [b"ok 1", b"bad image", b"ok 2"], max_images=3, max_wait=10.0)
+    assert results[0] == "ok 1" and results[2] == "ok 2"
+    assert isinstance(results[1], Exception) and "fake vision error" in str(results[1])
+    assert client.batch_sizes == [3]
+
+
+def test_batch_failure_reaches_every_caller():
+    client = FakeVisionClient(fail_batches=True)
+    results, _ = run_batch(client, [b"one", b"two"], max_images=2, max_wait=10.0)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.parametrize("max_images", [1, 4])
+def test_each_caller_gets_its_own_text(max_images):
+    client = FakeVisionClient(latency=0.01)
+    images = [f"공고 {i}".encode() for i in range(8)]
+    results, _ = run_batch(client, images, max_images=max_images, max_wait=0.01)
+    assert results == [image.decode() for image in images]
+    assert sum(client.batch_sizes) == len(images)